@@ -0,0 +1,3 @@
+
+#include "mntent.h"
+
@@ -0,0 +1,170 @@
+"""Functions used to record and query the build telemetry database
+
+Each build appends the targets it built to a SQLite database, with the time spent building them,
+whether they were fetched from the cache, the size of the result and the peak memory of the
+commands which built them. Builds are keyed by commit and build options.
+"""
+
+import os
+import sqlite3
+from contextlib import closing
+
+# Relative to the godot folder, next to the build results.
+DEFAULT_DATABASE = "bin/build_telemetry.db"
+
+_schema = """
+CREATE TABLE IF NOT EXISTS builds (
+    id INTEGER PRIMARY KEY,
+    commit_hash TEXT NOT NULL,
+    options TEXT NOT NULL,
+    jobs INTEGER,
+    start_time REAL,
+    duration REAL
+);
+CREATE TABLE IF NOT EXISTS targets (
+    build_id INTEGER NOT NULL REFERENCES builds(id),
+    target TEXT NOT NULL,
+    source TEXT,
+    category TEXT,
+    duration REAL,
+    cached INTEGER,
+    size INTEGER,
+    peak_memory INTEGER
+);
+CREATE INDEX IF NOT EXISTS targets_target ON targets(target, build_id);
+CREATE INDEX IF NOT EXISTS targets_source ON targets(source);
+"""
+
+
+def open_database(path):
+    connection = sqlite3.connect(path)
+    connection.executescript(_schema)
+    return connection
+
+
+# "targets" are tuples of (target, source, category, duration, cached, size, peak_memory),
+# see methods.record_build_telemetry(). Returns the id of the build.
+def record_build(path, commit_hash, options, jobs, start_time, duration, targets):
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    with closing(open_database(path)) as connection, connection:
+        build_id = connection.execute(
+            "INSERT INTO builds (commit_hash, options, jobs, start_time, duration) VALUES (?, ?, ?, ?, ?)",
+            (commit_hash, options, jobs, start_time, duration),
+        ).lastrowid
+        connection.executemany(
+            "INSERT INTO targets VALUES (?, ?, ?, ?, ?, ?, ?, ?)", [(build_id,) + tuple(t) for t in targets]
+        )
+
+    return build_id
+
+
+def _select_latest(connection, query, options):
+    # The rows of "query" (which joins "builds") by build, only from the builds with the given options if
+    # there are any, as optimization or LTO change the costs without changing the names of the targets.
+    if options is not None:
+        rows = connection.execute(query + " AND options = ? ORDER BY build_id", (options,)).fetchall()
+        if rows:
+            return rows
+    return connection.execute(query + " ORDER BY build_id").fetchall()
+
+
+def get_source_costs(path, options=None):
+    # The latest compile time in seconds and peak memory in bytes of each source compiled on its own,
+    # preferably from builds with the given options. Used to balance the SCU files.
+    compile_times = {}
+    compile_memory = {}
+    if not os.path.isfile(path):
+        return compile_times, compile_memory
+
+    query = """
+        SELECT source, targets.duration, peak_memory FROM targets JOIN builds ON builds.id = build_id
+        WHERE category = 'compile' AND cached = 0 AND source IS NOT NULL
+    """
+    with closing(open_database(path)) as connection:
+        for source, duration, peak_memory in _select_latest(connection, query, options):
+            compile_times[source] = duration
+            if peak_memory:
+                compile_memory[source] = peak_memory
+
+    return compile_times, compile_memory
+
+
+def get_target_costs(path, options=None):
+    # The latest duration in seconds and peak memory in bytes of each target built by a command, preferably
+    # from builds with the given options. Used to start the targets on the critical path of the build first,
+    # and to keep the jobs within the memory.
+    durations = {}
+    peak_memory = {}
+    if not os.path.isfile(path):
+        return durations, peak_memory
+
+    query = """
+        SELECT target, targets.duration, peak_memory FROM targets JOIN builds ON builds.id = build_id
+        WHERE cached = 0
+    """
+    with closing(open_database(path)) as connection:
+        for target, duration, memory in _select_latest(connection, query, options):
+            durations[target] = duration
+            if memory:
+                peak_memory[target] = memory
+
+    return durations, peak_memory
+
+
+def get_slowest_targets(connection, limit=20):
+    # The latest duration, size and peak memory of the targets which took the longest to build.
+    return connection.execute(
+        """
+        SELECT target, duration, size, peak_memory FROM targets AS t
+        WHERE cached = 0 AND build_id = (
+            SELECT MAX(build_id) FROM targets WHERE target = t.target AND cached = 0
+        )
+        ORDER BY duration DESC LIMIT ?
+        """,
+        (limit,),
+    ).fetchall()
+
+
+def get_regressions(connection, base_commit, head_commit, limit=20):
+    # The targets whose average duration grew the most from the builds of one commit to the other.
+    # Commits can be abbreviated.
+    return connection.execute(
+        """
+        WITH durations AS (
+            SELECT commit_hash, target, AVG(targets.duration) AS duration
+            FROM targets JOIN builds ON builds.id = build_id
+            WHERE cached = 0 GROUP BY commit_hash, target
+        )
+        SELECT head.target, base.duration, head.duration FROM durations AS head
+        JOIN durations AS base ON base.target = head.target
+        WHERE base.commit_hash LIKE ? || '%' AND head.commit_hash LIKE ? || '%'
+        ORDER BY head.duration - base.duration DESC LIMIT ?
+        """,
+        (base_commit, head_commit, limit),
+    ).fetchall()
+
+
+def get_growing_targets(connection, limit=20, min_builds=3):
+    # The targets whose duration grew the fastest over the builds which built them, with the growth
+    # in seconds per build (the slope of a least squares fit) and their latest duration.
+    durations = {}
+    for target, duration in connection.execute(
+        "SELECT target, duration FROM targets WHERE cached = 0 ORDER BY build_id"
+    ):
+        durations.setdefault(target, []).append(duration)
+
+    growth = []
+    for target, samples in durations.items():
+        count = len(samples)
+        if count < min_builds:
+            continue
+        mean_x = (count - 1) / 2
+        mean_y = sum(samples) / count
+        variance = sum((x - mean_x) ** 2 for x in range(count))
+        slope = sum((x - mean_x) * (y - mean_y) for x, y in enumerate(samples)) / variance
+        growth.append((target, slope, samples[-1]))
+
+    growth.sort(key=lambda row: -row[1])
+    return growth[:limit]
@@ -0,0 +1,311 @@
+"""Functions used to reuse the configuration of previous builds (configure_cache)
+
+The configure steps (the platform's `detect.configure()`, the modules' `can_build()` and `configure()`) are
+recorded as the changes they make to the construction environment, with what they print. A step is replayed
+from the cache when the environment it starts from, the build scripts, the environment variables they read and
+the files it depends on (compilers, pkg-config `.pc` files) are all unchanged.
+
+Only steps which change plain data (strings, numbers, lists, dicts) can be replayed. Steps which add tools,
+builders or methods to the environment always run.
+"""
+
+import contextlib
+import hashlib
+import os
+import pickle
+import platform
+import re
+import shutil
+import subprocess
+import sys
+from collections import OrderedDict, UserList, deque
+from collections.abc import Mapping
+
+# Relative to the godot folder, next to the build results.
+DEFAULT_PATH = "bin/configure_cache.pickle"
+
+# Older entries are dropped, so switching between a few configurations keeps them all.
+MAX_ENTRIES = 64
+
+_format_version = 1
+# The environment variables a build script reads.
+_environ_pattern = re.compile(
+    r"""os\.(?:environ\.get|getenv)\(\s*["'](\w+)["']"""
+    r"""|os\.environ\[\s*["'](\w+)["']\s*\]"""
+    r"""|["'](\w+)["'] in os\.environ"""
+)
+
+_cache = None
+
+
+class ConfigureCache:
+    def __init__(self, path, scripts, global_key=()):
+        self.path = path
+        self.entries = OrderedDict()
+        self.dirty = False
+        # The files the steps being recorded depend on, innermost last.
+        self.recording = []
+
+        key = hashlib.sha1(pickle.dumps((_format_version, sys.version, platform.platform(), global_key)))
+        variables = set()
+        for script in sorted(scripts):
+            try:
+                with open(script, "rb") as f:
+                    content = f.read()
+            except OSError:
+                content = None
+            key.update(pickle.dumps((script, content)))
+            if content:
+                for match in _environ_pattern.finditer(content.decode("utf-8", "replace")):
+                    variables.add(next(name for name in match.groups() if name))
+        key.update(pickle.dumps(sorted((name, os.environ.get(name)) for name in variables)))
+        self.key = key.hexdigest()
+
+        try:
+            with open(path, "rb") as f:
+                cache = pickle.load(f)
+            if cache["version"] == _format_version:
+                self.entries = cache["entries"]
+        except Exception:
+            # Missing, or written by an incompatible version of the build scripts.
+            pass
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None or any(_get_mtime(path) != mtime for path, mtime in entry["dependencies"].items()):
+            return None
+        self.entries.move_to_end(key)
+        return entry
+
+    def set(self, key, entry):
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > MAX_ENTRIES:
+            self.entries.popitem(last=False)
+        self.dirty = True
+
+    def add_dependency(self, path):
+        for dependencies in self.recording:
+            dependencies[path] = _get_mtime(path)
+
+    def save(self):
+        if not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            pickle.dump({"version": _format_version, "entries": self.entries}, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, self.path)
+        self.dirty = False
+
+
+def _get_mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _is_data(value):
+    if value is None or isinstance(value, (str, bytes, bool, int, float)):
+        return True
+    if isinstance(value, (list, tuple, deque, UserList)):
+        return all(_is_data(item) for item in value)
+    if type(value) in (dict, OrderedDict):
+        return all(_is_data(k) and _is_data(v) for k, v in value.items())
+    return False
+
+
+def _describe(value):
+    """
+    Describe a value which isn't plain data in the same way across builds, from its type and contents.
+    """
+    if _is_data(value):
+        return value
+    if isinstance(value, Mapping):
+        return (type(value).__qualname__, [(repr(k), _describe(v)) for k, v in value.items()])
+    if isinstance(value, (list, tuple, deque, UserList)):
+        return (type(value).__qualname__, [_describe(item) for item in value])
+    if callable(value) and hasattr(value, "__qualname__"):
+        return (getattr(value, "__module__", None), value.__qualname__)
+    return type(value).__qualname__
+
+
+def _get_items(env):
+    yield from (("$" + name, value) for name, value in env.Dictionary().items())
+    yield from (("." + name, value) for name, value in vars(env).items() if not name.startswith("_"))
+
+
+def _snapshot(env):
+    """
+    Return the construction variables and the attributes of the environment, as `{name: (data, value)}`.
+    Plain data is kept as its representation. Other values are kept as objects, to find the ones which are
+    replaced or modified.
+    """
+    snapshot = {}
+    for name, value in _get_items(env):
+        if _is_data(value):
+            # Not pickled, as the pickle of equal values depends on which objects they share.
+            snapshot[name] = (True, type(value).__qualname__ + repr(value))
+        else:
+            snapshot[name] = (False, (value, _describe(value)))
+    return snapshot
+
+
+def _get_state_key(snapshot):
+    state = []
+    for name, (is_data, value) in sorted(snapshot.items()):
+        state.append((name, value if is_data else value[1]))
+    return pickle.dumps(state, pickle.HIGHEST_PROTOCOL)
+
+
+def _get_changes(env, before):
+    """
+    Return `(changes, removed)` made to the environment since the snapshot, or `None` if a value
+    which isn't plain data changed.
+    """
+    after = _snapshot(env)
+    changes = {}
+    for name, (is_data, value) in after.items():
+        previous = before.get(name)
+        if is_data:
+            if previous != (True, value):
+                changes[name] = None
+        elif previous is None or previous[0] or previous[1][0] is not value[0] or previous[1][1] != value[1]:
+            return None
+    removed = [name for name in before if name not in after]
+    if any(not before[name][0] for name in removed):
+        return None
+    # Copied, as the build scripts keep modifying them.
+    for name, value in _get_items(env):
+        if name in changes:
+            changes[name] = pickle.loads(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+    return changes, removed
+
+
+def _apply_changes(env, changes, removed):
+    for name, value in changes.items():
+        if name[0] == "$":
+            env[name[1:]] = value
+        else:
+            setattr(env, name[1:], value)
+    for name in removed:
+        if name[0] == "$":
+            del env[name[1:]]
+        else:
+            delattr(env, name[1:])
+
+
+class _Tee:
+    def __init__(self, stream, is_error, output):
+        self.stream = stream
+        self.is_error = is_error
+        self.output = output
+
+    def write(self, text):
+        self.output.append((self.is_error, text))
+        return self.stream.write(text)
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+def open_cache(scripts, global_key=(), path=DEFAULT_PATH):
+    """
+    Enable the cache for this build. `scripts` are the build scripts the configuration depends on,
+    and `global_key` any other input of the configuration which isn't in the construction environment.
+    """
+    global _cache
+    _cache = ConfigureCache(path, scripts, global_key)
+
+
+def save_cache():
+    if _cache is not None:
+        _cache.save()
+
+
+def add_dependency(path):
+    """
+    Make the configure steps being run depend on the modification time of a file (or its absence).
+    """
+    if _cache is not None:
+        _cache.add_dependency(path)
+
+
+def run(env, name, function):
+    """
+    Call `function()`, a configure step named `name` which changes `env`, or replay it from the cache.
+    Returns the result of the function, which must be plain data for the step to be cached.
+    """
+    if _cache is None:
+        return function()
+
+    before = _snapshot(env)
+    key = hashlib.sha1(_cache.key.encode())
+    key.update(name.encode())
+    key.update(_get_state_key(before))
+    key = key.hexdigest()
+
+    entry = _cache.get(key)
+    if entry is not None:
+        for is_error, text in entry["output"]:
+            (sys.stderr if is_error else sys.stdout).write(text)
+        _apply_changes(env, entry["changes"], entry["removed"])
+        # Files the step depends on are also dependencies of the steps it's part of.
+        for path in entry["dependencies"]:
+            _cache.add_dependency(path)
+        return pickle.loads(entry["result"])
+
+    output = []
+    dependencies = {}
+    _cache.recording.append(dependencies)
+    try:
+        with contextlib.redirect_stdout(_Tee(sys.stdout, False, output)):
+            with contextlib.redirect_stderr(_Tee(sys.stderr, True, output)):
+                result = function()
+    finally:
+        _cache.recording.pop()
+
+    # The tools the configuration was made for.
+    for tool in ("CC", "CXX", "LINK", "AR"):
+        command = env.subst("$" + tool).split()
+        tool_path = shutil.which(command[0], path=env["ENV"].get("PATH")) if command else None
+        if tool_path:
+            dependencies[tool_path] = _get_mtime(tool_path)
+    for path in dependencies:
+        _cache.add_dependency(path)
+
+    changes = _get_changes(env, before)
+    if changes is not None and _is_data(result):
+        _cache.set(
+            key,
+            {
+                "changes": changes[0],
+                "removed": changes[1],
+                "result": pickle.dumps(result, pickle.HIGHEST_PROTOCOL),
+                "output": output,
+                "dependencies": dependencies,
+            },
+        )
+    return result
+
+
+def get_command_output(command, env=None, **kwargs):
+    """
+    Return the output of `subprocess.check_output(command)`, reusing it while the program is unchanged.
+    Meant for commands which describe a program, like `cc --version`.
+    """
+    if _cache is None:
+        return subprocess.check_output(command, env=env, **kwargs)
+
+    program = shutil.which(command[0], path=(env or os.environ).get("PATH")) or command[0]
+    # Unlike the configure steps, doesn't depend on the build scripts.
+    key = hashlib.sha1(pickle.dumps(("command", command, program, repr(sorted(kwargs.items()))))).hexdigest()
+    _cache.add_dependency(program)
+
+    entry = _cache.get(key)
+    if entry is not None:
+        return entry["result"]
+    result = subprocess.check_output(command, env=env, **kwargs)
+    _cache.set(key, {"result": result, "dependencies": {program: _get_mtime(program)}})
+    return result
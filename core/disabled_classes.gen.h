@@ -0,0 +1,6 @@
+/* THIS FILE IS GENERATED DO NOT EDIT */
+#ifndef DISABLED_CLASSES_GEN_H
+#define DISABLED_CLASSES_GEN_H
+
+
+#endif
@@ -0,0 +1,15 @@
+/* THIS FILE IS GENERATED DO NOT EDIT */
+#ifndef VERSION_GENERATED_GEN_H
+#define VERSION_GENERATED_GEN_H
+#define VERSION_SHORT_NAME "godot"
+#define VERSION_NAME "Godot Engine"
+#define VERSION_MAJOR 4
+#define VERSION_MINOR 3
+#define VERSION_PATCH 0
+#define VERSION_STATUS "dev"
+#define VERSION_BUILD "custom_build"
+#define VERSION_MODULE_CONFIG ""
+#define VERSION_WEBSITE "https://godotengine.org"
+#define VERSION_DOCS_BRANCH "latest"
+#define VERSION_DOCS_URL "https://docs.godotengine.org/en/" VERSION_DOCS_BRANCH
+#endif // VERSION_GENERATED_GEN_H
@@ -0,0 +1,4 @@
+/* THIS FILE IS GENERATED DO NOT EDIT */
+#include "core/version.h"
+const char *const VERSION_HASH = "272837b688ab4ec2437ff05439dfcf97103e93a5";
+const uint64_t VERSION_TIMESTAMP = 1792410655;
@@ -54,6 +54,12 @@ public:
 		int array_size;
 	};
 
+	// Variant and specialization pair, listed by generated shaders for ahead of time compilation.
+	struct VariantSpecialization {
+		int variant;
+		uint64_t specialization;
+	};
+
 protected:
 	struct TexUnitPair {
 		const char *name;
@@ -261,6 +267,235 @@ public:
 	virtual ~ShaderGLES3();
 };
 
+// Base of the shader classes generated by `gles3_builders.py`, holding the uniform setters
+// shared by all of them. `T` provides the generated `Uniforms` and `ShaderVariant` enums and
+// `DEFAULT_SPECIALIZATION`, as well as `DEFAULT_VARIANT` for shaders with a single variant
+// (so the variant can't be omitted for shaders with several variants).
+template <typename T>
+class ShaderGLES3Base : public ShaderGLES3, public T {
+public:
+	typedef typename T::Uniforms Uniforms;
+	typedef typename T::ShaderVariant ShaderVariant;
+
+	_FORCE_INLINE_ bool version_bind_shader(RID p_version, ShaderVariant p_variant = T::DEFAULT_VARIANT, uint64_t p_specialization = T::DEFAULT_SPECIALIZATION) {
+		return _version_bind_shader(p_version, p_variant, p_specialization);
+	}
+
+	_FORCE_INLINE_ int version_get_uniform(Uniforms p_uniform, RID p_version, ShaderVariant p_variant = T::DEFAULT_VARIANT, uint64_t p_specialization = T::DEFAULT_SPECIALIZATION) {
+		return _version_get_uniform(p_uniform, p_version, p_variant, p_specialization);
+	}
+
+	_FORCE_INLINE_ void version_set_uniform(Uniforms p_uniform, float p_value, RID p_version, ShaderVariant p_variant = T::DEFAULT_VARIANT, uint64_t p_specialization = T::DEFAULT_SPECIALIZATION) {
+		int location = version_get_uniform(p_uniform, p_version, p_variant, p_specialization);
+		if (location < 0) {
+			return;
+		}
+		glUniform1f(location, p_value);
+	}
+
+	_FORCE_INLINE_ void version_set_uniform(Uniforms p_uniform, double p_value, RID p_version, ShaderVariant p_variant = T::DEFAULT_VARIANT, uint64_t p_specialization = T::DEFAULT_SPECIALIZATION) {
+		int location = version_get_uniform(p_uniform, p_version, p_variant, p_specialization);
+		if (location < 0) {
+			return;
+		}
+		glUniform1f(location, p_value);
+	}
+
+	_FORCE_INLINE_ void version_set_uniform(Uniforms p_uniform, uint8_t p_value, RID p_version, ShaderVariant p_variant = T::DEFAULT_VARIANT, uint64_t p_specialization = T::DEFAULT_SPECIALIZATION) {
+		int location = version_get_uniform(p_uniform, p_version, p_variant, p_specialization);
+		if (location < 0) {
+			return;
+		}
+		glUniform1ui(location, p_value);
+	}
+
+	_FORCE_INLINE_ void version_set_uniform(Uniforms p_uniform, int8_t p_value, RID p_version, ShaderVariant p_variant = T::DEFAULT_VARIANT, uint64_t p_specialization = T::DEFAULT_SPECIALIZATION) {
+		int location = version_get_uniform(p_uniform, p_version, p_variant, p_specialization);
+		if (location < 0) {
+			return;
+		}
+		glUniform1i(location, p_value);
+	}
+
+	_FORCE_INLINE_ void version_set_uniform(Uniforms p_uniform, uint16_t p_value, RID p_version, ShaderVariant p_variant = T::DEFAULT_VARIANT, uint64_t p_specialization = T::DEFAULT_SPECIALIZATION) {
+		int location = version_get_uniform(p_uniform, p_version, p_variant, p_specialization);
+		if (location < 0) {
+			return;
+		}
+		glUniform1ui(location, p_value);
+	}
+
+	_FORCE_INLINE_ void version_set_uniform(Uniforms p_uniform, int16_t p_value, RID p_version, ShaderVariant p_variant = T::DEFAULT_VARIANT, uint64_t p_specialization = T::DEFAULT_SPECIALIZATION) {
+		int location = version_get_uniform(p_uniform, p_version, p_variant, p_specialization);
+		if (location < 0) {
+			return;
+		}
+		glUniform1i(location, p_value);
+	}
+
+	_FORCE_INLINE_ void version_set_uniform(Uniforms p_uniform, uint32_t p_value, RID p_version, ShaderVariant p_variant = T::DEFAULT_VARIANT, uint64_t p_specialization = T::DEFAULT_SPECIALIZATION) {
+		int location = version_get_uniform(p_uniform, p_version, p_variant, p_specialization);
+		if (location < 0) {
+			return;
+		}
+		glUniform1ui(location, p_value);
+	}
+
+	_FORCE_INLINE_ void version_set_uniform(Uniforms p_uniform, int32_t p_value, RID p_version, ShaderVariant p_variant = T::DEFAULT_VARIANT, uint64_t p_specialization = T::DEFAULT_SPECIALIZATION) {
+		int location = version_get_uniform(p_uniform, p_version, p_variant, p_specialization);
+		if (location < 0) {
+			return;
+		}
+		glUniform1i(location, p_value);
+	}
+
+	_FORCE_INLINE_ void version_set_uniform(Uniforms p_uniform, const Color &p_color, RID p_version, ShaderVariant p_variant = T::DEFAULT_VARIANT, uint64_t p_specialization = T::DEFAULT_SPECIALIZATION) {
+		int location = version_get_uniform(p_uniform, p_version, p_variant, p_specialization);
+		if (location < 0) {
+			return;
+		}
+		GLfloat col[4] = { p_color.r, p_color.g, p_color.b, p_color.a };
+		glUniform4fv(location, 1, col);
+	}
+
+	_FORCE_INLINE_ void version_set_uniform(Uniforms p_uniform, const Vector2 &p_vec2, RID p_version, ShaderVariant p_variant = T::DEFAULT_VARIANT, uint64_t p_specialization = T::DEFAULT_SPECIALIZATION) {
+		int location = version_get_uniform(p_uniform, p_version, p_variant, p_specialization);
+		if (location < 0) {
+			return;
+		}
+		GLfloat vec2[2] = { float(p_vec2.x), float(p_vec2.y) };
+		glUniform2fv(location, 1, vec2);
+	}
+
+	_FORCE_INLINE_ void version_set_uniform(Uniforms p_uniform, const Size2i &p_vec2, RID p_version, ShaderVariant p_variant = T::DEFAULT_VARIANT, uint64_t p_specialization = T::DEFAULT_SPECIALIZATION) {
+		int location = version_get_uniform(p_uniform, p_version, p_variant, p_specialization);
+		if (location < 0) {
+			return;
+		}
+		GLint vec2[2] = { GLint(p_vec2.x), GLint(p_vec2.y) };
+		glUniform2iv(location, 1, vec2);
+	}
+
+	_FORCE_INLINE_ void version_set_uniform(Uniforms p_uniform, const Vector3 &p_vec3, RID p_version, ShaderVariant p_variant = T::DEFAULT_VARIANT, uint64_t p_specialization = T::DEFAULT_SPECIALIZATION) {
+		int location = version_get_uniform(p_uniform, p_version, p_variant, p_specialization);
+		if (location < 0) {
+			return;
+		}
+		GLfloat vec3[3] = { float(p_vec3.x), float(p_vec3.y), float(p_vec3.z) };
+		glUniform3fv(location, 1, vec3);
+	}
+
+	_FORCE_INLINE_ void version_set_uniform(Uniforms p_uniform, const Vector4 &p_vec4, RID p_version, ShaderVariant p_variant = T::DEFAULT_VARIANT, uint64_t p_specialization = T::DEFAULT_SPECIALIZATION) {
+		int location = version_get_uniform(p_uniform, p_version, p_variant, p_specialization);
+		if (location < 0) {
+			return;
+		}
+		GLfloat vec4[4] = { float(p_vec4.x), float(p_vec4.y), float(p_vec4.z), float(p_vec4.w) };
+		glUniform4fv(location, 1, vec4);
+	}
+
+	_FORCE_INLINE_ void version_set_uniform(Uniforms p_uniform, float p_a, float p_b, RID p_version, ShaderVariant p_variant = T::DEFAULT_VARIANT, uint64_t p_specialization = T::DEFAULT_SPECIALIZATION) {
+		int location = version_get_uniform(p_uniform, p_version, p_variant, p_specialization);
+		if (location < 0) {
+			return;
+		}
+		glUniform2f(location, p_a, p_b);
+	}
+
+	_FORCE_INLINE_ void version_set_uniform(Uniforms p_uniform, float p_a, float p_b, float p_c, RID p_version, ShaderVariant p_variant = T::DEFAULT_VARIANT, uint64_t p_specialization = T::DEFAULT_SPECIALIZATION) {
+		int location = version_get_uniform(p_uniform, p_version, p_variant, p_specialization);
+		if (location < 0) {
+			return;
+		}
+		glUniform3f(location, p_a, p_b, p_c);
+	}
+
+	_FORCE_INLINE_ void version_set_uniform(Uniforms p_uniform, float p_a, float p_b, float p_c, float p_d, RID p_version, ShaderVariant p_variant = T::DEFAULT_VARIANT, uint64_t p_specialization = T::DEFAULT_SPECIALIZATION) {
+		int location = version_get_uniform(p_uniform, p_version, p_variant, p_specialization);
+		if (location < 0) {
+			return;
+		}
+		glUniform4f(location, p_a, p_b, p_c, p_d);
+	}
+
+	_FORCE_INLINE_ void version_set_uniform(Uniforms p_uniform, const Transform3D &p_transform, RID p_version, ShaderVariant p_variant = T::DEFAULT_VARIANT, uint64_t p_specialization = T::DEFAULT_SPECIALIZATION) {
+		int location = version_get_uniform(p_uniform, p_version, p_variant, p_specialization);
+		if (location < 0) {
+			return;
+		}
+
+		const Transform3D &tr = p_transform;
+
+		GLfloat matrix[16] = { /* build a 16x16 matrix */
+			(GLfloat)tr.basis.rows[0][0],
+			(GLfloat)tr.basis.rows[1][0],
+			(GLfloat)tr.basis.rows[2][0],
+			(GLfloat)0,
+			(GLfloat)tr.basis.rows[0][1],
+			(GLfloat)tr.basis.rows[1][1],
+			(GLfloat)tr.basis.rows[2][1],
+			(GLfloat)0,
+			(GLfloat)tr.basis.rows[0][2],
+			(GLfloat)tr.basis.rows[1][2],
+			(GLfloat)tr.basis.rows[2][2],
+			(GLfloat)0,
+			(GLfloat)tr.origin.x,
+			(GLfloat)tr.origin.y,
+			(GLfloat)tr.origin.z,
+			(GLfloat)1
+		};
+
+		glUniformMatrix4fv(location, 1, false, matrix);
+	}
+
+	_FORCE_INLINE_ void version_set_uniform(Uniforms p_uniform, const Transform2D &p_transform, RID p_version, ShaderVariant p_variant = T::DEFAULT_VARIANT, uint64_t p_specialization = T::DEFAULT_SPECIALIZATION) {
+		int location = version_get_uniform(p_uniform, p_version, p_variant, p_specialization);
+		if (location < 0) {
+			return;
+		}
+
+		const Transform2D &tr = p_transform;
+
+		GLfloat matrix[16] = { /* build a 16x16 matrix */
+			(GLfloat)tr.columns[0][0],
+			(GLfloat)tr.columns[0][1],
+			(GLfloat)0,
+			(GLfloat)0,
+			(GLfloat)tr.columns[1][0],
+			(GLfloat)tr.columns[1][1],
+			(GLfloat)0,
+			(GLfloat)0,
+			(GLfloat)0,
+			(GLfloat)0,
+			(GLfloat)1,
+			(GLfloat)0,
+			(GLfloat)tr.columns[2][0],
+			(GLfloat)tr.columns[2][1],
+			(GLfloat)0,
+			(GLfloat)1
+		};
+
+		glUniformMatrix4fv(location, 1, false, matrix);
+	}
+
+	_FORCE_INLINE_ void version_set_uniform(Uniforms p_uniform, const Projection &p_matrix, RID p_version, ShaderVariant p_variant = T::DEFAULT_VARIANT, uint64_t p_specialization = T::DEFAULT_SPECIALIZATION) {
+		int location = version_get_uniform(p_uniform, p_version, p_variant, p_specialization);
+		if (location < 0) {
+			return;
+		}
+
+		GLfloat matrix[16];
+
+		for (int i = 0; i < 4; i++) {
+			for (int j = 0; j < 4; j++) {
+				matrix[i * 4 + j] = p_matrix.columns[i][j];
+			}
+		}
+
+		glUniformMatrix4fv(location, 1, false, matrix);
+	}
+};
+
 #endif // GLES3_ENABLED
 
 #endif // SHADER_GLES3_H
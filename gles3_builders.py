@@ -1,8 +1,9 @@
 """Functions used to generate source files during build time"""
 
+import json
 import os.path
-from methods import print_error
-from typing import Optional
+import re
+from typing import List, Optional
 
 
 class GLES3HeaderStruct:
@@ -30,162 +31,251 @@ class GLES3HeaderStruct:
         self.specialization_values = []
 
 
+GLES3_SECTIONS = {
+    "#[modes]": "",
+    "#[specializations]": "specializations",
+    "#[vertex]": "vertex",
+    "#[fragment]": "fragment",
+}
+
+GLES3_TOKEN_RE = re.compile(r"[A-Za-z_]\w*|\S")
+
+
+def split_gles3_comments(line: str, in_block_comment: bool):
+    """Split a shader line into its code and its `//` comment, skipping `/* */` comments
+
+    :return: tuple - code, comment and whether the line ends inside a block comment
+    """
+    if not in_block_comment and line.find("/*") == -1:
+        code, _, comment = line.partition("//")
+        return code, comment, False
+
+    code = ""
+    pos = 0
+    while pos < len(line):
+        if in_block_comment:
+            end = line.find("*/", pos)
+            if end == -1:
+                return code, "", True
+            pos = end + 2
+            in_block_comment = False
+            continue
+
+        line_comment = line.find("//", pos)
+        block_comment = line.find("/*", pos)
+        if line_comment != -1 and (block_comment == -1 or line_comment < block_comment):
+            return code + line[pos:line_comment], line[line_comment + 2 :], False
+        if block_comment == -1:
+            return code + line[pos:], "", False
+        code += line[pos:block_comment] + " "
+        pos = block_comment + 2
+        in_block_comment = True
+
+    return code, "", in_block_comment
+
+
+def get_gles3_declared_names(tokens: List[str], start: int) -> List[str]:
+    """Names declared by a GLSL declaration, e.g. `a` and `b` in `highp sampler2D a, b[4];`"""
+    names = []
+    name = ""
+    depth = 0
+    for token in tokens[start:]:
+        if token == "[":
+            depth += 1
+        elif token == "]":
+            depth -= 1
+        elif depth > 0:
+            continue
+        elif token == "," or token == ";" or token == "{":
+            if name:
+                names.append(name)
+            name = ""
+            if token == "{":
+                return names
+        elif token[0] == "_" or token[0].isalpha():
+            name = token
+
+    if name:
+        names.append(name)
+    return names
+
+
+def parse_gles3_binding(filename: str, line_number: int, kind: str, value: str) -> str:
+    if kind == "texunit" and value == "auto":
+        return "-1"
+    try:
+        return str(int(value))
+    except ValueError:
+        raise ValueError(f'{filename}:{line_number}: invalid {kind} binding "{value}".') from None
+
+
+def get_gles3_stage_lines(header_data: GLES3HeaderStruct) -> Optional[List[str]]:
+    if header_data.reading == "vertex":
+        return header_data.vertex_lines
+    if header_data.reading == "fragment":
+        return header_data.fragment_lines
+    return None
+
+
 def include_file_in_gles3_header(filename: str, header_data: GLES3HeaderStruct, depth: int):
     with open(filename, "r", encoding="utf-8") as fs:
-        line = fs.readline()
-
-        while line:
-            if line.find("=") != -1 and header_data.reading == "":
+        source = fs.read()
+
+    lines = source.split("\n")
+    if source.endswith("\n"):
+        lines.pop()
+
+    stage_lines = get_gles3_stage_lines(header_data)
+    in_block_comment = False
+    line_offset = header_data.line_offset
+
+    for line_number, line in enumerate(lines, 1):
+        # Most lines are plain code, copy them without tokenizing.
+        if (
+            stage_lines is not None
+            and not in_block_comment
+            and "uniform" not in line
+            and "#[" not in line
+            and "#include" not in line
+            and "/*" not in line
+            and "tfb:" not in line
+        ):
+            stage_lines.append(line)
+            line_offset += 1
+            continue
+
+        stripped = line.strip()
+
+        if stripped.startswith("#[") and stripped.endswith("]"):
+            if stripped not in GLES3_SECTIONS:
+                raise ValueError(f'{filename}:{line_number}: unknown section "{stripped}".')
+            header_data.reading = GLES3_SECTIONS[stripped]
+            stage_lines = get_gles3_stage_lines(header_data)
+            line_offset += 1
+            if header_data.reading == "fragment":
+                header_data.fragment_offset = line_offset
+            else:
+                header_data.vertex_offset = line_offset
+            continue
+
+        eqpos = line.find("=") if stage_lines is None else -1
+        if eqpos != -1:
+            if header_data.reading == "":
                 # Mode
-                eqpos = line.find("=")
-                defname = line[:eqpos].strip().upper()
-                define = line[eqpos + 1 :].strip()
-                header_data.variant_names.append(defname)
-                header_data.variant_defines.append(define)
-                line = fs.readline()
-                header_data.line_offset += 1
-                header_data.vertex_offset = header_data.line_offset
-                continue
-
-            if line.find("=") != -1 and header_data.reading == "specializations":
+                header_data.variant_names.append(line[:eqpos].strip().upper())
+                header_data.variant_defines.append(line[eqpos + 1 :].strip())
+            else:
                 # Specialization
-                eqpos = line.find("=")
-                specname = line[:eqpos].strip()
-                specvalue = line[eqpos + 1 :]
-                header_data.specialization_names.append(specname)
-                header_data.specialization_values.append(specvalue)
-                line = fs.readline()
-                header_data.line_offset += 1
-                header_data.vertex_offset = header_data.line_offset
-                continue
+                header_data.specialization_names.append(line[:eqpos].strip())
+                header_data.specialization_values.append(line[eqpos + 1 :] + "\n")
+            line_offset += 1
+            header_data.vertex_offset = line_offset
+            continue
+
+        if stripped.startswith("#include") and not in_block_comment:
+            # The directive is replaced by the included lines, so it does not count towards the offsets.
+            includeline = stripped[len("#include") :].strip()
+            if len(includeline) < 2 or includeline[0] + includeline[-1] not in ('""', "<>"):
+                raise ValueError(f"{filename}:{line_number}: malformed #include directive.")
+            includeline = includeline[1:-1]
 
-            if line.find("#[modes]") != -1:
-                # Nothing really, just skip
-                line = fs.readline()
-                header_data.line_offset += 1
-                header_data.vertex_offset = header_data.line_offset
+            if header_data.reading == "vertex":
+                included_files = header_data.vertex_included_files
+            elif header_data.reading == "fragment":
+                included_files = header_data.fragment_included_files
+            else:
                 continue
 
-            if line.find("#[specializations]") != -1:
-                header_data.reading = "specializations"
-                line = fs.readline()
-                header_data.line_offset += 1
-                header_data.vertex_offset = header_data.line_offset
-                continue
+            included_file = os.path.relpath(os.path.dirname(filename) + "/" + includeline)
+            if included_file not in included_files:
+                if not os.path.isfile(included_file):
+                    raise ValueError(f'{filename}:{line_number}: #include "{includeline}" could not be found.')
+                included_files.append(included_file)
+                header_data.line_offset = line_offset
+                include_file_in_gles3_header(included_file, header_data, depth + 1)
+                line_offset = header_data.line_offset
+            continue
+
+        code, comment, in_block_comment = split_gles3_comments(line, in_block_comment)
+
+        if code.find("uniform") != -1:
+            tokens = GLES3_TOKEN_RE.findall(code)
+            if "uniform" in tokens:
+                names = get_gles3_declared_names(tokens, tokens.index("uniform") + 1)
+                annotation = comment.strip()
+                annotation_lower = annotation.lower()
+
+                if annotation_lower.startswith("texunit:"):
+                    # Texture unit
+                    texunit = annotation[len("texunit:") :].strip()
+                    texunit = parse_gles3_binding(filename, line_number, "texunit", texunit)
+                    for name in names:
+                        if name not in header_data.texunit_names:
+                            header_data.texunits.append((name, texunit))
+                            header_data.texunit_names.append(name)
+
+                elif annotation_lower.startswith("ubo:"):
+                    # Uniform buffer object
+                    ubo = parse_gles3_binding(filename, line_number, "ubo", annotation[len("ubo:") :].strip())
+                    for name in names:
+                        if name not in header_data.ubo_names:
+                            header_data.ubos.append((name, ubo))
+                            header_data.ubo_names.append(name)
+
+                elif "{" not in tokens and ";" in tokens:
+                    for name in names:
+                        if name not in header_data.uniforms:
+                            header_data.uniforms.append(name)
+
+        elif comment.find("tfb:") != -1 and (stripped.startswith("out ") or stripped.startswith("flat ")):
+            # Transform feedback varying
+            annotation = comment.strip()
+            if annotation.startswith("tfb:"):
+                bind = annotation[len("tfb:") :].strip()
+                for name in get_gles3_declared_names(GLES3_TOKEN_RE.findall(code), 0):
+                    header_data.feedbacks.append((name, bind))
+
+        if stage_lines is not None:
+            stage_lines.append(line)
+        line_offset += 1
+
+    header_data.line_offset = line_offset
+    return header_data
 
-            if line.find("#[vertex]") != -1:
-                header_data.reading = "vertex"
-                line = fs.readline()
-                header_data.line_offset += 1
-                header_data.vertex_offset = header_data.line_offset
-                continue
 
-            if line.find("#[fragment]") != -1:
-                header_data.reading = "fragment"
-                line = fs.readline()
-                header_data.line_offset += 1
-                header_data.fragment_offset = header_data.line_offset
-                continue
+def is_gles3_specialization_enabled(value: str) -> bool:
+    value = value.strip()
+    return value.upper() == "TRUE" or value == "1"
 
-            while line.find("#include ") != -1:
-                includeline = line.replace("#include ", "").strip()[1:-1]
-
-                included_file = os.path.relpath(os.path.dirname(filename) + "/" + includeline)
-                if not included_file in header_data.vertex_included_files and header_data.reading == "vertex":
-                    header_data.vertex_included_files += [included_file]
-                    if include_file_in_gles3_header(included_file, header_data, depth + 1) is None:
-                        print_error(f'In file "{filename}": #include "{includeline}" could not be found!"')
-                elif not included_file in header_data.fragment_included_files and header_data.reading == "fragment":
-                    header_data.fragment_included_files += [included_file]
-                    if include_file_in_gles3_header(included_file, header_data, depth + 1) is None:
-                        print_error(f'In file "{filename}": #include "{includeline}" could not be found!"')
-
-                line = fs.readline()
-
-            if line.find("uniform") != -1 and line.lower().find("texunit:") != -1:
-                # texture unit
-                texunitstr = line[line.find(":") + 1 :].strip()
-                if texunitstr == "auto":
-                    texunit = "-1"
-                else:
-                    texunit = str(int(texunitstr))
-                uline = line[: line.lower().find("//")]
-                uline = uline.replace("uniform", "")
-                uline = uline.replace("highp", "")
-                uline = uline.replace(";", "")
-                lines = uline.split(",")
-                for x in lines:
-                    x = x.strip()
-                    x = x[x.rfind(" ") + 1 :]
-                    if x.find("[") != -1:
-                        # unfiorm array
-                        x = x[: x.find("[")]
-
-                    if not x in header_data.texunit_names:
-                        header_data.texunits += [(x, texunit)]
-                        header_data.texunit_names += [x]
-
-            elif line.find("uniform") != -1 and line.lower().find("ubo:") != -1:
-                # uniform buffer object
-                ubostr = line[line.find(":") + 1 :].strip()
-                ubo = str(int(ubostr))
-                uline = line[: line.lower().find("//")]
-                uline = uline[uline.find("uniform") + len("uniform") :]
-                uline = uline.replace("highp", "")
-                uline = uline.replace(";", "")
-                uline = uline.replace("{", "").strip()
-                lines = uline.split(",")
-                for x in lines:
-                    x = x.strip()
-                    x = x[x.rfind(" ") + 1 :]
-                    if x.find("[") != -1:
-                        # unfiorm array
-                        x = x[: x.find("[")]
-
-                    if not x in header_data.ubo_names:
-                        header_data.ubos += [(x, ubo)]
-                        header_data.ubo_names += [x]
-
-            elif line.find("uniform") != -1 and line.find("{") == -1 and line.find(";") != -1:
-                uline = line.replace("uniform", "")
-                uline = uline.replace(";", "")
-                lines = uline.split(",")
-                for x in lines:
-                    x = x.strip()
-                    x = x[x.rfind(" ") + 1 :]
-                    if x.find("[") != -1:
-                        # unfiorm array
-                        x = x[: x.find("[")]
-
-                    if not x in header_data.uniforms:
-                        header_data.uniforms += [x]
-
-            if (line.strip().find("out ") == 0 or line.strip().find("flat ") == 0) and line.find("tfb:") != -1:
-                uline = line.replace("flat ", "")
-                uline = uline.replace("out ", "")
-                uline = uline.replace("highp ", "")
-                uline = uline.replace(";", "")
-                uline = uline[uline.find(" ") :].strip()
-
-                if uline.find("//") != -1:
-                    name, bind = uline.split("//")
-                    if bind.find("tfb:") != -1:
-                        name = name.strip()
-                        bind = bind.replace("tfb:", "").strip()
-                        header_data.feedbacks += [(name, bind)]
-
-            line = line.replace("\r", "")
-            line = line.replace("\n", "")
 
-            if header_data.reading == "vertex":
-                header_data.vertex_lines += [line]
-            if header_data.reading == "fragment":
-                header_data.fragment_lines += [line]
+def generate_gles3_manifest(header_data: GLES3HeaderStruct, class_name: str) -> dict:
+    """Describe the variants and specializations of a shader, so they can be compiled ahead of time
 
-            line = fs.readline()
-            header_data.line_offset += 1
+    Every variant is listed with the default specialization, which is the combination
+    used unless a feature is toggled at runtime.
 
-    return header_data
+    :param: header_data: parsed shader
+    :param: class_name: name of the generated shader class
+    :return: dict - JSON-serializable manifest
+    """
+    variants = header_data.variant_names or ["DEFAULT"]
+    default_specialization = 0
+    for i in range(len(header_data.specialization_names)):
+        if is_gles3_specialization_enabled(header_data.specialization_values[i]):
+            default_specialization |= 1 << i
+
+    return {
+        "class": class_name,
+        "variants": variants,
+        "specializations": [
+            {"name": name, "bit": 1 << i, "default": is_gles3_specialization_enabled(value)}
+            for i, (name, value) in enumerate(zip(header_data.specialization_names, header_data.specialization_values))
+        ],
+        "default_specialization": default_specialization,
+        "warmup": [{"variant": variant, "specialization": default_specialization} for variant in variants],
+        "variant_count": len(variants),
+        "combination_count": len(variants) << len(header_data.specialization_names),
+    }
 
 
 def build_gles3_header(
@@ -194,6 +284,7 @@ def build_gles3_header(
     class_suffix: str,
     optional_output_filename: Optional[str] = None,
     header_data: Optional[GLES3HeaderStruct] = None,
+    optional_manifest_filename: Optional[str] = None,
 ):
     header_data = header_data or GLES3HeaderStruct()
     include_file_in_gles3_header(filename, header_data, 0)
@@ -204,9 +295,6 @@ def build_gles3_header(
         out_file = optional_output_filename
 
     with open(out_file, "w", encoding="utf-8", newline="\n") as fd:
-        defspec = 0
-        defvariant = ""
-
         fd.write("/* WARNING, THIS FILE WAS GENERATED, DO NOT EDIT */\n")
 
         out_file_base = out_file
@@ -219,17 +307,18 @@ def build_gles3_header(
         out_file_class = (
             out_file_base.replace(".glsl.gen.h", "").title().replace("_", "").replace(".", "") + "Shader" + class_suffix
         )
+        out_file_definitions = out_file_class + "Definitions"
         fd.write("\n\n")
         fd.write('#include "' + include + '"\n\n\n')
-        fd.write("class " + out_file_class + " : public Shader" + class_suffix + " {\n\n")
 
-        fd.write("public:\n\n")
+        # Enums and defaults only, the shared `Shader<suffix>Base` template provides the
+        # `version_bind_shader`, `version_get_uniform` and `version_set_uniform` overloads.
+        fd.write("struct " + out_file_definitions + " {\n")
 
-        if header_data.uniforms:
-            fd.write("\tenum Uniforms {\n")
-            for x in header_data.uniforms:
-                fd.write("\t\t" + x.upper() + ",\n")
-            fd.write("\t};\n\n")
+        fd.write("\tenum Uniforms {\n")
+        for x in header_data.uniforms:
+            fd.write("\t\t" + x.upper() + ",\n")
+        fd.write("\t};\n\n")
 
         if header_data.variant_names:
             fd.write("\tenum ShaderVariant {\n")
@@ -237,8 +326,9 @@ def build_gles3_header(
                 fd.write("\t\t" + x + ",\n")
             fd.write("\t};\n\n")
         else:
-            fd.write("\tenum ShaderVariant { DEFAULT };\n\n")
-            defvariant = "=DEFAULT"
+            fd.write("\tenum ShaderVariant { DEFAULT };\n")
+            # Only single variant shaders can omit the variant.
+            fd.write("\tstatic constexpr ShaderVariant DEFAULT_VARIANT = DEFAULT;\n\n")
 
         if header_data.specialization_names:
             fd.write("\tenum Specializations {\n")
@@ -248,234 +338,25 @@ def build_gles3_header(
                 counter += 1
             fd.write("\t};\n\n")
 
-        for i in range(len(header_data.specialization_names)):
-            defval = header_data.specialization_values[i].strip()
-            if defval.upper() == "TRUE" or defval == "1":
-                defspec |= 1 << i
+        manifest = generate_gles3_manifest(header_data, out_file_class)
 
+        # Variant and specialization combinations, so they can be compiled ahead of time.
+        fd.write("\tstatic constexpr int VARIANT_COUNT = " + str(manifest["variant_count"]) + ";\n")
+        fd.write(
+            "\tstatic constexpr uint64_t DEFAULT_SPECIALIZATION = " + str(manifest["default_specialization"]) + ";\n"
+        )
         fd.write(
-            "\t_FORCE_INLINE_ bool version_bind_shader(RID p_version,ShaderVariant p_variant"
-            + defvariant
-            + ",uint64_t p_specialization="
-            + str(defspec)
-            + ") { return _version_bind_shader(p_version,p_variant,p_specialization); }\n\n"
+            "\tstatic constexpr uint64_t VARIANT_COMBINATION_COUNT = " + str(manifest["combination_count"]) + ";\n"
         )
+        fd.write("\tstatic constexpr Shader" + class_suffix + "::VariantSpecialization WARMUP_VARIANTS[] = {\n")
+        for x in manifest["warmup"]:
+            fd.write("\t\t{ " + x["variant"] + ", " + str(x["specialization"]) + " },\n")
+        fd.write("\t};\n")
+        fd.write("};\n\n")
 
-        if header_data.uniforms:
-            fd.write(
-                "\t_FORCE_INLINE_ int version_get_uniform(Uniforms p_uniform,RID p_version,ShaderVariant p_variant"
-                + defvariant
-                + ",uint64_t p_specialization="
-                + str(defspec)
-                + ") { return _version_get_uniform(p_uniform,p_version,p_variant,p_specialization); }\n\n"
-            )
-
-            fd.write(
-                "\t#define _FU if (version_get_uniform(p_uniform,p_version,p_variant,p_specialization)<0) return; \n\n "
-            )
-            fd.write(
-                "\t_FORCE_INLINE_ void version_set_uniform(Uniforms p_uniform, float p_value,RID p_version,ShaderVariant p_variant"
-                + defvariant
-                + ",uint64_t p_specialization="
-                + str(defspec)
-                + ") { _FU glUniform1f(version_get_uniform(p_uniform,p_version,p_variant,p_specialization),p_value); }\n\n"
-            )
-            fd.write(
-                "\t_FORCE_INLINE_ void version_set_uniform(Uniforms p_uniform, double p_value,RID p_version,ShaderVariant p_variant"
-                + defvariant
-                + ",uint64_t p_specialization="
-                + str(defspec)
-                + ") { _FU glUniform1f(version_get_uniform(p_uniform,p_version,p_variant,p_specialization),p_value); }\n\n"
-            )
-            fd.write(
-                "\t_FORCE_INLINE_ void version_set_uniform(Uniforms p_uniform, uint8_t p_value,RID p_version,ShaderVariant p_variant"
-                + defvariant
-                + ",uint64_t p_specialization="
-                + str(defspec)
-                + ") { _FU glUniform1ui(version_get_uniform(p_uniform,p_version,p_variant,p_specialization),p_value); }\n\n"
-            )
-            fd.write(
-                "\t_FORCE_INLINE_ void version_set_uniform(Uniforms p_uniform, int8_t p_value,RID p_version,ShaderVariant p_variant"
-                + defvariant
-                + ",uint64_t p_specialization="
-                + str(defspec)
-                + ") { _FU glUniform1i(version_get_uniform(p_uniform,p_version,p_variant,p_specialization),p_value); }\n\n"
-            )
-            fd.write(
-                "\t_FORCE_INLINE_ void version_set_uniform(Uniforms p_uniform, uint16_t p_value,RID p_version,ShaderVariant p_variant"
-                + defvariant
-                + ",uint64_t p_specialization="
-                + str(defspec)
-                + ") { _FU glUniform1ui(version_get_uniform(p_uniform,p_version,p_variant,p_specialization),p_value); }\n\n"
-            )
-            fd.write(
-                "\t_FORCE_INLINE_ void version_set_uniform(Uniforms p_uniform, int16_t p_value,RID p_version,ShaderVariant p_variant"
-                + defvariant
-                + ",uint64_t p_specialization="
-                + str(defspec)
-                + ") { _FU glUniform1i(version_get_uniform(p_uniform,p_version,p_variant,p_specialization),p_value); }\n\n"
-            )
-            fd.write(
-                "\t_FORCE_INLINE_ void version_set_uniform(Uniforms p_uniform, uint32_t p_value,RID p_version,ShaderVariant p_variant"
-                + defvariant
-                + ",uint64_t p_specialization="
-                + str(defspec)
-                + ") { _FU glUniform1ui(version_get_uniform(p_uniform,p_version,p_variant,p_specialization),p_value); }\n\n"
-            )
-            fd.write(
-                "\t_FORCE_INLINE_ void version_set_uniform(Uniforms p_uniform, int32_t p_value,RID p_version,ShaderVariant p_variant"
-                + defvariant
-                + ",uint64_t p_specialization="
-                + str(defspec)
-                + ") { _FU glUniform1i(version_get_uniform(p_uniform,p_version,p_variant,p_specialization),p_value); }\n\n"
-            )
-            fd.write(
-                "\t_FORCE_INLINE_ void version_set_uniform(Uniforms p_uniform, const Color& p_color,RID p_version,ShaderVariant p_variant"
-                + defvariant
-                + ",uint64_t p_specialization="
-                + str(defspec)
-                + ") { _FU GLfloat col[4]={p_color.r,p_color.g,p_color.b,p_color.a}; glUniform4fv(version_get_uniform(p_uniform,p_version,p_variant,p_specialization),1,col); }\n\n"
-            )
-            fd.write(
-                "\t_FORCE_INLINE_ void version_set_uniform(Uniforms p_uniform, const Vector2& p_vec2,RID p_version,ShaderVariant p_variant"
-                + defvariant
-                + ",uint64_t p_specialization="
-                + str(defspec)
-                + ") { _FU GLfloat vec2[2]={float(p_vec2.x),float(p_vec2.y)}; glUniform2fv(version_get_uniform(p_uniform,p_version,p_variant,p_specialization),1,vec2); }\n\n"
-            )
-            fd.write(
-                "\t_FORCE_INLINE_ void version_set_uniform(Uniforms p_uniform, const Size2i& p_vec2,RID p_version,ShaderVariant p_variant"
-                + defvariant
-                + ",uint64_t p_specialization="
-                + str(defspec)
-                + ") { _FU GLint vec2[2]={GLint(p_vec2.x),GLint(p_vec2.y)}; glUniform2iv(version_get_uniform(p_uniform,p_version,p_variant,p_specialization),1,vec2); }\n\n"
-            )
-            fd.write(
-                "\t_FORCE_INLINE_ void version_set_uniform(Uniforms p_uniform, const Vector3& p_vec3,RID p_version,ShaderVariant p_variant"
-                + defvariant
-                + ",uint64_t p_specialization="
-                + str(defspec)
-                + ") { _FU GLfloat vec3[3]={float(p_vec3.x),float(p_vec3.y),float(p_vec3.z)}; glUniform3fv(version_get_uniform(p_uniform,p_version,p_variant,p_specialization),1,vec3); }\n\n"
-            )
-            fd.write(
-                "\t_FORCE_INLINE_ void version_set_uniform(Uniforms p_uniform, const Vector4& p_vec4,RID p_version,ShaderVariant p_variant"
-                + defvariant
-                + ",uint64_t p_specialization="
-                + str(defspec)
-                + ") { _FU GLfloat vec4[4]={float(p_vec4.x),float(p_vec4.y),float(p_vec4.z),float(p_vec4.w)}; glUniform4fv(version_get_uniform(p_uniform,p_version,p_variant,p_specialization),1,vec4); }\n\n"
-            )
-            fd.write(
-                "\t_FORCE_INLINE_ void version_set_uniform(Uniforms p_uniform, float p_a, float p_b,RID p_version,ShaderVariant p_variant"
-                + defvariant
-                + ",uint64_t p_specialization="
-                + str(defspec)
-                + ") { _FU glUniform2f(version_get_uniform(p_uniform,p_version,p_variant,p_specialization),p_a,p_b); }\n\n"
-            )
-            fd.write(
-                "\t_FORCE_INLINE_ void version_set_uniform(Uniforms p_uniform, float p_a, float p_b, float p_c,RID p_version,ShaderVariant p_variant"
-                + defvariant
-                + ",uint64_t p_specialization="
-                + str(defspec)
-                + ") { _FU glUniform3f(version_get_uniform(p_uniform,p_version,p_variant,p_specialization),p_a,p_b,p_c); }\n\n"
-            )
-            fd.write(
-                "\t_FORCE_INLINE_ void version_set_uniform(Uniforms p_uniform, float p_a, float p_b, float p_c, float p_d,RID p_version,ShaderVariant p_variant"
-                + defvariant
-                + ",uint64_t p_specialization="
-                + str(defspec)
-                + ") { _FU glUniform4f(version_get_uniform(p_uniform,p_version,p_variant,p_specialization),p_a,p_b,p_c,p_d); }\n\n"
-            )
-
-            fd.write(
-                """\t_FORCE_INLINE_ void version_set_uniform(Uniforms p_uniform, const Transform3D& p_transform,RID p_version,ShaderVariant p_variant"""
-                + defvariant
-                + """,uint64_t p_specialization="""
-                + str(defspec)
-                + """) {  _FU
-
-                const Transform3D &tr = p_transform;
-
-                GLfloat matrix[16]={ /* build a 16x16 matrix */
-                    (GLfloat)tr.basis.rows[0][0],
-                    (GLfloat)tr.basis.rows[1][0],
-                    (GLfloat)tr.basis.rows[2][0],
-                    (GLfloat)0,
-                    (GLfloat)tr.basis.rows[0][1],
-                    (GLfloat)tr.basis.rows[1][1],
-                    (GLfloat)tr.basis.rows[2][1],
-                    (GLfloat)0,
-                    (GLfloat)tr.basis.rows[0][2],
-                    (GLfloat)tr.basis.rows[1][2],
-                    (GLfloat)tr.basis.rows[2][2],
-                    (GLfloat)0,
-                    (GLfloat)tr.origin.x,
-                    (GLfloat)tr.origin.y,
-                    (GLfloat)tr.origin.z,
-                    (GLfloat)1
-                };
-
-                        glUniformMatrix4fv(version_get_uniform(p_uniform,p_version,p_variant,p_specialization),1,false,matrix);
-
-            }
-
-            """
-            )
-
-            fd.write(
-                """_FORCE_INLINE_ void version_set_uniform(Uniforms p_uniform, const Transform2D& p_transform,RID p_version,ShaderVariant p_variant"""
-                + defvariant
-                + """,uint64_t p_specialization="""
-                + str(defspec)
-                + """) {  _FU
-
-                const Transform2D &tr = p_transform;
-
-            GLfloat matrix[16]={ /* build a 16x16 matrix */
-                (GLfloat)tr.columns[0][0],
-                (GLfloat)tr.columns[0][1],
-                (GLfloat)0,
-                (GLfloat)0,
-                (GLfloat)tr.columns[1][0],
-                (GLfloat)tr.columns[1][1],
-                (GLfloat)0,
-                (GLfloat)0,
-                (GLfloat)0,
-                (GLfloat)0,
-                (GLfloat)1,
-                (GLfloat)0,
-                (GLfloat)tr.columns[2][0],
-                (GLfloat)tr.columns[2][1],
-                (GLfloat)0,
-                (GLfloat)1
-            };
-
-                glUniformMatrix4fv(version_get_uniform(p_uniform,p_version,p_variant,p_specialization),1,false,matrix);
-
-            }
-
-            """
-            )
-
-            fd.write(
-                """_FORCE_INLINE_ void version_set_uniform(Uniforms p_uniform, const Projection& p_matrix, RID p_version, ShaderVariant p_variant"""
-                + defvariant
-                + """,uint64_t p_specialization="""
-                + str(defspec)
-                + """) {  _FU
-
-                GLfloat matrix[16];
-
-                for (int i = 0; i < 4; i++) {
-                    for (int j = 0; j < 4; j++) {
-                        matrix[i * 4 + j] = p_matrix.columns[i][j];
-                    }
-                }
-
-                glUniformMatrix4fv(version_get_uniform(p_uniform, p_version, p_variant, p_specialization), 1, false, matrix);
-        }"""
-            )
-
-            fd.write("\n\n#undef _FU\n\n\n")
+        fd.write(
+            "class " + out_file_class + " : public Shader" + class_suffix + "Base<" + out_file_definitions + "> {\n\n"
+        )
 
         fd.write("protected:\n\n")
 
@@ -590,7 +471,23 @@ def build_gles3_header(
         fd.write("};\n\n")
         fd.write("#endif\n\n")
 
+    if optional_manifest_filename is not None:
+        with open(optional_manifest_filename, "w", encoding="utf-8", newline="\n") as fd:
+            json.dump(manifest, fd, indent=4)
+            fd.write("\n")
+
 
 def build_gles3_headers(target, source, env):
     for x in source:
-        build_gles3_header(str(x), include="drivers/gles3/shader_gles3.h", class_suffix="GLES3")
+        build_gles3_header(
+            str(x),
+            include="drivers/gles3/shader_gles3.h",
+            class_suffix="GLES3",
+            optional_manifest_filename=str(x) + ".gen.json",
+        )
+
+
+def gles3_manifest_emitter(target, source, env):
+    # The variant manifest is written next to each generated header.
+    target += [x.abspath + ".gen.json" for x in source]
+    return target, source
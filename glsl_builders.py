@@ -1,8 +1,9 @@
 """Functions used to generate source files during build time"""
 
 import os.path
+import re
 from methods import print_error
-from typing import Optional, Iterable
+from typing import Optional, Iterable, List
 
 
 def generate_inline_code(input_lines: Iterable[str], insert_newline: bool = True):
@@ -31,6 +32,13 @@ class RDHeaderStruct:
         self.fragment_included_files = []
         self.compute_included_files = []
 
+        # Segments are [source, chunk, start, end] ranges over the stage lines, where `source`
+        # is the included file the lines come from (empty for the shader file itself) and
+        # `chunk` counts the `#include` directives already seen in that file.
+        self.vertex_segments = []
+        self.fragment_segments = []
+        self.compute_segments = []
+
         self.reading = ""
         self.line_offset = 0
         self.vertex_offset = 0
@@ -38,7 +46,22 @@ class RDHeaderStruct:
         self.compute_offset = 0
 
 
+def track_rd_segment(segments: list, line_count: int, source: str, chunk: int) -> None:
+    last = segments[-1] if segments else None
+    if last is not None and last[0] == source and last[1] == chunk and last[3] == line_count - 1:
+        last[3] = line_count
+    else:
+        segments.append([source, chunk, line_count - 1, line_count])
+
+
+def get_rd_include_symbol(source: str, chunk: int) -> str:
+    return "_rd_include_" + re.sub(r"[^0-9A-Za-z]", "_", source) + "_" + str(chunk)
+
+
 def include_file_in_rd_header(filename: str, header_data: RDHeaderStruct, depth: int) -> RDHeaderStruct:
+    source = os.path.relpath(filename) if depth > 0 else ""
+    chunk = 0
+
     with open(filename, "r", encoding="utf-8") as fs:
         line = fs.readline()
 
@@ -90,16 +113,20 @@ def include_file_in_rd_header(filename: str, header_data: RDHeaderStruct, depth:
                     if include_file_in_rd_header(included_file, header_data, depth + 1) is None:
                         print_error(f'In file "{filename}": #include "{includeline}" could not be found!"')
 
+                chunk += 1
                 line = fs.readline()
 
             line = line.replace("\r", "").replace("\n", "")
 
             if header_data.reading == "vertex":
                 header_data.vertex_lines += [line]
+                track_rd_segment(header_data.vertex_segments, len(header_data.vertex_lines), source, chunk)
             if header_data.reading == "fragment":
                 header_data.fragment_lines += [line]
+                track_rd_segment(header_data.fragment_segments, len(header_data.fragment_lines), source, chunk)
             if header_data.reading == "compute":
                 header_data.compute_lines += [line]
+                track_rd_segment(header_data.compute_segments, len(header_data.compute_lines), source, chunk)
 
             line = fs.readline()
             header_data.line_offset += 1
@@ -107,8 +134,36 @@ def include_file_in_rd_header(filename: str, header_data: RDHeaderStruct, depth:
     return header_data
 
 
+def generate_rd_segments_code(stage: str, lines: List[str], segments: list, externs: List[str]) -> List[str]:
+    """Generate the code for a stage split into segments, referencing shared include segments
+
+    :param: stage: name of the stage, used to name the generated arrays
+    :param: lines: all the lines of the stage
+    :param: segments: segments of the stage, as tracked in `RDHeaderStruct`
+    :param: externs: list of shared include symbols, extended with the ones referenced here
+    :return: List[str] - array declarations, the last one being the null-terminated segment list
+    """
+    parts = []
+    references = []
+    for source, chunk, start, end in segments:
+        if source:
+            symbol = get_rd_include_symbol(source, chunk)
+            if symbol not in externs:
+                externs.append(symbol)
+        else:
+            symbol = "_%s_code_%d" % (stage, len(parts))
+            parts.append("static const char %s[] = {\n%s\n\t\t};" % (symbol, generate_inline_code(lines[start:end])))
+        references.append(symbol)
+    references.append("nullptr")
+    parts.append("static const char *const _%s_segments[] = { %s };" % (stage, ", ".join(references)))
+    return parts
+
+
 def build_rd_header(
-    filename: str, optional_output_filename: Optional[str] = None, header_data: Optional[RDHeaderStruct] = None
+    filename: str,
+    optional_output_filename: Optional[str] = None,
+    header_data: Optional[RDHeaderStruct] = None,
+    shared_includes: bool = False,
 ) -> None:
     header_data = header_data or RDHeaderStruct()
     include_file_in_rd_header(filename, header_data, 0)
@@ -124,7 +179,25 @@ def build_rd_header(
     out_file_ifdef = out_file_base.replace(".", "_").upper()
     out_file_class = out_file_base.replace(".glsl.gen.h", "").title().replace("_", "").replace(".", "") + "ShaderRD"
 
-    if header_data.compute_lines:
+    externs = []
+
+    if shared_includes:
+        # Included files are referenced from the shared TU written by `build_rd_shared_includes`,
+        # `ShaderRD::setup` concatenates the segments back at load time.
+        if header_data.compute_lines:
+            body_parts = generate_rd_segments_code(
+                "compute", header_data.compute_lines, header_data.compute_segments, externs
+            )
+            body_parts.append(f'setup(nullptr, nullptr, _compute_segments, "{out_file_class}");')
+        else:
+            body_parts = generate_rd_segments_code(
+                "vertex", header_data.vertex_lines, header_data.vertex_segments, externs
+            )
+            body_parts += generate_rd_segments_code(
+                "fragment", header_data.fragment_lines, header_data.fragment_segments, externs
+            )
+            body_parts.append(f'setup(_vertex_segments, _fragment_segments, nullptr, "{out_file_class}");')
+    elif header_data.compute_lines:
         body_parts = [
             "static const char _compute_code[] = {\n%s\n\t\t};" % generate_inline_code(header_data.compute_lines),
             f'setup(nullptr, nullptr, _compute_code, "{out_file_class}");',
@@ -137,6 +210,9 @@ def build_rd_header(
         ]
 
     body_content = "\n\t\t".join(body_parts)
+    extern_content = "".join(f"extern const char {symbol}[];\n" for symbol in externs)
+    if extern_content:
+        extern_content = "\n" + extern_content
 
     # Intended curly brackets are doubled so f-string doesn't eat them up.
     shader_template = f"""/* WARNING, THIS FILE WAS GENERATED, DO NOT EDIT */
@@ -144,7 +220,7 @@ def build_rd_header(
 #define {out_file_ifdef}_RD
 
 #include "servers/rendering/renderer_rd/shader_rd.h"
-
+{extern_content}
 class {out_file_class} : public ShaderRD {{
 
 public:
@@ -167,6 +243,47 @@ def build_rd_headers(target, source, env):
         build_rd_header(filename=str(x))
 
 
+def build_rd_headers_shared(target, source, env):
+    for x in source:
+        build_rd_header(filename=str(x), shared_includes=True)
+
+
+def rd_shared_headers_emitter(target, source, env):
+    # Keep track of every shader using shared includes, so the SCsub emitting
+    # the shared TU can list them all as its sources.
+    env.rd_shared_shader_sources.extend(source)
+    return target, source
+
+
+def build_rd_shared_include(filenames: Iterable[str], out_file: str) -> None:
+    segments = {}
+    for filename in filenames:
+        header_data = RDHeaderStruct()
+        include_file_in_rd_header(filename, header_data, 0)
+        for lines, stage_segments in [
+            (header_data.vertex_lines, header_data.vertex_segments),
+            (header_data.fragment_lines, header_data.fragment_segments),
+            (header_data.compute_lines, header_data.compute_segments),
+        ]:
+            for source, chunk, start, end in stage_segments:
+                if source:
+                    segments.setdefault(get_rd_include_symbol(source, chunk), lines[start:end])
+
+    shared_include_template = "/* WARNING, THIS FILE WAS GENERATED, DO NOT EDIT */\n"
+    for symbol in sorted(segments):
+        shared_include_template += "\nextern const char %s[] = {\n%s\n};\n" % (
+            symbol,
+            generate_inline_code(segments[symbol]),
+        )
+
+    with open(out_file, "w", encoding="utf-8", newline="\n") as fd:
+        fd.write(shared_include_template)
+
+
+def build_rd_shared_includes(target, source, env):
+    build_rd_shared_include([str(x) for x in source], str(target[0]))
+
+
 class RAWHeaderStruct:
     def __init__(self):
         self.code = ""
@@ -0,0 +1,315 @@
+"""Functions used to reuse the include scanning of C and C++ files between builds (include_cache)
+
+On each build, SCons reads the `#include` lines of every source file and header, and looks for the files they
+name in the include search path (`CPPPATH`). With the cache, the include names found in a file are kept in bin/
+by the hash of its content, and the files they resolved to by file and search path, with every path which was
+tried on the way. A scan is reused when the content of the file is unchanged and each of these paths still
+has (or still hasn't) a file, so the dependencies are the same as when scanning again. Unlike the
+`--implicit-cache` of `fast_unsafe`, headers added earlier in the search path and changes of `CPPPATH` are seen.
+
+Files are only read again when their size or modification time changed, like SCons does to compute their
+content signature. The files of the previous build are checked in parallel while the SCsub files are read.
+"""
+
+import hashlib
+import os
+import pickle
+import sys
+import threading
+import time
+
+import SCons.Node.FS
+import SCons.Scanner
+import SCons.Tool
+import SCons.Util
+import SCons.Warnings
+
+# Relative to the godot folder, next to the build results.
+DEFAULT_PATH = "bin/include_cache.pickle"
+
+# Entries unused by this many of the builds saving the cache are dropped, so switching between a few
+# configurations keeps them all.
+MAX_UNUSED_BUILDS = 8
+
+_format_version = 1
+# Files modified this close to when they were read may have changed again within the resolution of their
+# modification time, so they're read again on the next build.
+_mtime_margin = 2 * 1000 * 1000 * 1000
+# The regular expression of the C and C++ scanner of SCons.
+_include_regex = SCons.Tool.CScanner.cre
+
+_cache = None
+
+
+def _get_stat(path):
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+class IncludeCache:
+    def __init__(self, path=None, jobs=1):
+        self.path = path
+        # In nanoseconds like the modification times, time.time_ns() needs Python 3.7.
+        self.time = int(time.time() * 1000 * 1000 * 1000)
+        self.builds = 0
+        # `{path: (stat, digest)}`, with `stat` as `(mtime, size)`, or `None` if it can't be trusted.
+        self.files = {}
+        # The include names found in the files, as `{digest: includes}`.
+        self.includes = {}
+        # `{(path, search_path): (digest, absent, found, missing)}`, where `absent` are the paths tried before
+        # finding the `found` files, and `missing` the names of the includes which weren't found.
+        self.scans = {}
+        # The build which last used an entry of `files` or `scans`, by key.
+        self.last_used = {}
+        self.used = set()
+        self.dirty = False
+        self.hits = 0
+        self.misses = 0
+
+        # Valid for this build only.
+        self._checked = {}
+        self._prefetched = {}
+        self._probes = {}
+        self._nodes = {}
+        self._search_paths = {}
+        self._stopped = False
+
+        if path:
+            try:
+                with open(path, "rb") as f:
+                    cache = pickle.load(f)
+                if cache["version"] == _format_version:
+                    self.builds = cache["builds"]
+                    self.files = cache["files"]
+                    self.includes = cache["includes"]
+                    self.scans = cache["scans"]
+                    self.last_used = cache["last_used"]
+            except Exception:
+                # Missing, or written by an incompatible version of the build scripts.
+                pass
+
+        paths = list(self.files)
+        for i in range(min(jobs, len(paths))):
+            threading.Thread(target=self._prefetch, args=(paths[i::jobs],), daemon=True).start()
+
+    def _prefetch(self, paths):
+        for path in paths:
+            if self._stopped:
+                return
+            try:
+                self._prefetched[path] = self._check_file(path)
+            except OSError:
+                pass
+
+    def _check_file(self, path):
+        """
+        Return `(stat, digest, includes)` for a file, with `includes` as `None` when already known by digest.
+        """
+        stat = _get_stat(path)
+        entry = self.files.get(path)
+        if entry is not None and entry[0] == stat and entry[1] in self.includes:
+            return stat, entry[1], None
+        with open(path, "rb") as f:
+            data = f.read()
+        digest = hashlib.sha1(data).hexdigest()
+        if digest in self.includes:
+            return stat, digest, None
+        return stat, digest, tuple(_include_regex.findall(SCons.Util.to_Text(data)))
+
+    def get_digest(self, node):
+        """
+        Return the hash of the content of a file node, or `None` if it can't be read.
+        """
+        path = node.get_abspath()
+        digest = self._checked.get(path)
+        if digest is not None:
+            return digest
+        try:
+            result = self._prefetched.pop(path, None)
+            # Generated files may have been written since, and other files can't be trusted if changed since.
+            if result is None or node.has_builder() or _get_stat(path) != result[0]:
+                result = self._check_file(path)
+        except OSError:
+            return None
+
+        stat, digest, includes = result
+        if includes is not None:
+            self.includes[digest] = includes
+        if stat[0] > self.time - _mtime_margin:
+            stat = None
+        if self.files.get(path) != (stat, digest):
+            self.files[path] = (stat, digest)
+            self.dirty = True
+        self.used.add(path)
+        self._checked[path] = digest
+        return digest
+
+    def get_search_path(self, path):
+        """
+        Return the absolute paths of the folders of a search path, from a tuple of folder nodes.
+        """
+        search_path = self._search_paths.get(path)
+        if search_path is None:
+            search_path = tuple(folder.get_abspath() for folder in path)
+            self._search_paths[path] = search_path
+        return search_path
+
+    def probe(self, fs, path):
+        """
+        Return whether an include resolves to this path, like `SCons.Node.FS.find_file()`: there is a file on
+        disk, or a file to be built.
+        """
+        found = self._probes.get(path)
+        if found is None:
+            # Looked up without creating a node, which would change what is found on later scans.
+            node = fs.Top.root._lookupDict.get(SCons.Node.FS._my_normcase(path))
+            if isinstance(node, SCons.Node.FS.Dir):
+                found = False
+            elif node is not None and node.is_derived():
+                found = True
+            else:
+                found = os.path.isfile(path)
+            self._probes[path] = found
+        return found
+
+    def get(self, fs, key, digest):
+        """
+        Return the scan stored for `(path, search_path)` as `(found, missing)`, if it's still valid.
+        """
+        entry = self.scans.get(key)
+        if entry is None or entry[0] != digest:
+            return None
+        probe = self.probe
+        for path in entry[1]:
+            if probe(fs, path):
+                return None
+        for path in entry[2]:
+            if not probe(fs, path):
+                return None
+        self.used.add(key)
+        return entry[2], entry[3]
+
+    def set(self, key, digest, absent, found, missing):
+        self.scans[key] = (digest, absent, found, missing)
+        self.used.add(key)
+        self.dirty = True
+
+    def get_node(self, fs, path):
+        node = self._nodes.get(path)
+        if node is None:
+            node = fs.File(path)
+            self._nodes[path] = node
+        return node
+
+    def save(self):
+        self._stopped = True
+        if not self.path:
+            return
+        # Also saved when only reusing entries, to keep them from being dropped.
+        if not self.dirty and all(self.last_used.get(key) == self.builds for key in self.used):
+            return
+        self.builds += 1
+        for key in self.used:
+            self.last_used[key] = self.builds
+        for key, build in list(self.last_used.items()):
+            if build <= self.builds - MAX_UNUSED_BUILDS:
+                del self.last_used[key]
+                self.files.pop(key, None)
+                self.scans.pop(key, None)
+        digests = {entry[1] for entry in self.files.values()}
+        self.includes = {digest: includes for digest, includes in self.includes.items() if digest in digests}
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            cache = {
+                "version": _format_version,
+                "builds": self.builds,
+                "files": self.files,
+                "includes": self.includes,
+                "scans": self.scans,
+                "last_used": self.last_used,
+            }
+            pickle.dump(cache, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, self.path)
+        self.dirty = False
+
+
+class IncludeScanner(SCons.Scanner.ClassicCPP):
+    """
+    The C and C++ scanner of SCons, reusing the scans stored in an `IncludeCache`.
+    """
+
+    def __init__(self, cache):
+        super().__init__("CScanner", "$CPPSUFFIXES", "CPPPATH", _include_regex.pattern)
+        self.cache = cache
+
+    def scan(self, node, path=()):
+        if callable(path):
+            path = path()
+        cache = self.cache
+        digest = cache.get_digest(node)
+        if digest is None:
+            return super().scan(node, path)
+
+        source_path = node.get_abspath()
+        search_path = cache.get_search_path(path)
+        key = (source_path, search_path)
+        stored = cache.get(node.fs, key, digest)
+        if stored is not None:
+            cache.hits += 1
+            found, missing = stored
+            for name in missing:
+                SCons.Warnings.warn(
+                    SCons.Warnings.DependencyWarning,
+                    "No dependency generated for file: %s (included from: %s) -- file not found" % (name, node),
+                )
+            return [cache.get_node(node.fs, found_path) for found_path in found]
+
+        cache.misses += 1
+        includes = cache.includes[digest]
+        if node.includes is None:
+            node.includes = list(includes)
+        nodes = super().scan(node, path)
+
+        # Find the same files by probing the paths, to store what the scan depends on.
+        source_dir = os.path.dirname(source_path)
+        absent = {}
+        found = []
+        missing = []
+        for include in includes:
+            folders = (source_dir,) + search_path if include[0] == '"' else search_path + (source_dir,)
+            for folder in folders:
+                include_path = sys.intern(os.path.normpath(os.path.join(folder, include[1])))
+                if cache.probe(node.fs, include_path):
+                    found.append((self.sort_key(include), include_path))
+                    break
+                absent[include_path] = None
+            else:
+                missing.append(include[1])
+        found = tuple(include_path for sort_key, include_path in sorted(found))
+        # Only stored when probing agrees with SCons, so the scan isn't reused in cases it handles differently.
+        if found == tuple(n.get_abspath() for n in nodes):
+            cache.set(key, digest, tuple(absent), found, tuple(missing))
+        return nodes
+
+
+def open_cache(path=None, jobs=1):
+    """
+    Use the include cache for the C and C++ files of this build, kept in `path` if given.
+    """
+    global _cache
+    _cache = IncludeCache(path, jobs)
+    scanner = IncludeScanner(_cache)
+    for suffix in SCons.Tool.CSuffixes:
+        SCons.Tool.SourceFileScanner.add_scanner(suffix, scanner)
+    return _cache
+
+
+def get_cache():
+    return _cache
+
+
+def save_cache():
+    if _cache is not None:
+        _cache.save()
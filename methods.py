@@ -1,8 +1,11 @@
 import os
 import sys
 import re
+import fnmatch
 import glob
+import struct
 import subprocess
+import zlib
 from collections import OrderedDict
 from collections.abc import Mapping
 from enum import Enum
@@ -10,23 +13,17 @@ from typing import Iterator
 from pathlib import Path
 from os.path import normpath, basename
 
+import source_index
+
 # Get the "Godot" folder name ahead of time
 base_folder_path = str(os.path.abspath(Path(__file__).parent)) + "/"
 base_folder_only = os.path.basename(os.path.normpath(base_folder_path))
-# Listing all the folders we have converted
-# for SCU in scu_builders.py
-_scu_folders = set()
 # Colors are disabled in non-TTY environments such as pipes. This means
 # that if output is redirected to a file, it won't contain color codes.
 # Colors are always enabled on continuous integration.
 _colorize = bool(sys.stdout.isatty() or os.environ.get("CI"))
 
 
-def set_scu_folders(scu_folders):
-    global _scu_folders
-    _scu_folders = scu_folders
-
-
 class ANSI(Enum):
     """
     Enum class for adding ansi colorcodes directly into strings.
@@ -85,7 +82,7 @@ def add_source_files_orig(self, sources, files, allow_gen=False):
             # They should instead be added manually.
             skip_gen_cpp = "*" in files
             dir_path = self.Dir(".").abspath
-            files = sorted(glob.glob(dir_path + "/" + files))
+            files = sorted(source_index.get_index().glob(dir_path + "/" + files))
             if skip_gen_cpp and not allow_gen:
                 files = [f for f in files if not f.endswith(".gen.cpp")]
 
@@ -98,9 +95,8 @@ def add_source_files_orig(self, sources, files, allow_gen=False):
         sources.append(obj)
 
 
-# The section name is used for checking
-# the hash table to see whether the folder
-# is included in the SCU build.
+# The section name is the folder relative to the godot folder,
+# which the SCU files are generated for.
 # It will be something like "core/math".
 def _find_scu_section_name(subdir):
     section_path = os.path.abspath(subdir) + "/"
@@ -127,9 +123,43 @@ def _find_scu_section_name(subdir):
     return section_name
 
 
-def add_source_files_scu(self, sources, files, allow_gen=False):
+def _add_file_list_scu(self, sources, files, allow_gen, scu_exceptions, scu_limit):
+    # Source paths relative to the godot folder.
+    paths = {}
+    for file in files:
+        if file.startswith("#"):
+            path = file[1:]
+        else:
+            path = os.path.relpath(self.File(file).srcnode().abspath, base_folder_path)
+        if path.startswith(".."):
+            return False
+        paths[file] = Path(path).as_posix()
+
+    import scu_builders
+
+    for extension in ["c", "cpp"]:
+        selected = [file for file in files if file.endswith("." + extension)]
+        generated = scu_builders.process_files([paths[file] for file in selected], scu_exceptions, scu_limit, extension)
+        if generated is not None:
+            add_source_files_orig(self, sources, generated, True)
+            files = [file for file in files if file not in selected]
+
+    # Other files, like assembly, are built as usual.
+    add_source_files_orig(self, sources, files, allow_gen)
+    return True
+
+
+def add_source_files_scu(self, sources, files, allow_gen=False, scu=None, scu_exceptions=[], scu_limit=0):
+    if self["scu_build"] and isinstance(files, list) and scu:
+        return _add_file_list_scu(self, sources, files, allow_gen, scu_exceptions, scu_limit)
+
     if self["scu_build"] and isinstance(files, str):
-        if "*." not in files:
+        if "*." not in files or files.startswith("#"):
+            return False
+
+        # Any folder adding all its C or C++ sources with a wildcard is built using SCU files.
+        extension = files[files.rindex("*.") + 2 :]
+        if extension not in ["cpp", "c"]:
             return False
 
         # If the files are in a subdirectory, we want to create the scu gen
@@ -138,23 +168,34 @@ def add_source_files_scu(self, sources, files, allow_gen=False):
         if subdir != "":
             subdir += "/"
 
+        # Folders outside of the godot folder (like custom modules elsewhere) are built as usual.
+        if not (os.path.abspath(subdir) + "/").startswith(base_folder_path):
+            return False
+
+        # The section name will be something like "core/math".
         section_name = _find_scu_section_name(subdir)
-        # if the section name is in the hash table?
-        # i.e. is it part of the SCU build?
-        global _scu_folders
-        if section_name not in (_scu_folders):
+
+        import scu_builders
+
+        # Folders without sources are left to the regular build.
+        generated = scu_builders.process_folder([section_name], scu_exceptions, scu_limit, extension)
+        if generated is None:
             return False
 
-        # Add all the gen.cpp files in the SCU directory
-        add_source_files_orig(self, sources, subdir + "scu/scu_*.gen.cpp", True)
+        # Add all the gen files in the SCU directory
+        add_source_files_orig(self, sources, generated, True)
         return True
     return False
 
 
 # Either builds the folder using the SCU system,
 # or reverts to regular build.
-def add_source_files(self, sources, files, allow_gen=False):
-    if not add_source_files_scu(self, sources, files, allow_gen):
+# With "scu" set to False, the folder is never built using SCU files. A list of files (like the
+# sources of a thirdparty library) is only built using SCU files with "scu" set to True.
+# "scu_exceptions" and "scu_limit" are the files (without extension) which must be compiled
+# on their own, and the max includes per SCU file of the folder, see scu_builders.process_folder().
+def add_source_files(self, sources, files, allow_gen=False, scu=None, scu_exceptions=[], scu_limit=0):
+    if scu is False or not add_source_files_scu(self, sources, files, allow_gen, scu, scu_exceptions, scu_limit):
         # Wraps the original function when scu build is not active.
         add_source_files_orig(self, sources, files, allow_gen)
         return False
@@ -267,16 +308,150 @@ def get_version_info(module_version_string="", silent=False):
     # Get the UNIX timestamp of the build commit.
     if os.path.exists(".git"):
         try:
-            version_info["git_timestamp"] = subprocess.check_output(
-                ["git", "log", "-1", "--pretty=format:%ct", githash]
-            ).decode("utf-8")
-        except (subprocess.CalledProcessError, OSError):
-            # `git` not found in PATH.
-            pass
+            # Read from the commit object, faster than running `git`.
+            version_info["git_timestamp"] = get_git_commit_timestamp(gitfolder, githash)
+        except (KeyError, OSError, ValueError, zlib.error):
+            try:
+                version_info["git_timestamp"] = subprocess.check_output(
+                    ["git", "log", "-1", "--pretty=format:%ct", githash]
+                ).decode("utf-8")
+            except (subprocess.CalledProcessError, OSError):
+                # `git` not found in PATH.
+                pass
 
     return version_info
 
 
+def _read_git_pack_object(pack_path, offset, objects_folder):
+    """Returns the type and data of the object at `offset` in a Git pack file, applying deltas."""
+    with open(pack_path, "rb") as f:
+        f.seek(offset)
+        byte = f.read(1)[0]
+        object_type = (byte >> 4) & 7
+        while byte & 0x80:
+            byte = f.read(1)[0]
+
+        base = None
+        if object_type == 6:  # OFS_DELTA, the base is earlier in the same pack.
+            byte = f.read(1)[0]
+            base_offset = byte & 0x7F
+            while byte & 0x80:
+                byte = f.read(1)[0]
+                base_offset = ((base_offset + 1) << 7) | (byte & 0x7F)
+            base = _read_git_pack_object(pack_path, offset - base_offset, objects_folder)
+        elif object_type == 7:  # REF_DELTA, the base is another object.
+            base = _read_git_object(objects_folder, f.read(20).hex())
+
+        decompressor = zlib.decompressobj()
+        data = b""
+        while not decompressor.eof:
+            chunk = f.read(65536)
+            if not chunk:
+                raise ValueError("Truncated Git pack file.")
+            data += decompressor.decompress(chunk)
+
+    if base is None:
+        return {1: "commit", 2: "tree", 3: "blob", 4: "tag"}[object_type], data
+
+    def read_size(position):
+        size = shift = 0
+        while True:
+            byte = data[position]
+            position += 1
+            size |= (byte & 0x7F) << shift
+            shift += 7
+            if not byte & 0x80:
+                return size, position
+
+    base_type, base_data = base
+    position = read_size(read_size(0)[1])[1]
+    result = bytearray()
+    while position < len(data):
+        op = data[position]
+        position += 1
+        if op & 0x80:  # Copy from the base object.
+            copy_offset = copy_size = 0
+            for i in range(4):
+                if op & (1 << i):
+                    copy_offset |= data[position] << (8 * i)
+                    position += 1
+            for i in range(3):
+                if op & (0x10 << i):
+                    copy_size |= data[position] << (8 * i)
+                    position += 1
+            result += base_data[copy_offset : copy_offset + (copy_size or 0x10000)]
+        elif op:  # Insert new data.
+            result += data[position : position + op]
+            position += op
+        else:
+            raise ValueError("Invalid Git delta.")
+    return base_type, bytes(result)
+
+
+def _find_in_git_pack_index(index_path, object_hash):
+    """Returns the offset of an object in the pack of a version 2 Git pack index, or `None`."""
+    with open(index_path, "rb") as f:
+        if f.read(8) != b"\377tOc\0\0\0\2":
+            raise ValueError("Unsupported Git pack index.")
+        fanout = struct.unpack(">256I", f.read(1024))
+        count = fanout[255]
+        low = fanout[object_hash[0] - 1] if object_hash[0] else 0
+        high = fanout[object_hash[0]]
+        while low < high:
+            middle = (low + high) // 2
+            f.seek(1032 + middle * 20)
+            current = f.read(20)
+            if current < object_hash:
+                low = middle + 1
+            elif current > object_hash:
+                high = middle
+            else:
+                f.seek(1032 + count * 24 + middle * 4)
+                offset = struct.unpack(">I", f.read(4))[0]
+                if offset & 0x80000000:  # Offsets past 2 GiB are in a separate table.
+                    f.seek(1032 + count * 28 + (offset & 0x7FFFFFFF) * 8)
+                    offset = struct.unpack(">Q", f.read(8))[0]
+                return offset
+    return None
+
+
+def _read_git_object(objects_folder, object_hash):
+    """Returns the type and data of a loose or packed object of a Git repository."""
+    path = os.path.join(objects_folder, object_hash[:2], object_hash[2:])
+    if os.path.isfile(path):
+        with open(path, "rb") as f:
+            header, _, data = zlib.decompress(f.read()).partition(b"\0")
+        return header.split(b" ")[0].decode(), data
+
+    for index_path in glob.glob(os.path.join(objects_folder, "pack", "*.idx")):
+        offset = _find_in_git_pack_index(index_path, bytes.fromhex(object_hash))
+        if offset is not None:
+            return _read_git_pack_object(index_path[:-4] + ".pack", offset, objects_folder)
+    raise KeyError(object_hash)
+
+
+def get_git_commit_timestamp(gitfolder, githash):
+    """Returns the committer UNIX timestamp of a commit, read from the objects of the Git repository."""
+    if len(githash) != 40:
+        raise ValueError("Only SHA-1 Git repositories are supported.")
+
+    # Worktrees share the objects of the main repository.
+    objects_folder = os.path.join(gitfolder, "objects")
+    if os.path.isfile(os.path.join(gitfolder, "commondir")):
+        with open(os.path.join(gitfolder, "commondir"), "r", encoding="utf-8") as file:
+            objects_folder = os.path.join(gitfolder, file.readline().strip(), "objects")
+
+    object_type, data = _read_git_object(objects_folder, githash)
+    if object_type != "commit":
+        raise ValueError(f"Git object {githash} is not a commit.")
+    for line in data.split(b"\n"):
+        if line.startswith(b"committer "):
+            return int(line.rsplit(b" ", 2)[1])
+        if not line:
+            break
+    raise ValueError(f"Git commit {githash} has no committer.")
+
+
 _cleanup_env = None
 _cleanup_bool = False
 
@@ -312,6 +487,7 @@ def write_file_if_needed(path, string):
 
     with open(path, "w", encoding="utf-8", newline="\n") as f:
         f.write(string)
+    source_index.add_file(path)
 
 
 def generate_version_header(module_version_string=""):
@@ -419,18 +595,19 @@ def detect_modules(search_path, recursive=False):
         # Prevent recursively detecting modules in self and other
         # Godot sources when using `custom_modules` build option.
         version_path = os.path.join(path, "version.py")
-        if os.path.exists(version_path):
+        if source_index.get_index().isfile(version_path):
             with open(version_path) as f:
                 if 'short_name = "godot"' in f.read():
                     return True
         return False
 
     def get_files(path):
-        files = glob.glob(os.path.join(path, "*"))
+        listing = source_index.get_index().listdir(path)
+        if listing is None:
+            return []
         # Sort so that `register_module_types` does not change that often,
         # and plugins are registered in alphabetic order as well.
-        files.sort()
-        return files
+        return sorted(os.path.join(path, name) for name in listing[0] + listing[1] if not name.startswith("."))
 
     if not recursive:
         if is_module(search_path):
@@ -447,7 +624,7 @@ def detect_modules(search_path, recursive=False):
             if is_module(path):
                 add_module(path)
             for child in get_files(path):
-                if not os.path.isdir(child):
+                if not source_index.get_index().isdir(child):
                     continue
                 if is_engine(child):
                     continue
@@ -456,11 +633,12 @@ def detect_modules(search_path, recursive=False):
 
 
 def is_module(path):
-    if not os.path.isdir(path):
+    listing = source_index.get_index().listdir(path)
+    if listing is None:
         return False
     must_exist = ["register_types.h", "SCsub", "config.py"]
     for f in must_exist:
-        if not os.path.exists(os.path.join(path, f)):
+        if f not in listing[1]:
             return False
     return True
 
@@ -902,10 +1080,12 @@ def detect_darwin_sdk_path(platform, env):
 
 
 def is_vanilla_clang(env):
+    import configure_cache
+
     if not using_clang(env):
         return False
     try:
-        version = subprocess.check_output([env.subst(env["CXX"]), "--version"]).strip().decode("utf-8")
+        version = configure_cache.get_command_output([env.subst(env["CXX"]), "--version"]).strip().decode("utf-8")
     except (subprocess.CalledProcessError, OSError):
         print_warning("Couldn't parse CXX environment variable to infer compiler version.")
         return False
@@ -920,6 +1100,8 @@ def get_compiler_version(env):
     - metadata1, metadata2: Extra information
     - date: Date of the build
     """
+    import configure_cache
+
     ret = {
         "major": -1,
         "minor": -1,
@@ -939,7 +1121,7 @@ def get_compiler_version(env):
         # Clang used to return hardcoded 4.2.1: # https://reviews.llvm.org/D56803
         try:
             version = (
-                subprocess.check_output([env.subst(env["CXX"]), "--version"], shell=(os.name == "nt"))
+                configure_cache.get_command_output([env.subst(env["CXX"]), "--version"], shell=(os.name == "nt"))
                 .strip()
                 .decode("utf-8")
             )
@@ -1011,7 +1193,7 @@ def show_progress(env):
         return
 
     import sys
-    from SCons.Script import Progress, Command, AlwaysBuild
+    from SCons.Script import Progress
 
     screen = sys.stdout
     # Progress reporting is not available in non-TTY environments since it
@@ -1023,20 +1205,27 @@ def show_progress(env):
     node_count_fname = str(env.Dir("#")) + "/.scons_node_count"
 
     import time, math
+    import build_telemetry
+    import scons_cache
 
     class cache_progress:
         # The default is 1 GB cache and 12 hours half life
         def __init__(self, path=None, limit=1073741824, half_life=43200):
             self.path = path
             self.limit = limit
-            self.exponent_scale = math.log(2) / half_life
-            if env["verbose"] and path != None:
-                screen.write(
-                    "Current cache limit is {} (used: {})\n".format(
-                        self.convert_size(limit), self.convert_size(self.get_size(path))
+            self.index = None
+            if path != None:
+                self.index = scons_cache.get_index(path, half_life)
+                if env.scons_version < (4, 0, 0):
+                    # Cache reads and writes are only indexed with a custom CacheDir class.
+                    self.index.refresh()
+                if env["verbose"]:
+                    screen.write(
+                        "Current cache limit is {} (used: {})\n".format(
+                            self.convert_size(limit), self.convert_size(self.index.get_size())
+                        )
                     )
-                )
-            self.delete(self.file_list())
+            self.prune()
 
         def __call__(self, node, *args, **kw):
             nonlocal node_count, node_count_max, node_count_interval, node_count_fname, show_progress
@@ -1053,44 +1242,15 @@ def show_progress(env):
                     screen.write("\r[Initial build] ")
                     screen.flush()
 
-        def delete(self, files):
-            if len(files) == 0:
+        def prune(self):
+            if self.index is None:
+                # Nothing to do
                 return
-            if env["verbose"]:
+            # The index of the cache gives the least valuable entries without listing the cache.
+            files = self.index.prune(self.limit)
+            if len(files) > 0 and env["verbose"]:
                 # Utter something
                 screen.write("\rPurging %d %s from cache...\n" % (len(files), len(files) > 1 and "files" or "file"))
-            [os.remove(f) for f in files]
-
-        def file_list(self):
-            if self.path is None:
-                # Nothing to do
-                return []
-            # Gather a list of (filename, (size, atime)) within the
-            # cache directory
-            file_stat = [(x, os.stat(x)[6:8]) for x in glob.glob(os.path.join(self.path, "*", "*"))]
-            if file_stat == []:
-                # Nothing to do
-                return []
-            # Weight the cache files by size (assumed to be roughly
-            # proportional to the recompilation time) times an exponential
-            # decay since the ctime, and return a list with the entries
-            # (filename, size, weight).
-            current_time = time.time()
-            file_stat = [(x[0], x[1][0], (current_time - x[1][1])) for x in file_stat]
-            # Sort by the most recently accessed files (most sensible to keep) first
-            file_stat.sort(key=lambda x: x[2])
-            # Search for the first entry where the storage limit is
-            # reached
-            sum, mark = 0, None
-            for i, x in enumerate(file_stat):
-                sum += x[1]
-                if sum > self.limit:
-                    mark = i
-                    break
-            if mark is None:
-                return []
-            else:
-                return [x[0] for x in file_stat[mark:]]
 
         def convert_size(self, size_bytes):
             if size_bytes == 0:
@@ -1101,20 +1261,48 @@ def show_progress(env):
             s = round(size_bytes / p, 2)
             return "%s %s" % (int(s) if i == 0 else s, size_name[i])
 
-        def get_size(self, start_path="."):
-            total_size = 0
-            for dirpath, dirnames, filenames in os.walk(start_path):
-                for f in filenames:
-                    fp = os.path.join(dirpath, f)
-                    total_size += os.path.getsize(fp)
-            return total_size
+        def print_stats(self):
+            # Summary of the cache hits and misses of the build, with the time saved estimated from the
+            # durations in the telemetry database, see record_build_telemetry().
+            durations, _ = build_telemetry.get_target_costs(
+                build_telemetry.DEFAULT_DATABASE, options=get_build_options_key(env)
+            )
+            stats = scons_cache.stats.get_summary(durations)
+            if stats["hits"] + stats["misses"] == 0:
+                return
+            screen.write(
+                "Cache: {} hits ({} remote), {} misses, {:.1f}% hit rate, retrieved {}, stored {}.\n".format(
+                    stats["hits"],
+                    stats["remote_hits"],
+                    stats["misses"],
+                    stats["hit_rate"] * 100,
+                    self.convert_size(stats["bytes_retrieved"]),
+                    self.convert_size(stats["bytes_stored"]),
+                )
+            )
+            if stats["time_saved"]:
+                screen.write(
+                    "Cache: saved about {:.0f} s of build time ({} hits never built with `build_telemetry`).\n".format(
+                        stats["time_saved"], stats["hits_without_duration"]
+                    )
+                )
+            if env["verbose"]:
+                for folder, misses in stats["misses_by_folder"]:
+                    screen.write("Cache: {} misses in {}\n".format(misses, folder or "."))
+            if env["cache_stats"]:
+                from json import dump
+
+                with open(env["cache_stats"], "w", encoding="utf-8", newline="\n") as f:
+                    dump(stats, f, indent=4)
 
-    def progress_finish(target, source, env):
+    def progress_finish():
         nonlocal node_count, progressor
         try:
             with open(node_count_fname, "w", encoding="utf-8", newline="\n") as f:
                 f.write("%d\n" % node_count)
-            progressor.delete(progressor.file_list())
+            progressor.prune()
+            if progressor.index is not None:
+                progressor.print_stats()
         except Exception:
             pass
 
@@ -1131,8 +1319,361 @@ def show_progress(env):
     progressor = cache_progress(cache_directory, cache_limit)
     Progress(progressor, interval=node_count_interval)
 
-    progress_finish_command = Command("progress_finish", [], progress_finish)
-    AlwaysBuild(progress_finish_command)
+    # At exit, once everything is built and pushed to the cache.
+    import atexit
+
+    atexit.register(progress_finish)
+
+
+def get_build_category(node):
+    # The kind of work which builds a node: "cache fetch", "compile", "link" or "generator".
+    if node.cached:
+        return "cache fetch"
+    name = node.get_builder().get_name(node.get_build_env()) if node.has_builder() else ""
+    if name in ["Object", "StaticObject", "SharedObject"]:
+        return "compile"
+    if name in ["Program", "Library", "StaticLibrary", "SharedLibrary", "LoadableModule"]:
+        return "link"
+    return "generator"
+
+
+def add_build_task_listener(listener):
+    # Calls "listener(task, start_time, end_time)" after each build task ran, in the thread of its job.
+    import time
+    from SCons.Node.FS import Dir
+    from SCons.Script.Main import BuildTask
+
+    execute = BuildTask.execute
+
+    def execute_listened(self):
+        start_time = time.perf_counter()
+        try:
+            execute(self)
+        finally:
+            # Directories are only created, or are the default target.
+            if not isinstance(self.targets[0], Dir):
+                listener(self, start_time, time.perf_counter())
+
+    BuildTask.execute = execute_listened
+
+
+def record_build_trace(env, path):
+    # Records when and in which job each target is built, to the Chrome trace event format.
+    # Open the file with https://ui.perfetto.dev or chrome://tracing to see the parallelism of the build.
+    if env["ninja"]:
+        # Ninja runs the build itself, and has its own `.ninja_log`.
+        return
+
+    import atexit
+    import json
+    import threading
+    import time
+
+    start_time = time.perf_counter()
+    events = []
+    jobs = {}
+    lock = threading.Lock()
+
+    def trace_task(task, task_start_time, task_end_time):
+        node = task.targets[0]
+        with lock:
+            # Each thread running tasks is a job slot.
+            job = jobs.setdefault(threading.get_ident(), len(jobs))
+            events.append(
+                {
+                    "name": str(node),
+                    "cat": get_build_category(node),
+                    "ph": "X",
+                    "ts": round((task_start_time - start_time) * 1000000),
+                    "dur": round((task_end_time - task_start_time) * 1000000),
+                    "pid": 0,
+                    "tid": job,
+                    "args": {"targets": [str(target) for target in task.targets]},
+                }
+            )
+
+    def write_build_trace():
+        trace_events = [{"name": "process_name", "ph": "M", "pid": 0, "args": {"name": "SCons"}}]
+        for job in range(len(jobs)):
+            trace_events.append(
+                {"name": "thread_name", "ph": "M", "pid": 0, "tid": job, "args": {"name": f"Job {job}"}}
+            )
+        with open(path, "w", encoding="utf-8", newline="\n") as f:
+            json.dump({"traceEvents": trace_events + events, "displayTimeUnit": "ms"}, f)
+        print(f"Build trace of {len(events)} targets written to: {path}")
+
+    add_build_task_listener(trace_task)
+    atexit.register(write_build_trace)
+
+
+def get_build_options_key(env):
+    # The options which change what is built, to compare builds with each other.
+    from SCons.Script import ARGUMENTS
+
+    ignored = [
+        "build_telemetry",
+        "build_trace",
+        "progress",
+        "verbose",
+        "num_jobs",
+        "cache_stats",
+        "critical_path_scheduling",
+        "jobs_memory",
+        "scu_hot_files",
+        "configure_cache",
+        "source_index_cache",
+        "include_cache",
+    ]
+    options = {"platform": env["platform"], "target": env["target"], "arch": env["arch"]}
+    options.update({key: value for key, value in ARGUMENTS.items() if key not in ignored})
+    return " ".join(f"{key}={value}" for key, value in sorted(options.items()))
+
+
+def record_build_telemetry(env, path):
+    # Appends the duration, cache use, size and peak memory of each built target to the
+    # telemetry database, see build_telemetry.py and misc/scripts/build_telemetry_report.py.
+    if env["ninja"]:
+        return
+
+    import atexit
+    import threading
+    import time
+    import build_telemetry
+
+    start_time = time.time()
+    targets = []
+    lock = threading.Lock()
+    # Peak memory of the commands run by the current job.
+    job_memory = threading.local()
+
+    if hasattr(os, "wait4"):
+        # Commands are spawned through this function on POSIX platforms, wait4() also gives their peak memory.
+        import resource
+        import SCons.Platform.posix
+
+        def exec_subprocess(command, command_env):
+            proc = subprocess.Popen(command, env=command_env, close_fds=True)
+            _, status, rusage = os.wait4(proc.pid, 0)
+            # Like os.waitstatus_to_exitcode(), which needs Python 3.9.
+            proc.returncode = os.WEXITSTATUS(status) if os.WIFEXITED(status) else -os.WTERMSIG(status)
+            # The peak memory of a child includes the memory of SCons when it was forked,
+            # only values above it are known to be the command's.
+            own_peak_memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            if rusage.ru_maxrss > own_peak_memory:
+                # Linux reports kibibytes, macOS bytes.
+                peak_memory = rusage.ru_maxrss if sys.platform == "darwin" else rusage.ru_maxrss * 1024
+                job_memory.peak = max(getattr(job_memory, "peak", 0), peak_memory)
+            return proc.returncode
+
+        SCons.Platform.posix.exec_subprocess = exec_subprocess
+
+    def record_task(task, task_start_time, task_end_time):
+        node = task.targets[0]
+        peak_memory = getattr(job_memory, "peak", 0) or None
+        job_memory.peak = 0
+        try:
+            size = os.path.getsize(node.get_abspath())
+        except OSError:
+            size = None
+        source = str(node.sources[0]) if node.sources else None
+        with lock:
+            targets.append(
+                (
+                    str(node),
+                    source,
+                    get_build_category(node),
+                    task_end_time - task_start_time,
+                    1 if node.cached else 0,
+                    size,
+                    peak_memory,
+                )
+            )
+
+    def write_build_telemetry():
+        if not targets:
+            return
+        commit_hash = get_version_info(silent=True)["git_hash"]
+        build_telemetry.record_build(
+            path,
+            commit_hash,
+            get_build_options_key(env),
+            env.GetOption("num_jobs"),
+            start_time,
+            time.time() - start_time,
+            targets,
+        )
+
+    add_build_task_listener(record_task)
+    atexit.register(write_build_telemetry)
+
+
+def get_critical_paths(targets, durations, default_duration=0):
+    # The longest time from the start of each node to the end of the build, through the nodes which
+    # depend on it, from the durations of the targets in previous builds by name.
+    # Targets with a builder but no recorded duration are assumed to take "default_duration".
+    parents = {}
+    order = []
+    visited = set()
+    stack = [(node, False) for node in targets]
+    while stack:
+        node, expanded = stack.pop()
+        if expanded:
+            order.append(node)
+            continue
+        if node in visited:
+            continue
+        visited.add(node)
+        stack.append((node, True))
+        for child in node.children(scan=False):
+            parents.setdefault(child, []).append(node)
+            if child not in visited:
+                stack.append((child, False))
+
+    # Children come before their parents in "order", so it's walked from the top targets down.
+    critical_paths = {}
+    for node in reversed(order):
+        if node.has_builder():
+            duration = durations.get(str(node), default_duration)
+        else:
+            duration = 0
+        critical_paths[node] = duration + max((critical_paths[p] for p in parents.get(node, [])), default=0)
+
+    return critical_paths
+
+
+def schedule_critical_path(env, path):
+    # Starts the ready targets with the longest critical path first instead of in the order of the
+    # dependency graph, so a long compile doesn't start last and keep the build running on one job.
+    # Durations come from the telemetry database, see record_build_telemetry().
+    if env["ninja"]:
+        return
+
+    import heapq
+    import itertools
+    import statistics
+    import build_telemetry
+    from SCons.Taskmaster import Taskmaster
+
+    durations, _ = build_telemetry.get_target_costs(path, options=get_build_options_key(env))
+    if not durations:
+        print_warning(f'No build durations in "{path}" to schedule by, build with `build_telemetry=yes` first.')
+        return
+    default_duration = statistics.median(durations.values())
+    order = itertools.count()
+
+    next_task = Taskmaster.next_task
+    stop = Taskmaster.stop
+
+    def next_critical_task(self):
+        if not hasattr(self, "critical_paths"):
+            self.critical_paths = get_critical_paths(self.original_top, durations, default_duration)
+            self.ready_tasks = []
+
+        # Gather all the tasks which are ready, the graph order still decides between equal paths.
+        task = next_task(self)
+        while task is not None:
+            critical_path = self.critical_paths.get(task.node, default_duration)
+            heapq.heappush(self.ready_tasks, (-critical_path, next(order), task))
+            task = next_task(self)
+
+        if not self.ready_tasks:
+            return None
+        return heapq.heappop(self.ready_tasks)[2]
+
+    def stop_critical(self):
+        stop(self)
+        # Drop the ready tasks which weren't started, they must not be left as pending children
+        # or they are reported as dependency cycles at the end of the build.
+        for _, _, task in getattr(self, "ready_tasks", []):
+            task.postprocess()
+        self.ready_tasks = []
+
+    Taskmaster.next_task = next_critical_task
+    Taskmaster.stop = stop_critical
+
+
+def throttle_job_memory(env, path, memory_limit):
+    # Delays the ready jobs which would take the estimated peak memory of the running jobs above
+    # "memory_limit" bytes, while lighter jobs keep starting, instead of lowering the number of jobs.
+    # Memory comes from the telemetry database (see record_build_telemetry()) or is estimated by the kind
+    # of job. A job too heavy for the limit on its own still runs when no other job does.
+    if env["ninja"]:
+        return
+
+    import build_telemetry
+    import scu_builders
+    from SCons.Script.Main import BuildTask
+    from SCons.Taskmaster import Taskmaster
+
+    _, target_memory = build_telemetry.get_target_costs(path, options=get_build_options_key(env))
+    default_memory = {
+        "link": (8 if env["lto"] == "full" else 2 if env["lto"] != "none" else 1) * 1024**3,
+        "generator": 64 * 1024**2,
+    }
+
+    def estimate_memory(node):
+        if str(node) in target_memory:
+            return target_memory[str(node)]
+        category = get_build_category(node)
+        if category == "compile":
+            try:
+                return scu_builders.estimate_compile_memory(str(node.sources[0]))
+            except (IndexError, OSError):
+                # Generated sources which don't exist yet.
+                return scu_builders._base_compile_memory
+        return default_memory.get(category, 0)
+
+    next_task = Taskmaster.next_task
+    stop = Taskmaster.stop
+    postprocess = BuildTask.postprocess
+
+    def next_admitted_task(self):
+        if not hasattr(self, "admitted_memory"):
+            # Estimated memory of the tasks returned and not post-processed yet, and the (memory, task)
+            # of the tasks which are ready but wait for memory, in the order they became ready.
+            self.admitted_memory = {}
+            self.delayed_tasks = []
+        used_memory = sum(self.admitted_memory.values())
+
+        task = None
+        for i, (memory, delayed_task) in enumerate(self.delayed_tasks):
+            if used_memory + memory <= memory_limit:
+                task = self.delayed_tasks.pop(i)[1]
+                break
+
+        while task is None:
+            task = next_task(self)
+            if task is None:
+                break
+            memory = estimate_memory(task.node)
+            if used_memory + memory > memory_limit:
+                self.delayed_tasks.append((memory, task))
+                task = None
+
+        if task is None:
+            if self.admitted_memory or not self.delayed_tasks:
+                # Running jobs will free memory, or the build is done.
+                return None
+            memory, task = self.delayed_tasks.pop(0)
+
+        self.admitted_memory[task] = memory
+        return task
+
+    def postprocess_admitted(self):
+        postprocess(self)
+        getattr(self.tm, "admitted_memory", {}).pop(self, None)
+
+    def stop_admitted(self):
+        stop(self)
+        # Drop the delayed tasks, they must not be left as pending children
+        # or they are reported as dependency cycles at the end of the build.
+        for _, task in getattr(self, "delayed_tasks", []):
+            task.postprocess()
+        self.delayed_tasks = []
+
+    Taskmaster.next_task = next_admitted_task
+    Taskmaster.stop = stop_admitted
+    BuildTask.postprocess = postprocess_admitted
 
 
 def dump(env):
@@ -1167,15 +1708,33 @@ def dump(env):
 #   scons vsproj=yes vsproj_gen_only=yes
 def generate_vs_project(env, original_args, project_name="godot"):
     # Augmented glob_recursive that also fills the dirs argument with traversed directories that have content.
-    def glob_recursive_2(pattern, dirs, node="."):
-        from SCons import Node
-        from SCons.Script import Glob
+    # Like SCons' Glob(), matches the files on disk, listed from the snapshot of the godot folder, and the
+    # SCons nodes of the folder, like targets which aren't built yet.
+    def glob_recursive_2(pattern, dirs, node=".", scons_dir=None):
+        from SCons.Node.FS import Dir
+
+        if scons_dir is None and node == ".":
+            scons_dir = env.Dir("#")
 
         results = []
-        for f in Glob(str(node) + "/*", source=True):
-            if type(f) is Node.FS.Dir:
-                results += glob_recursive_2(pattern, dirs, f)
-        r = Glob(str(node) + "/" + pattern, source=True)
+        subdirs, files = source_index.get_index().listdir(node) or ([], [])
+        subdirs = set(subdirs)
+        names = set(files)
+        scons_entries = {}
+        if scons_dir is not None:
+            for key, entry in scons_dir.entries.items():
+                if key in [".", ".."]:
+                    continue
+                scons_entries[entry.name] = entry
+                (subdirs if isinstance(entry, Dir) else names).add(entry.name)
+        for name in sorted(subdirs):
+            if name.startswith("."):
+                continue
+            child = scons_entries.get(name)
+            path = name if node == "." else os.path.join(node, name)
+            results += glob_recursive_2(pattern, dirs, path, child if isinstance(child, Dir) else None)
+        matches = sorted(n for n in fnmatch.filter(names, pattern) if not n.startswith("."))
+        r = [n if node == "." else os.path.join(node, n) for n in matches]
         if len(r) > 0 and not str(node) in dirs:
             d = ""
             for part in str(node).split("\\"):
@@ -1232,9 +1791,9 @@ def generate_vs_project(env, original_args, project_name="godot"):
     vs_configuration = {}
     common_build_prefix = []
     confs = []
-    for x in sorted(glob.glob("platform/*")):
+    for x in sorted(source_index.get_index().glob("platform/*")):
         # Only platforms that opt in to vs proj generation are included.
-        if not os.path.isdir(x) or not os.path.exists(x + "/msvs.py"):
+        if not source_index.get_index().isdir(x) or not source_index.get_index().isfile(x + "/msvs.py"):
             continue
         tmppath = "./" + x
         sys.path.insert(0, tmppath)
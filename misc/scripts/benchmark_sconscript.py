@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Measures how long SCons takes to read the SConstruct and SCsub files, before building anything.
+
+    benchmark_sconscript.py [--runs <count>] [--cold] [-- <scons options>]
+
+Each run is `scons -h --debug=time` with the given options, from the godot folder. With `--cold`, the
+filesystem cache of the operating system is dropped before each run, like the first build after a reboot.
+This needs root on Linux. For example, to compare listing the source files on every build with reusing the
+snapshot of the previous build:
+
+    benchmark_sconscript.py --cold -- source_index_cache=no
+    benchmark_sconscript.py --cold -- source_index_cache=yes
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+base_folder_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..")
+
+
+def drop_filesystem_cache():
+    if sys.platform != "linux":
+        sys.exit("--cold is only supported on Linux.")
+    subprocess.run(["sync"], check=True)
+    try:
+        with open("/proc/sys/vm/drop_caches", "w") as f:
+            f.write("3\n")
+    except OSError as e:
+        sys.exit(f"Could not drop the filesystem cache, --cold needs root: {e}")
+
+
+def read_sconscripts(scons_args):
+    """
+    Return the time in seconds SCons spent reading the SConstruct and SCsub files.
+    """
+    process = subprocess.run(
+        ["scons", "-h", "--debug=time"] + scons_args,
+        cwd=base_folder_path,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        encoding="utf-8",
+    )
+    match = re.search(r"Total SConscript file execution time: ([\d.]+) seconds", process.stdout)
+    if process.returncode != 0 or match is None:
+        sys.exit(f"SCons failed:\n{process.stdout}{process.stderr}")
+    return float(match.group(1))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the time SCons takes to read the build scripts.")
+    parser.add_argument("--runs", type=int, default=5, help="Number of measured runs (default: 5).")
+    parser.add_argument("--cold", action="store_true", help="Drop the filesystem cache before each run.")
+    parser.add_argument("scons_args", nargs="*", help="Options passed to SCons, after `--`.")
+    args = parser.parse_args()
+
+    # Not measured, so the caches of the build (configuration, source files) are up to date.
+    read_sconscripts(args.scons_args)
+
+    times = []
+    for _ in range(args.runs):
+        if args.cold:
+            drop_filesystem_cache()
+        times.append(read_sconscripts(args.scons_args))
+
+    cache = "cold" if args.cold else "warm"
+    print(f"SConscript read time, {cache} filesystem cache, {args.runs} runs:")
+    print(f"  min: {min(times):.3f} s, median: {statistics.median(times):.3f} s, max: {max(times):.3f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Reports on the build telemetry database recorded by `scons build_telemetry=yes`.
+
+    build_telemetry_report.py slowest
+    build_telemetry_report.py regressions <base commit> <head commit>
+    build_telemetry_report.py growth
+"""
+
+import argparse
+import os
+import sys
+from contextlib import closing
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+
+import build_telemetry
+
+
+def format_size(size):
+    if size is None:
+        return "-"
+    for unit in ["B", "KiB", "MiB"]:
+        if size < 1024:
+            return f"{size:.0f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report on the build telemetry database.")
+    parser.add_argument(
+        "--database",
+        default=build_telemetry.DEFAULT_DATABASE,
+        help=f"Path to the database (default: {build_telemetry.DEFAULT_DATABASE}).",
+    )
+    parser.add_argument("--limit", type=int, default=20, help="Number of targets to list (default: 20).")
+    subparsers = parser.add_subparsers(dest="report")
+    # Not passed to add_subparsers(), which only takes it since Python 3.7.
+    subparsers.required = True
+    subparsers.add_parser("slowest", help="The targets which took the longest to build in their latest build.")
+    regressions = subparsers.add_parser("regressions", help="The targets which got slower between two commits.")
+    regressions.add_argument("base", help="Commit (or its abbreviation) to compare against.")
+    regressions.add_argument("head", help="Commit (or its abbreviation) to compare.")
+    growth = subparsers.add_parser("growth", help="The targets whose build time grew the fastest over builds.")
+    growth.add_argument("--min-builds", type=int, default=3, help="Builds needed to fit a trend (default: 3).")
+    args = parser.parse_args()
+
+    if not os.path.isfile(args.database):
+        print(f'ERROR: "{args.database}" not found, build with `build_telemetry=yes` first.')
+        sys.exit(1)
+
+    with closing(build_telemetry.open_database(args.database)) as connection:
+        if args.report == "slowest":
+            print(f"{'Time':>9} {'Size':>10} {'Memory':>10}  Target")
+            for target, duration, size, peak_memory in build_telemetry.get_slowest_targets(connection, args.limit):
+                print(f"{duration:8.2f}s {format_size(size):>10} {format_size(peak_memory):>10}  {target}")
+        elif args.report == "regressions":
+            print(f"{'Base':>9} {'Head':>9} {'Change':>9}  Target")
+            rows = build_telemetry.get_regressions(connection, args.base, args.head, args.limit)
+            for target, base_duration, head_duration in rows:
+                change = head_duration - base_duration
+                print(f"{base_duration:8.2f}s {head_duration:8.2f}s {change:+8.2f}s  {target}")
+        elif args.report == "growth":
+            print(f"{'Growth':>14} {'Latest':>9}  Target")
+            for target, slope, latest in build_telemetry.get_growing_targets(connection, args.limit, args.min_builds):
+                print(f"{slope:+8.3f}s/build {latest:8.2f}s  {target}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Serves a SCons cache folder over HTTP, to share it between machines with `SCONS_CACHE_URL`.
+
+    scons_cache_server.py --directory <cache folder> [--bind <address>] [--port <port>]
+
+Builds then use it with `SCONS_CACHE=<local cache folder> SCONS_CACHE_URL=http://<address>:<port>`.
+The folder can also be used as a local `SCONS_CACHE` on the machine running the server.
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+
+import scons_cache
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a SCons cache folder over HTTP.")
+    parser.add_argument("--directory", required=True, help="The cache folder, created if missing.")
+    parser.add_argument("--bind", default="127.0.0.1", help="Address to listen on (default: 127.0.0.1).")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on (default: 8765).")
+    parser.add_argument("--quiet", action="store_true", help="Don't log the requests.")
+    args = parser.parse_args()
+
+    os.makedirs(args.directory, exist_ok=True)
+    scons_cache.CacheRequestHandler.directory = os.path.abspath(args.directory)
+    scons_cache.CacheRequestHandler.quiet = args.quiet
+
+    server = scons_cache.CacheServer((args.bind, args.port), scons_cache.CacheRequestHandler)
+    print(f'Serving "{args.directory}" at http://{args.bind}:{server.server_port}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -32,16 +32,6 @@ def get_opts():
     ]
 
 
-def get_doc_classes():
-    return [
-        "EditorExportPlatformAndroid",
-    ]
-
-
-def get_doc_path():
-    return "doc_classes"
-
-
 # Return the ANDROID_HOME environment variable.
 def get_env_android_sdk_root():
     return os.environ.get("ANDROID_HOME", os.environ.get("ANDROID_SDK_ROOT", ""))
@@ -1,8 +1,9 @@
 import os
 import platform
+import shutil
 import sys
 from methods import print_warning, print_error, get_compiler_version, using_gcc
-from platform_methods import detect_arch
+from platform_methods import detect_arch, PkgConfig
 
 from typing import TYPE_CHECKING
 
@@ -18,8 +19,7 @@ def can_build():
     if os.name != "posix" or sys.platform == "darwin":
         return False
 
-    pkgconf_error = os.system("pkg-config --version > /dev/null")
-    if pkgconf_error:
+    if not shutil.which("pkg-config"):
         print_error("pkg-config not found. Aborting.")
         return False
 
@@ -54,16 +54,6 @@ def get_opts():
     ]
 
 
-def get_doc_classes():
-    return [
-        "EditorExportPlatformLinuxBSD",
-    ]
-
-
-def get_doc_path():
-    return "doc_classes"
-
-
 def get_flags():
     return [
         ("arch", detect_arch()),
@@ -210,14 +200,15 @@ def configure(env: "SConsEnvironment"):
         env.Append(CPPDEFINES=["SOWRAP_ENABLED"])
 
     if env["wayland"]:
-        if os.system("wayland-scanner -v 2>/dev/null") != 0:
+        if not shutil.which("wayland-scanner"):
             print_warning("wayland-scanner not found. Disabling Wayland support.")
             env["wayland"] = False
 
     if env["touch"]:
         env.Append(CPPDEFINES=["TOUCH_ENABLED"])
 
-    # FIXME: Check for existence of the libs before parsing their flags with pkg-config
+    # pkg-config results are cached in bin/, so unchanged configurations don't run pkg-config again.
+    pkg_config = PkgConfig(env)
 
     # freetype depends on libpng and zlib, so bundling one of them while keeping others
     # as shared libraries leads to weird issues. And graphite and harfbuzz need freetype.
@@ -237,32 +228,32 @@ def configure(env: "SConsEnvironment"):
         sys.exit(255)
 
     if not env["builtin_freetype"]:
-        env.ParseConfig("pkg-config freetype2 --cflags --libs")
+        pkg_config.parse_config("freetype2")
 
     if not env["builtin_graphite"]:
-        env.ParseConfig("pkg-config graphite2 --cflags --libs")
+        pkg_config.parse_config("graphite2")
 
     if not env["builtin_icu4c"]:
-        env.ParseConfig("pkg-config icu-i18n icu-uc --cflags --libs")
+        pkg_config.parse_config("icu-i18n icu-uc")
 
     if not env["builtin_harfbuzz"]:
-        env.ParseConfig("pkg-config harfbuzz harfbuzz-icu --cflags --libs")
+        pkg_config.parse_config("harfbuzz harfbuzz-icu")
 
     if not env["builtin_libpng"]:
-        env.ParseConfig("pkg-config libpng16 --cflags --libs")
+        pkg_config.parse_config("libpng16")
 
     if not env["builtin_enet"]:
-        env.ParseConfig("pkg-config libenet --cflags --libs")
+        pkg_config.parse_config("libenet")
 
     if not env["builtin_squish"]:
         # libsquish doesn't reliably install its .pc file, so some distros lack it.
         env.Append(LIBS=["libsquish"])
 
     if not env["builtin_zstd"]:
-        env.ParseConfig("pkg-config libzstd --cflags --libs")
+        pkg_config.parse_config("libzstd")
 
     if env["brotli"] and not env["builtin_brotli"]:
-        env.ParseConfig("pkg-config libbrotlicommon libbrotlidec --cflags --libs")
+        pkg_config.parse_config("libbrotlicommon libbrotlidec")
 
     # Sound and video libraries
     # Keep the order as it triggers chained dependencies (ogg needed by others, etc.)
@@ -270,27 +261,27 @@ def configure(env: "SConsEnvironment"):
     if not env["builtin_libtheora"]:
         env["builtin_libogg"] = False  # Needed to link against system libtheora
         env["builtin_libvorbis"] = False  # Needed to link against system libtheora
-        env.ParseConfig("pkg-config theora theoradec --cflags --libs")
+        pkg_config.parse_config("theora theoradec")
     else:
         if env["arch"] in ["x86_64", "x86_32"]:
             env["x86_libtheora_opt_gcc"] = True
 
     if not env["builtin_libvorbis"]:
         env["builtin_libogg"] = False  # Needed to link against system libvorbis
-        env.ParseConfig("pkg-config vorbis vorbisfile --cflags --libs")
+        pkg_config.parse_config("vorbis vorbisfile")
 
     if not env["builtin_libogg"]:
-        env.ParseConfig("pkg-config ogg --cflags --libs")
+        pkg_config.parse_config("ogg")
 
     if not env["builtin_libwebp"]:
-        env.ParseConfig("pkg-config libwebp --cflags --libs")
+        pkg_config.parse_config("libwebp")
 
     if not env["builtin_mbedtls"]:
         # mbedTLS does not provide a pkgconfig config yet. See https://github.com/ARMmbed/mbedtls/issues/228
         env.Append(LIBS=["mbedtls", "mbedcrypto", "mbedx509"])
 
     if not env["builtin_wslay"]:
-        env.ParseConfig("pkg-config libwslay --cflags --libs")
+        pkg_config.parse_config("libwslay")
 
     if not env["builtin_miniupnpc"]:
         # No pkgconfig file so far, hardcode default paths.
@@ -300,7 +291,7 @@ def configure(env: "SConsEnvironment"):
     # On Linux wchar_t should be 32-bits
     # 16-bit library shouldn't be required due to compiler optimizations
     if not env["builtin_pcre2"]:
-        env.ParseConfig("pkg-config libpcre2-32 --cflags --libs")
+        pkg_config.parse_config("libpcre2-32")
 
     if not env["builtin_recastnavigation"]:
         # No pkgconfig file so far, hardcode default paths.
@@ -312,12 +303,12 @@ def configure(env: "SConsEnvironment"):
         env.Append(LIBS=["embree3"])
 
     if not env["builtin_openxr"]:
-        env.ParseConfig("pkg-config openxr --cflags --libs")
+        pkg_config.parse_config("openxr")
 
     if env["fontconfig"]:
         if not env["use_sowrap"]:
-            if os.system("pkg-config --exists fontconfig") == 0:  # 0 means found
-                env.ParseConfig("pkg-config fontconfig --cflags --libs")
+            if pkg_config.exists("fontconfig"):
+                pkg_config.parse_config("fontconfig")
                 env.Append(CPPDEFINES=["FONTCONFIG_ENABLED"])
             else:
                 print_warning("fontconfig development libraries not found. Disabling the system fonts support.")
@@ -327,8 +318,8 @@ def configure(env: "SConsEnvironment"):
 
     if env["alsa"]:
         if not env["use_sowrap"]:
-            if os.system("pkg-config --exists alsa") == 0:  # 0 means found
-                env.ParseConfig("pkg-config alsa --cflags --libs")
+            if pkg_config.exists("alsa"):
+                pkg_config.parse_config("alsa")
                 env.Append(CPPDEFINES=["ALSA_ENABLED", "ALSAMIDI_ENABLED"])
             else:
                 print_warning("ALSA development libraries not found. Disabling the ALSA audio driver.")
@@ -338,8 +329,8 @@ def configure(env: "SConsEnvironment"):
 
     if env["pulseaudio"]:
         if not env["use_sowrap"]:
-            if os.system("pkg-config --exists libpulse") == 0:  # 0 means found
-                env.ParseConfig("pkg-config libpulse --cflags --libs")
+            if pkg_config.exists("libpulse"):
+                pkg_config.parse_config("libpulse")
                 env.Append(CPPDEFINES=["PULSEAUDIO_ENABLED"])
             else:
                 print_warning("PulseAudio development libraries not found. Disabling the PulseAudio audio driver.")
@@ -349,8 +340,8 @@ def configure(env: "SConsEnvironment"):
 
     if env["dbus"]:
         if not env["use_sowrap"]:
-            if os.system("pkg-config --exists dbus-1") == 0:  # 0 means found
-                env.ParseConfig("pkg-config dbus-1 --cflags --libs")
+            if pkg_config.exists("dbus-1"):
+                pkg_config.parse_config("dbus-1")
                 env.Append(CPPDEFINES=["DBUS_ENABLED"])
             else:
                 print_warning("D-Bus development libraries not found. Disabling screensaver prevention.")
@@ -360,8 +351,8 @@ def configure(env: "SConsEnvironment"):
 
     if env["speechd"]:
         if not env["use_sowrap"]:
-            if os.system("pkg-config --exists speech-dispatcher") == 0:  # 0 means found
-                env.ParseConfig("pkg-config speech-dispatcher --cflags --libs")
+            if pkg_config.exists("speech-dispatcher"):
+                pkg_config.parse_config("speech-dispatcher")
                 env.Append(CPPDEFINES=["SPEECHD_ENABLED"])
             else:
                 print_warning("speech-dispatcher development libraries not found. Disabling text to speech support.")
@@ -370,8 +361,8 @@ def configure(env: "SConsEnvironment"):
             env.Append(CPPDEFINES=["SPEECHD_ENABLED"])
 
     if not env["use_sowrap"]:
-        if os.system("pkg-config --exists xkbcommon") == 0:  # 0 means found
-            env.ParseConfig("pkg-config xkbcommon --cflags --libs")
+        if pkg_config.exists("xkbcommon"):
+            pkg_config.parse_config("xkbcommon")
             env.Append(CPPDEFINES=["XKB_ENABLED"])
         else:
             if env["wayland"]:
@@ -388,8 +379,8 @@ def configure(env: "SConsEnvironment"):
         env.Append(CPPDEFINES=["JOYDEV_ENABLED"])
         if env["udev"]:
             if not env["use_sowrap"]:
-                if os.system("pkg-config --exists libudev") == 0:  # 0 means found
-                    env.ParseConfig("pkg-config libudev --cflags --libs")
+                if pkg_config.exists("libudev"):
+                    pkg_config.parse_config("libudev")
                     env.Append(CPPDEFINES=["UDEV_ENABLED"])
                 else:
                     print_warning("libudev development libraries not found. Disabling controller hotplugging support.")
@@ -401,7 +392,7 @@ def configure(env: "SConsEnvironment"):
 
     # Linkflags below this line should typically stay the last ones
     if not env["builtin_zlib"]:
-        env.ParseConfig("pkg-config zlib --cflags --libs")
+        pkg_config.parse_config("zlib")
 
     env.Prepend(CPPPATH=["#platform/linuxbsd"])
     if env["use_sowrap"]:
@@ -417,55 +408,55 @@ def configure(env: "SConsEnvironment"):
 
     if env["x11"]:
         if not env["use_sowrap"]:
-            if os.system("pkg-config --exists x11"):
+            if not pkg_config.exists("x11"):
                 print_error("X11 libraries not found. Aborting.")
                 sys.exit(255)
-            env.ParseConfig("pkg-config x11 --cflags --libs")
-            if os.system("pkg-config --exists xcursor"):
+            pkg_config.parse_config("x11")
+            if not pkg_config.exists("xcursor"):
                 print_error("Xcursor library not found. Aborting.")
                 sys.exit(255)
-            env.ParseConfig("pkg-config xcursor --cflags --libs")
-            if os.system("pkg-config --exists xinerama"):
+            pkg_config.parse_config("xcursor")
+            if not pkg_config.exists("xinerama"):
                 print_error("Xinerama library not found. Aborting.")
                 sys.exit(255)
-            env.ParseConfig("pkg-config xinerama --cflags --libs")
-            if os.system("pkg-config --exists xext"):
+            pkg_config.parse_config("xinerama")
+            if not pkg_config.exists("xext"):
                 print_error("Xext library not found. Aborting.")
                 sys.exit(255)
-            env.ParseConfig("pkg-config xext --cflags --libs")
-            if os.system("pkg-config --exists xrandr"):
+            pkg_config.parse_config("xext")
+            if not pkg_config.exists("xrandr"):
                 print_error("XrandR library not found. Aborting.")
                 sys.exit(255)
-            env.ParseConfig("pkg-config xrandr --cflags --libs")
-            if os.system("pkg-config --exists xrender"):
+            pkg_config.parse_config("xrandr")
+            if not pkg_config.exists("xrender"):
                 print_error("XRender library not found. Aborting.")
                 sys.exit(255)
-            env.ParseConfig("pkg-config xrender --cflags --libs")
-            if os.system("pkg-config --exists xi"):
+            pkg_config.parse_config("xrender")
+            if not pkg_config.exists("xi"):
                 print_error("Xi library not found. Aborting.")
                 sys.exit(255)
-            env.ParseConfig("pkg-config xi --cflags --libs")
+            pkg_config.parse_config("xi")
         env.Append(CPPDEFINES=["X11_ENABLED"])
 
     if env["wayland"]:
         if not env["use_sowrap"]:
-            if os.system("pkg-config --exists libdecor-0"):
+            if not pkg_config.exists("libdecor-0"):
                 print_warning("libdecor development libraries not found. Disabling client-side decorations.")
                 env["libdecor"] = False
             else:
-                env.ParseConfig("pkg-config libdecor-0 --cflags --libs")
-            if os.system("pkg-config --exists wayland-client"):
+                pkg_config.parse_config("libdecor-0")
+            if not pkg_config.exists("wayland-client"):
                 print_error("Wayland client library not found. Aborting.")
                 sys.exit(255)
-            env.ParseConfig("pkg-config wayland-client --cflags --libs")
-            if os.system("pkg-config --exists wayland-cursor"):
+            pkg_config.parse_config("wayland-client")
+            if not pkg_config.exists("wayland-cursor"):
                 print_error("Wayland cursor library not found. Aborting.")
                 sys.exit(255)
-            env.ParseConfig("pkg-config wayland-cursor --cflags --libs")
-            if os.system("pkg-config --exists wayland-egl"):
+            pkg_config.parse_config("wayland-cursor")
+            if not pkg_config.exists("wayland-egl"):
                 print_error("Wayland EGL library not found. Aborting.")
                 sys.exit(255)
-            env.ParseConfig("pkg-config wayland-egl --cflags --libs")
+            pkg_config.parse_config("wayland-egl")
 
         if env["libdecor"]:
             env.Append(CPPDEFINES=["LIBDECOR_ENABLED"])
@@ -477,7 +468,7 @@ def configure(env: "SConsEnvironment"):
     if env["vulkan"]:
         env.Append(CPPDEFINES=["VULKAN_ENABLED", "RD_ENABLED"])
         if not env["use_volk"]:
-            env.ParseConfig("pkg-config vulkan --cflags --libs")
+            pkg_config.parse_config("vulkan")
         if not env["builtin_glslang"]:
             # No pkgconfig file so far, hardcode expected lib name.
             env.Append(LIBS=["glslang", "SPIRV"])
@@ -485,6 +476,8 @@ def configure(env: "SConsEnvironment"):
     if env["opengl3"]:
         env.Append(CPPDEFINES=["GLES3_ENABLED"])
 
+    pkg_config.save()
+
     env.Append(LIBS=["pthread"])
 
     if platform.system() == "Linux":
@@ -42,16 +42,6 @@ def get_opts():
     ]
 
 
-def get_doc_classes():
-    return [
-        "EditorExportPlatformMacOS",
-    ]
-
-
-def get_doc_path():
-    return "doc_classes"
-
-
 def get_flags():
     return [
         ("arch", detect_arch()),
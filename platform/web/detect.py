@@ -53,16 +53,6 @@ def get_opts():
     ]
 
 
-def get_doc_classes():
-    return [
-        "EditorExportPlatformWeb",
-    ]
-
-
-def get_doc_path():
-    return "doc_classes"
-
-
 def get_flags():
     return [
         ("arch", "wasm32"),
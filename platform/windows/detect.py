@@ -235,16 +235,6 @@ def get_opts():
     ]
 
 
-def get_doc_classes():
-    return [
-        "EditorExportPlatformWindows",
-    ]
-
-
-def get_doc_path():
-    return "doc_classes"
-
-
 def get_flags():
     arch = detect_build_env_arch() or detect_arch()
 
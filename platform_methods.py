@@ -1,11 +1,14 @@
 import os
+import re
 import sys
 import json
+import shutil
 import platform
 import uuid
 import functools
 import subprocess
 import methods
+import configure_cache
 
 # NOTE: The multiprocessing module is not compatible with SCons due to conflict on cPickle
 
@@ -43,31 +46,44 @@ def detect_arch():
         return "x86_64"
 
 
-def generate_export_icons(platform_path, platform_name):
+def get_buildable_platforms(platform_list):
     """
-    Generate headers for logo and run icon for the export plugin.
+    Return the platforms which can be built on this host, probing the `detect.py` of each.
     """
-    export_path = platform_path + "/export"
-    svg_names = []
-    if os.path.isfile(export_path + "/logo.svg"):
-        svg_names.append("logo")
-    if os.path.isfile(export_path + "/run_icon.svg"):
-        svg_names.append("run_icon")
+    buildable = []
+    selected_detect = sys.modules.pop("detect", None)
+    for name in platform_list:
+        path = "./platform/" + name
+        sys.path.insert(0, path)
+        try:
+            import detect
+
+            if detect.can_build():
+                buildable.append(name)
+        finally:
+            sys.path.remove(path)
+            sys.modules.pop("detect", None)
+    if selected_detect is not None:
+        sys.modules["detect"] = selected_detect
+    return buildable
 
-    for name in svg_names:
-        with open(export_path + "/" + name + ".svg", "rb") as svgf:
-            b = svgf.read(1)
-            svg_str = " /* AUTOGENERATED FILE, DO NOT EDIT */ \n"
-            svg_str += " static const char *_" + platform_name + "_" + name + '_svg = "'
-            while len(b) == 1:
-                svg_str += "\\" + hex(ord(b))[1:]
-                b = svgf.read(1)
 
-            svg_str += '";\n'
+def export_icon_builder(target, source, env):
+    """
+    Generate a header with the logo or run icon of an export plugin, from `platform/<name>/export/<icon>.svg`.
+    """
+    src = str(source[0])
+    platform_name = os.path.basename(os.path.dirname(os.path.dirname(os.path.abspath(src))))
+    name = os.path.splitext(os.path.basename(src))[0]
+    with open(src, "rb") as svgf:
+        svg = svgf.read()
 
-        wf = export_path + "/" + name + "_svg.gen.h"
+    svg_str = " /* AUTOGENERATED FILE, DO NOT EDIT */ \n"
+    svg_str += " static const char *_" + platform_name + "_" + name + '_svg = "'
+    svg_str += "".join("\\" + hex(b)[1:] for b in svg)
+    svg_str += '";\n'
 
-        methods.write_file_if_needed(wf, svg_str)
+    methods.write_file_if_needed(str(target[0]), svg_str)
 
 
 def get_build_version(short):
@@ -173,3 +189,165 @@ def detect_mvk(env, osname):
             return mvk_path
 
     return ""
+
+
+# Relative to the godot folder, next to the build results.
+PKG_CONFIG_CACHE = "bin/pkg_config_cache.json"
+
+
+def _get_mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _read_pc_requires(path):
+    """
+    Return the names of the packages listed in the `Requires` fields of a `.pc` file.
+    """
+    requires = []
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                field, _, value = line.partition(":")
+                if field.strip() not in ("Requires", "Requires.private"):
+                    continue
+                # Package names, each optionally followed by an operator and a version, with or without spaces.
+                tokens = re.findall(r"[<>!]?=|[<>]|[^\s,<>=!]+", value)
+                skip = False
+                for token in tokens:
+                    if skip:
+                        skip = False
+                    elif token in ("=", "!=", "<", "<=", ">", ">="):
+                        skip = True
+                    else:
+                        requires.append(token)
+    except OSError:
+        pass
+    return requires
+
+
+class PkgConfig:
+    """
+    Run pkg-config queries, reusing the results of previous builds from `PKG_CONFIG_CACHE`.
+
+    Checking that packages exist and getting their flags is a single `pkg-config --cflags --libs` command.
+    Its result is reused as long as the pkg-config binary, the `PKG_CONFIG_*` environment variables,
+    the `.pc` files of the packages and their requirements, and the folders of the search path are unchanged,
+    so builds with an unchanged configuration don't run pkg-config at all.
+    """
+
+    def __init__(self, env, path=PKG_CONFIG_CACHE):
+        self.env = env
+        self.path = path
+        self.binary = shutil.which("pkg-config", path=env["ENV"].get("PATH"))
+        variables = sorted((k, v) for k, v in env["ENV"].items() if k.startswith("PKG_CONFIG"))
+        self.key = json.dumps([self.binary, _get_mtime(self.binary) if self.binary else None, variables])
+        self.dirty = False
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self.cache = json.load(f)
+        except (OSError, ValueError):
+            self.cache = {}
+
+        # Packages are looked up in the same environment, so they share the search path.
+        self.entry = self.cache.get(self.key)
+        if self.entry is not None and any(
+            _get_mtime(folder) != mtime for folder, mtime in self.entry["search_path"].items()
+        ):
+            self.entry = None
+        if self.entry is None:
+            self.entry = {"search_path": {}, "queries": {}}
+            self.cache[self.key] = self.entry
+            self.dirty = True
+            if self.binary:
+                search_path = self._run("--variable", "pc_path", "pkg-config").stdout.strip()
+                folders = env["ENV"].get("PKG_CONFIG_PATH", "").split(os.pathsep) + search_path.split(os.pathsep)
+                self.entry["search_path"] = {folder: _get_mtime(folder) for folder in folders if folder}
+
+    def _run(self, *args):
+        return subprocess.run(
+            [self.binary] + list(args),
+            env=self.env["ENV"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            encoding="utf-8",
+        )
+
+    def _find_pc_files(self, packages):
+        """
+        Return the modification times of the `.pc` files of the packages and of the packages they require.
+        """
+        files = {}
+        pending = list(packages)
+        seen = set()
+        while pending:
+            name = pending.pop()
+            if name in seen:
+                continue
+            seen.add(name)
+            for folder in self.entry["search_path"]:
+                pc_file = os.path.join(folder, name + ".pc")
+                mtime = _get_mtime(pc_file)
+                if mtime is not None:
+                    files[pc_file] = mtime
+                    pending.extend(_read_pc_requires(pc_file))
+                    break
+        return files
+
+    def query(self, packages):
+        """
+        Return `(found, flags, errors)` for the packages, a space-separated list as passed to pkg-config.
+        """
+        result = self.entry["queries"].get(packages)
+        if result is not None and all(_get_mtime(f) == mtime for f, mtime in result["files"].items()):
+            self._add_configure_dependencies(result)
+            return result["found"], result["flags"], result["errors"]
+
+        if self.binary:
+            process = self._run("--cflags", "--libs", *packages.split())
+            result = {
+                "found": process.returncode == 0,
+                "flags": process.stdout.strip(),
+                "errors": process.stderr.strip(),
+                "files": self._find_pc_files(packages.split()),
+            }
+        else:
+            result = {"found": False, "flags": "", "errors": "pkg-config not found.", "files": {}}
+        self.entry["queries"][packages] = result
+        self.dirty = True
+        self._add_configure_dependencies(result)
+        return result["found"], result["flags"], result["errors"]
+
+    def _add_configure_dependencies(self, result):
+        # A cached configuration is only valid with the same pkg-config results.
+        if self.binary:
+            configure_cache.add_dependency(self.binary)
+        for path in list(self.entry["search_path"]) + list(result["files"]):
+            configure_cache.add_dependency(path)
+
+    def exists(self, packages):
+        return self.query(packages)[0]
+
+    def parse_config(self, packages):
+        """
+        Add the flags of the packages to the environment, like `env.ParseConfig()` with `pkg-config --cflags --libs`.
+        """
+        found, flags, errors = self.query(packages)
+        if not found:
+            methods.print_error(f'pkg-config failed for "{packages}":\n{errors}')
+            sys.exit(255)
+        self.env.MergeFlags(flags)
+
+    def save(self):
+        if not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8", newline="\n") as f:
+            json.dump(self.cache, f, indent=4, sort_keys=True)
+            f.write("\n")
+        os.replace(temp_path, self.path)
+        self.dirty = False
@@ -0,0 +1,466 @@
+"""Functions used to manage the SCons cache (SCONS_CACHE)
+
+The cache keeps an index of its entries in a SQLite database, with their size and when they were last used,
+updated as SCons reads and writes the cache. Pruning the cache to its size limit only reads the entries it
+removes, instead of listing the whole cache. Delete the index to rebuild it from the files in the cache.
+
+Entries can be compressed (SCONS_CACHE_COMPRESSION). Compressed entries are stored with the name of their
+compression as extension, so builds which don't use the same compression don't see them.
+
+The cache can be shared over HTTP (SCONS_CACHE_URL), with the server in misc/scripts/scons_cache_server.py.
+Entries missing from the local cache are downloaded before SCons reads them, and the entries SCons writes
+are uploaded in the background.
+"""
+
+import atexit
+import http.server
+import importlib
+import math
+import os
+import re
+import shutil
+import socketserver
+import sqlite3
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+
+from methods import print_warning
+
+# In the cache folder, next to SCons' "config" file.
+INDEX_NAME = "godot_cache_index.db"
+
+_schema = """
+CREATE TABLE IF NOT EXISTS entries (
+    name TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    last_use REAL NOT NULL,
+    score REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_score ON entries(score);
+CREATE TABLE IF NOT EXISTS totals (size INTEGER NOT NULL);
+CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries BEGIN
+    UPDATE totals SET size = size + new.size;
+END;
+CREATE TRIGGER IF NOT EXISTS entries_update AFTER UPDATE OF size ON entries BEGIN
+    UPDATE totals SET size = size - old.size + new.size;
+END;
+CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries BEGIN
+    UPDATE totals SET size = size - old.size;
+END;
+"""
+
+# Compressions of the cache entries, and the Python module each needs.
+COMPRESSIONS = {"zstd": "zstandard", "lz4": "lz4.frame", "gzip": "gzip"}
+_chunk_size = 1024 * 1024
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+class CacheIndex:
+    # Entries are removed by size-weighted LRU: an entry twice the size of another is kept as long as if it
+    # had been used "half_life" seconds later, as larger files are assumed to take longer to rebuild.
+    # The order doesn't change over time, so it's kept in the "score" column.
+    def __init__(self, path, half_life=43200):
+        self.path = path
+        self.half_life = half_life
+        self.index_path = os.path.join(path, INDEX_NAME)
+        self.lock = threading.Lock()
+        # (name, size, last_use) of the entries used since the last flush().
+        self.pending = []
+
+        with closing(self.connect()) as connection, connection:
+            # Only one build indexes the existing entries.
+            connection.execute("BEGIN IMMEDIATE")
+            if connection.execute("SELECT COUNT(*) FROM totals").fetchone()[0] == 0:
+                connection.execute("INSERT INTO totals VALUES (0)")
+                self.insert(connection, self.scan())
+
+    def connect(self):
+        # Several builds can share the cache, wait for their writes.
+        connection = sqlite3.connect(self.index_path, timeout=30)
+        connection.executescript(_schema)
+        return connection
+
+    def scan(self):
+        # The entries already in the cache, as SCons stores them in one folder per signature prefix.
+        entries = []
+        for folder in os.scandir(self.path):
+            if not folder.is_dir():
+                continue
+            for entry in os.scandir(folder.path):
+                if entry.is_file():
+                    st = entry.stat()
+                    entries.append((folder.name + "/" + entry.name, st.st_size, st.st_atime))
+        return entries
+
+    def refresh(self):
+        # Indexes the cache again, for SCons versions which can't keep the index up to date.
+        with self.lock:
+            self.pending = []
+        with closing(self.connect()) as connection, connection:
+            connection.execute("DELETE FROM entries")
+            self.insert(connection, self.scan())
+
+    def get_score(self, size, last_use):
+        return last_use + self.half_life * math.log2(max(size, 1))
+
+    def insert(self, connection, entries):
+        # Called within the transaction of "connection". Not an upsert, which needs SQLite 3.24, nor
+        # "INSERT OR REPLACE", whose implicit delete doesn't run the triggers keeping the total size.
+        rows = [(size, last_use, self.get_score(size, last_use), name) for name, size, last_use in entries]
+        connection.executemany("UPDATE entries SET size = ?, last_use = ?, score = ? WHERE name = ?", rows)
+        connection.executemany(
+            "INSERT OR IGNORE INTO entries VALUES (?, ?, ?, ?)",
+            [(name, size, last_use, score) for size, last_use, score, name in rows],
+        )
+
+    def record(self, name, size, last_use=None):
+        # Called from the jobs when they read or write "name", relative to the cache folder.
+        with self.lock:
+            self.pending.append((name, size, time.time() if last_use is None else last_use))
+
+    def flush(self):
+        with self.lock:
+            pending, self.pending = self.pending, []
+        if pending:
+            with closing(self.connect()) as connection, connection:
+                self.insert(connection, pending)
+
+    def get_size(self):
+        self.flush()
+        with closing(self.connect()) as connection:
+            return connection.execute("SELECT size FROM totals").fetchone()[0]
+
+    def prune(self, limit):
+        # Removes the entries with the lowest score until the cache fits in "limit" bytes.
+        # Returns the names of the removed entries.
+        self.flush()
+        removed = []
+        with closing(self.connect()) as connection, connection:
+            excess = connection.execute("SELECT size FROM totals").fetchone()[0] - limit
+            while excess > 0:
+                entries = connection.execute("SELECT name, size FROM entries ORDER BY score LIMIT 256").fetchall()
+                if not entries:
+                    break
+                for name, size in entries:
+                    if excess <= 0:
+                        break
+                    try:
+                        os.remove(os.path.join(self.path, name))
+                    except FileNotFoundError:
+                        # Removed by another build.
+                        pass
+                    connection.execute("DELETE FROM entries WHERE name = ?", (name,))
+                    removed.append(name)
+                    excess -= size
+        return removed
+
+
+def get_index(path, half_life=43200):
+    # The index of the cache in "path", shared by the whole build.
+    path = os.path.abspath(path)
+    with _indexes_lock:
+        if path not in _indexes:
+            _indexes[path] = CacheIndex(path, half_life)
+        return _indexes[path]
+
+
+def get_compression(path):
+    # The compression of a cache entry, from its extension.
+    compression = os.path.splitext(path)[1][1:]
+    return compression if compression in COMPRESSIONS else None
+
+
+def open_compressed(compression, f, mode):
+    # A file object compressing to or decompressing from the file object "f", which is left open.
+    module = importlib.import_module(COMPRESSIONS[compression])
+    if compression == "zstd":
+        if mode == "rb":
+            return module.ZstdDecompressor().stream_reader(f, closefd=False)
+        return module.ZstdCompressor(level=3).stream_writer(f, closefd=False)
+    if compression == "lz4":
+        return module.LZ4FrameFile(f, mode)
+    return module.GzipFile(fileobj=f, mode=mode, compresslevel=1)
+
+
+def compress_file(compression, src, dst):
+    with open(src, "rb") as f, open(dst, "wb") as out, open_compressed(compression, out, "wb") as writer:
+        shutil.copyfileobj(f, writer, _chunk_size)
+
+
+def decompress_file(compression, src, dst):
+    with open(src, "rb") as f, open_compressed(compression, f, "rb") as reader, open(dst, "wb") as out:
+        shutil.copyfileobj(reader, out, _chunk_size)
+
+
+class CacheStats:
+    # Cache hits and misses of the build, recorded from the jobs.
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.hits = []  # Targets retrieved from the cache.
+        self.misses = []  # Targets not in the cache, which are built.
+        self.remote_hits = 0
+        self.bytes_retrieved = 0
+        self.bytes_stored = 0
+
+    def record_hit(self, target, size, remote=False):
+        with self.lock:
+            self.hits.append(target)
+            self.remote_hits += 1 if remote else 0
+            self.bytes_retrieved += size
+
+    def record_miss(self, target):
+        with self.lock:
+            self.misses.append(target)
+
+    def record_push(self, size):
+        with self.lock:
+            self.bytes_stored += size
+
+    def get_summary(self, durations={}, limit=10):
+        # "durations" are the build times of the targets when they weren't cached, in seconds, to estimate
+        # the time saved by the cache (see build_telemetry.get_target_costs()). Also gives the "limit"
+        # folders with the most misses.
+        with self.lock:
+            misses_by_folder = {}
+            for target in self.misses:
+                folder = os.path.dirname(target)
+                misses_by_folder[folder] = misses_by_folder.get(folder, 0) + 1
+            requests = len(self.hits) + len(self.misses)
+            return {
+                "hits": len(self.hits),
+                "misses": len(self.misses),
+                "remote_hits": self.remote_hits,
+                "hit_rate": len(self.hits) / requests if requests else 0,
+                "bytes_retrieved": self.bytes_retrieved,
+                "bytes_stored": self.bytes_stored,
+                "time_saved": sum(durations.get(target, 0) for target in self.hits),
+                "hits_without_duration": sum(1 for target in self.hits if target not in durations),
+                "misses_by_folder": sorted(misses_by_folder.items(), key=lambda item: (-item[1], item[0]))[:limit],
+            }
+
+
+# Statistics of the build, when the cache is enabled with the CacheDir class from get_cachedir_class().
+stats = CacheStats()
+
+
+class RemoteCache:
+    # A cache shared over HTTP, entries are read with GET and written with PUT at "<url>/<name>".
+    # After a connection error the remote cache is no longer used for the rest of the build.
+    def __init__(self, url, max_downloads=4, max_uploads=2, timeout=30):
+        self.url = url.rstrip("/") + "/"
+        self.timeout = timeout
+        self.downloads = threading.BoundedSemaphore(max_downloads)
+        self.max_uploads = max_uploads
+        self.uploads = None
+        self.lock = threading.Lock()
+        self.failed = False
+
+    def fail(self, error):
+        with self.lock:
+            if not self.failed:
+                print_warning(f'Disabling the remote cache "{self.url}": {error}')
+            self.failed = True
+
+    def download(self, name, path):
+        # Downloads the entry "name" to "path", returns whether the remote cache had it.
+        if self.failed:
+            return False
+        with self.downloads:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            try:
+                with open(fd, "wb") as f, urllib.request.urlopen(self.url + name, timeout=self.timeout) as response:
+                    shutil.copyfileobj(response, f, _chunk_size)
+                os.replace(temp_path, path)
+                return True
+            except urllib.error.HTTPError as e:
+                if e.code != 404:
+                    self.fail(e)
+            except OSError as e:
+                self.fail(e)
+            os.remove(temp_path)
+            return False
+
+    def upload(self, path, name):
+        # Uploads "path" as the entry "name" in the background.
+        if self.failed:
+            return
+        with self.lock:
+            if self.uploads is None:
+                self.uploads = ThreadPoolExecutor(self.max_uploads)
+                atexit.register(self.wait)
+            self.uploads.submit(self.upload_now, path, name)
+
+    def upload_now(self, path, name):
+        try:
+            with open(path, "rb") as f:
+                request = urllib.request.Request(self.url + name, data=f, method="PUT")
+                request.add_header("Content-Length", str(os.fstat(f.fileno()).st_size))
+                urllib.request.urlopen(request, timeout=self.timeout).close()
+        except OSError as e:
+            self.fail(e)
+
+    def wait(self):
+        # Waits for the uploads to finish.
+        if self.uploads is not None:
+            self.uploads.shutdown(wait=True)
+
+
+class CacheRequestHandler(http.server.BaseHTTPRequestHandler):
+    # Serves the entries of the cache folder "directory", laid out like a SCons cache. See RemoteCache.
+    directory = "."
+    quiet = False
+    name_re = re.compile(r"[0-9a-fA-F]{2,}(?:\.\w+)?")
+
+    def get_path(self):
+        name = self.path.lstrip("/")
+        if not self.name_re.fullmatch(name):
+            self.send_error(400, "Not a cache entry name")
+            return None
+        return os.path.join(self.directory, name[:2].upper(), name)
+
+    def do_GET(self):
+        path = self.get_path()
+        if path is None:
+            return
+        try:
+            f = open(path, "rb")
+        except FileNotFoundError:
+            self.send_error(404)
+            return
+        with f:
+            self.send_response(200)
+            self.send_header("Content-Type", "application/octet-stream")
+            self.send_header("Content-Length", str(os.fstat(f.fileno()).st_size))
+            self.end_headers()
+            shutil.copyfileobj(f, self.wfile, _chunk_size)
+
+    def do_PUT(self):
+        path = self.get_path()
+        if path is None:
+            return
+        size = int(self.headers.get("Content-Length", 0))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with open(fd, "wb") as f:
+            while size > 0:
+                chunk = self.rfile.read(min(size, _chunk_size))
+                if not chunk:
+                    break
+                f.write(chunk)
+                size -= len(chunk)
+        if size > 0:
+            os.remove(temp_path)
+            self.send_error(400, "Incomplete entry")
+            return
+        # Entries are named by the signature of their content, an entry written concurrently is the same.
+        os.replace(temp_path, path)
+        self.send_response(201)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+
+class CacheServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    # Like http.server.ThreadingHTTPServer, which needs Python 3.7.
+    daemon_threads = True
+
+
+def get_cachedir_class(compression=None, remote=None):
+    # The CacheDir class which keeps the index up to date, to set as CACHEDIR_CLASS. Its entries are
+    # compressed with "compression" (see COMPRESSIONS), which raises ImportError if its module is missing,
+    # and shared with the RemoteCache "remote".
+    import SCons.Util
+    from SCons.CacheDir import CacheDir
+
+    if compression is not None:
+        if compression not in COMPRESSIONS:
+            raise ValueError(f'Unknown cache compression "{compression}", use one of {", ".join(COMPRESSIONS)}.')
+        importlib.import_module(COMPRESSIONS[compression])
+
+    class IndexedCacheDir(CacheDir):
+        def __init__(self, path):
+            super().__init__(path)
+            self.index = get_index(path) if path is not None else None
+
+        def record(self, node):
+            # Indexes the cache entry of "node", returns its size.
+            cachedir, cachefile = self.cachepath(node)
+            try:
+                size = os.path.getsize(cachefile)
+            except (OSError, TypeError):
+                return 0
+            self.index.record(os.path.basename(cachedir) + "/" + os.path.basename(cachefile), size)
+            return size
+
+        def cachepath(self, node):
+            cachedir, cachefile = super().cachepath(node)
+            if compression is not None and cachefile is not None:
+                cachefile += "." + compression
+            return cachedir, cachefile
+
+        @classmethod
+        def copy_from_cache(cls, env, src, dst):
+            if get_compression(src) is None:
+                return super().copy_from_cache(env, src, dst)
+            decompress_file(get_compression(src), src, dst)
+            if not env.cache_timestamp_newer:
+                shutil.copystat(src, dst)
+            return dst
+
+        @classmethod
+        def copy_to_cache(cls, env, src, dst):
+            # Not from the name of "dst", which SCons < 4.6 gives a temporary suffix before renaming it.
+            if compression is None:
+                return super().copy_to_cache(env, src, dst)
+            compress_file(compression, src, dst)
+            shutil.copystat(src, dst)
+            return dst
+
+        def get_cachedir_csig(self, node):
+            cachedir, cachefile = self.cachepath(node)
+            if cachefile and get_compression(cachefile) and os.path.exists(cachefile):
+                with open(cachefile, "rb") as f, open_compressed(get_compression(cachefile), f, "rb") as reader:
+                    return SCons.Util.hash_signature(reader.read())
+            return super().get_cachedir_csig(node)
+
+        def retrieve(self, node):
+            downloaded = False
+            if remote is not None and self.is_enabled():
+                cachedir, cachefile = self.cachepath(node)
+                if not os.path.exists(cachefile):
+                    downloaded = remote.download(os.path.basename(cachefile), cachefile)
+            retrieved = super().retrieve(node)
+            if self.index is not None:
+                if retrieved:
+                    stats.record_hit(str(node), self.record(node), downloaded)
+                else:
+                    stats.record_miss(str(node))
+            return retrieved
+
+        def push(self, node):
+            cachedir, cachefile = self.cachepath(node)
+            existed = cachefile is not None and os.path.exists(cachefile)
+            result = super().push(node)
+            if self.index is not None and not self.is_readonly() and cachefile is not None:
+                size = self.record(node)
+                if not os.path.exists(cachefile):
+                    # Not cacheable, or failed to write.
+                    return result
+                if not existed:
+                    stats.record_push(size)
+                if remote is not None:
+                    remote.upload(cachefile, os.path.basename(cachefile))
+            return result
+
+    return IndexedCacheDir
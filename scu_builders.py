@@ -1,8 +1,11 @@
 """Functions used to generate scu build source files during build time
 """
 
-import glob, os
+import os
 import math
+import re
+import subprocess
+import source_index
 from methods import print_error
 from pathlib import Path
 from os.path import normpath, basename
@@ -11,10 +14,50 @@ base_folder_path = str(Path(__file__).parent) + "/"
 base_folder_only = os.path.basename(os.path.normpath(base_folder_path))
 _verbose = False  # Set manually for debug prints
 _scu_folders = set()
+_source_index = None  # Source file names per folder, see get_source_index().
 _max_includes_per_scu = 1024
+_compile_times = {}  # Seconds per source path relative to the godot folder, from previous builds.
+_hot_files = set()  # Source paths relative to the godot folder, compiled outside of their SCU file.
+_memory_budget = None  # Peak memory in bytes a single SCU file may use to compile, if limited.
+_compile_memory = {}  # Peak memory in bytes per source path relative to the godot folder, from previous builds.
+_written_files = 0  # SCU files written or removed so far, to know whether a folder was regenerated.
+
+# Estimated cost of a source file, in bytes of source, for each #include it contains.
+_include_cost = 2048
+# How much more expensive than a fresh packing the largest SCU file may get before the files are repartitioned.
+_rebalance_tolerance = 0.1
+# Estimated peak memory of the compiler for an empty translation unit, and for each byte of estimated cost
+# of the files it includes. Most of the memory goes to the headers, which SCU files only parse once.
+_base_compile_memory = 512 * 1024 * 1024
+_memory_per_cost = 256
+# Share of the available memory which the compilers running in parallel may use together.
+_memory_share = 0.75
+
+# File local declarations which break when two files are included in the same SCU file.
+# These are heuristics on the Godot code style: declarations start at the beginning of a line
+# (possibly after attribute macros).
+_static_re = re.compile(
+    r"^(?:[A-Z_][A-Z0-9_]*\s+)*static\s+(?:[\w:<>,*&]+\s+|[\w:]+<[^;{()]*>\s*[*&]*\s*)*?[*&]*"
+    # The keyword of a type defined in place is not the name, see _static_aggregate_re.
+    r"(?!(?:struct|union|enum|class)\b)(\w+)\s*(?:\(|=|;|\[|\{)",
+    re.M,
+)
+# Static variables of an unnamed (or newly defined) type, e.g. "static const struct { ... } name[] = ...",
+# are named after the closing brace of the type.
+_static_aggregate_re = re.compile(
+    r"^(?:[A-Z_][A-Z0-9_]*\s+)*static\s+(?:(?:const|volatile)\s+)*(?:struct|union|enum|class)\b[^;{()]*\{", re.M
+)
+_declarator_re = re.compile(r"\s*[*&]*\s*(\w+)")
+_anonymous_namespace_re = re.compile(r"^namespace\s*\{(.*?)^\}", re.M | re.S)
+_anonymous_declaration_re = re.compile(
+    r"^(?:struct|class|enum(?:\s+class)?|union)\s+(\w+)|^(?:[\w:<>,*&]+\s+)+?[*&]*(\w+)\s*(?:\(|=|;|\[)", re.M
+)
+_define_re = re.compile(r"^[ \t]*#[ \t]*define[ \t]+(\w+)(.*(?:\\\n.*)*)", re.M)
+_undef_re = re.compile(r"^[ \t]*#[ \t]*undef[ \t]+(\w+)", re.M)
 
 
 def clear_out_stale_files(output_folder, extension, fresh_files):
+    global _written_files
     output_folder = os.path.abspath(output_folder)
     # print("clear_out_stale_files from folder: " + output_folder)
 
@@ -23,11 +66,13 @@ def clear_out_stale_files(output_folder, extension, fresh_files):
         # no files to clearout. (this is not an error)
         return
 
-    for file in glob.glob(output_folder + "/*." + extension):
+    for file in source_index.get_index().glob(output_folder + "/*." + extension):
         file = Path(file)
         if not file in fresh_files:
             # print("removed stale file: " + str(file))
             os.remove(file)
+            source_index.remove_file(file)
+            _written_files += 1
 
 
 def folder_not_found(folder):
@@ -35,6 +80,25 @@ def folder_not_found(folder):
     return not os.path.isdir(abs_folder)
 
 
+def index_source_files():
+    # Source file names per folder relative to the godot folder, from the snapshot of the whole tree.
+    index = {}
+    for folder, dirs, files in source_index.get_index().walk():
+        if any(part in ["scu", "bin"] for part in Path(folder).parts):
+            continue
+        sources = [f for f in files if f.endswith((".cpp", ".c")) and not f.endswith((".gen.cpp", ".gen.c"))]
+        if sources:
+            index[Path(folder).as_posix()] = sources
+    return index
+
+
+def get_source_index():
+    global _source_index
+    if _source_index is None:
+        _source_index = index_source_files()
+    return _source_index
+
+
 def find_files_in_folder(folder, sub_folder, include_list, extension, sought_exceptions, found_exceptions):
     abs_folder = base_folder_path + folder + "/" + sub_folder
 
@@ -42,18 +106,16 @@ def find_files_in_folder(folder, sub_folder, include_list, extension, sought_exc
         print_error(f'SCU: "{abs_folder}" not found.')
         return include_list, found_exceptions
 
-    os.chdir(abs_folder)
-
     sub_folder_slashed = ""
     if sub_folder != "":
         sub_folder_slashed = sub_folder + "/"
 
-    for file in glob.glob("*." + extension):
-        simple_name = Path(file).stem
-
-        if file.endswith(".gen.cpp"):
+    for file in get_source_index().get(normpath(folder + "/" + sub_folder).replace(os.sep, "/"), []):
+        if not file.endswith("." + extension):
             continue
 
+        simple_name = Path(file).stem
+
         li = '#include "' + folder + "/" + sub_folder_slashed + file + '"'
 
         if not simple_name in sought_exceptions:
@@ -65,6 +127,7 @@ def find_files_in_folder(folder, sub_folder, include_list, extension, sought_exc
 
 
 def write_output_file(file_count, include_list, start_line, end_line, output_folder, output_filename_prefix, extension):
+    global _written_files
     output_folder = os.path.abspath(output_folder)
 
     if not os.path.isdir(output_folder):
@@ -84,18 +147,15 @@ def write_output_file(file_count, include_list, start_line, end_line, output_fol
             li = line + "\n"
             file_text += li
 
-    num_string = ""
-    if file_count > 0:
-        num_string = "_" + str(file_count)
-
-    short_filename = output_filename_prefix + num_string + ".gen." + extension
-    output_filename = output_folder + "/" + short_filename
-    output_path = Path(output_filename)
+    output_path = Path(get_output_filename(file_count, output_folder, output_filename_prefix, extension))
+    short_filename = output_path.name
 
     if not output_path.exists() or output_path.read_text() != file_text:
         if _verbose:
             print("SCU: Generating: %s" % short_filename)
         output_path.write_text(file_text, encoding="utf8")
+        source_index.add_file(output_path)
+        _written_files += 1
     elif _verbose:
         print("SCU: Generation not needed for: " + short_filename)
 
@@ -103,6 +163,7 @@ def write_output_file(file_count, include_list, start_line, end_line, output_fol
 
 
 def write_exception_output_file(file_count, exception_string, output_folder, output_filename_prefix, extension):
+    global _written_files
     output_folder = os.path.abspath(output_folder)
     if not os.path.isdir(output_folder):
         print_error(f"SCU: {output_folder} does not exist.")
@@ -123,12 +184,276 @@ def write_exception_output_file(file_count, exception_string, output_folder, out
         if _verbose:
             print("SCU: Generating: " + short_filename)
         output_path.write_text(file_text, encoding="utf8")
+        source_index.add_file(output_path)
+        _written_files += 1
     elif _verbose:
         print("SCU: Generation not needed for: " + short_filename)
 
     return output_path
 
 
+def get_include_path(include_line):
+    # '#include "scene/3d/node_3d.cpp"' -> "scene/3d/node_3d.cpp"
+    return include_line[include_line.find('"') + 1 : include_line.rfind('"')]
+
+
+def estimate_compile_cost(path):
+    # Larger files and files pulling in more headers take longer to compile.
+    with open(base_folder_path + path, "r", encoding="utf-8", errors="replace") as f:
+        source = f.read()
+    return len(source) + _include_cost * source.count("#include")
+
+
+def get_include_costs(include_list):
+    paths = [get_include_path(li) for li in include_list]
+    estimates = [estimate_compile_cost(path) for path in paths]
+
+    # Prefer recorded compile times. The estimates of files without one are scaled to seconds
+    # using the files which have both, so that the two can be mixed in a folder.
+    known = [i for i in range(len(paths)) if paths[i] in _compile_times]
+    if not known:
+        return estimates
+
+    known_estimates = sum(estimates[i] for i in known)
+    scale = sum(_compile_times[paths[i]] for i in known) / known_estimates if known_estimates else 0
+    return [_compile_times[path] if path in _compile_times else estimates[i] * scale for i, path in enumerate(paths)]
+
+
+def get_available_memory():
+    # Memory in bytes which can be used without swapping, or None if it cannot be determined.
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+
+    if os.name == "nt":
+        import ctypes
+
+        class MemoryStatusEx(ctypes.Structure):
+            _fields_ = [
+                ("dwLength", ctypes.c_ulong),
+                ("dwMemoryLoad", ctypes.c_ulong),
+                ("ullTotalPhys", ctypes.c_ulonglong),
+                ("ullAvailPhys", ctypes.c_ulonglong),
+                ("ullTotalPageFile", ctypes.c_ulonglong),
+                ("ullAvailPageFile", ctypes.c_ulonglong),
+                ("ullTotalVirtual", ctypes.c_ulonglong),
+                ("ullAvailVirtual", ctypes.c_ulonglong),
+                ("ullAvailExtendedVirtual", ctypes.c_ulonglong),
+            ]
+
+        status = MemoryStatusEx()
+        status.dwLength = ctypes.sizeof(MemoryStatusEx)
+        if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+            return status.ullAvailPhys
+        return None
+
+    # macOS does not report the available pages, the physical memory is the best guess left.
+    for pages in ["SC_AVPHYS_PAGES", "SC_PHYS_PAGES"]:
+        try:
+            return os.sysconf(pages) * os.sysconf("SC_PAGE_SIZE")
+        except (ValueError, OSError, AttributeError):
+            continue
+    return None
+
+
+def get_memory_budget(num_jobs, available_memory=None):
+    # Peak memory in bytes each of the "num_jobs" parallel compilers may use, or None if unknown.
+    if available_memory is None:
+        available_memory = get_available_memory()
+    if not available_memory:
+        return None
+    return int(available_memory * _memory_share / max(num_jobs, 1))
+
+
+def get_include_memory(path):
+    # Peak memory in bytes a source file adds to the compiler of the SCU file including it.
+    if path in _compile_memory:
+        return max(_compile_memory[path] - _base_compile_memory, 0)
+    return estimate_compile_cost(path) * _memory_per_cost
+
+
+def estimate_compile_memory(path):
+    # Peak memory in bytes to compile a source file relative to the godot folder,
+    # SCU files adding up the files they include.
+    if os.path.basename(os.path.dirname(path)) != "scu":
+        return _base_compile_memory + get_include_memory(path)
+
+    with open(base_folder_path + path, "r", encoding="utf-8") as f:
+        include_list = [li for li in f.read().splitlines() if li.startswith("#include")]
+    return _base_compile_memory + sum(get_include_memory(get_include_path(li)) for li in include_list)
+
+
+def get_memory_limited_includes_per_scu(include_list):
+    # The number of includes per SCU file which keeps the SCU files of the folder within the memory budget.
+    memory = [get_include_memory(get_include_path(li)) for li in include_list]
+
+    allowance = max(_memory_budget - _base_compile_memory, 1)
+    num_output_files = max(math.ceil(sum(memory) / allowance), 1)
+    return max(math.ceil(len(include_list) / num_output_files), 1)
+
+
+def find_file_local_symbols(source):
+    # Maps the names which are local to a source file to their kind, or to their value for macros.
+    symbols = {}
+    for match in _static_re.finditer(source):
+        symbols[match.group(1)] = "static"
+    for match in _static_aggregate_re.finditer(source):
+        depth = 1
+        pos = match.end()
+        while depth and pos < len(source):
+            depth += {"{": 1, "}": -1}.get(source[pos], 0)
+            pos += 1
+        declarator = _declarator_re.match(source, pos)
+        if declarator:
+            symbols[declarator.group(1)] = "static"
+    for namespace in _anonymous_namespace_re.finditer(source):
+        for match in _anonymous_declaration_re.finditer(namespace.group(1)):
+            symbols[match.group(1) or match.group(2)] = "anonymous namespace"
+
+    # Macros which are undefined again do not leak into the following files.
+    undefined = set(_undef_re.findall(source))
+    for match in _define_re.finditer(source):
+        if match.group(1) not in undefined:
+            symbols["#" + match.group(1)] = match.group(2).strip()
+
+    return symbols
+
+
+def find_clashing_includes(include_list):
+    # Returns the includes which clash with an earlier include of the list, with the clash.
+    # A macro only clashes if it is defined with a different value, which the compiler would reject.
+    owners = {}
+    clashes = []
+    for li in include_list:
+        path = get_include_path(li)
+        with open(base_folder_path + path, "r", encoding="utf-8", errors="replace") as f:
+            symbols = find_file_local_symbols(f.read())
+
+        clash = None
+        for name, value in symbols.items():
+            if name in owners and (not name.startswith("#") or owners[name][1] != value):
+                clash = (name, owners[name][0])
+                break
+
+        if clash:
+            clashes.append((li, clash[0], clash[1]))
+        else:
+            for name, value in symbols.items():
+                owners.setdefault(name, (path, value))
+
+    return clashes
+
+
+def find_hot_files():
+    # Source files modified (or added) in the git working tree, which are likely to be edited again.
+    try:
+        output = subprocess.run(
+            ["git", "status", "--porcelain", "-z", "--untracked-files=all"],
+            cwd=base_folder_path,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            check=True,
+        ).stdout.decode("utf-8")
+    except (subprocess.CalledProcessError, OSError):
+        return set()
+
+    hot_files = set()
+    entries = output.split("\0")
+    i = 0
+    while i < len(entries):
+        entry = entries[i]
+        i += 1
+        if len(entry) < 4:
+            continue
+        if entry[0] in "RC":
+            # Renamed and copied files are followed by their original path.
+            i += 1
+        if "D" not in entry[:2] and entry.endswith((".cpp", ".c")):
+            hot_files.add(entry[3:])
+
+    return hot_files
+
+
+def get_output_filename(file_count, output_folder, output_filename_prefix, extension):
+    num_string = ""
+    if file_count > 0:
+        num_string = "_" + str(file_count)
+
+    return os.path.abspath(output_folder) + "/" + output_filename_prefix + num_string + ".gen." + extension
+
+
+def read_previous_partition(num_output_files, output_folder, output_filename_prefix, extension):
+    # The includes of each SCU file from the previous generation, if it had the same number of files.
+    if os.path.exists(get_output_filename(num_output_files, output_folder, output_filename_prefix, extension)):
+        return []
+
+    partition = []
+    for file_count in range(num_output_files):
+        output_path = Path(get_output_filename(file_count, output_folder, output_filename_prefix, extension))
+        if not output_path.exists():
+            return []
+        partition.append(output_path.read_text().splitlines())
+
+    return partition
+
+
+def pack_includes(costs, num_output_files, includes_per_scu):
+    # Longest processing time first: the most expensive include goes to the cheapest SCU file which has room.
+    loads = [0] * num_output_files
+    partition = [[] for _ in range(num_output_files)]
+    for i in sorted(range(len(costs)), key=lambda i: -costs[i]):
+        file_count = min(
+            (n for n in range(num_output_files) if len(partition[n]) < includes_per_scu), key=lambda n: loads[n]
+        )
+        loads[file_count] += costs[i]
+        partition[file_count].append(i)
+
+    return partition
+
+
+# Splits the sorted includes into "num_output_files" groups of similar total cost, with at most
+# "includes_per_scu" includes in each. Returns the indices of the includes in each group.
+# The previous partition (read back from the SCU files) is kept as long as it is within
+# "_rebalance_tolerance" of a fresh packing, so that editing, adding or removing a file does not
+# reshuffle the other SCU files (and throw away their cached objects).
+def partition_includes(include_list, costs, num_output_files, includes_per_scu, previous_partition=[]):
+    partition = pack_includes(costs, num_output_files, includes_per_scu)
+    if len(previous_partition) != num_output_files:
+        return partition
+
+    previous_file = {}
+    for file_count, lines in enumerate(previous_partition):
+        for line in lines:
+            previous_file[line] = file_count
+
+    kept = [[] for _ in range(num_output_files)]
+    added = []
+    for i, li in enumerate(include_list):
+        if li in previous_file:
+            kept[previous_file[li]].append(i)
+        else:
+            added.append(i)
+
+    loads = [sum(costs[i] for i in indices) for indices in kept]
+    for i in added:
+        candidates = [n for n in range(num_output_files) if len(kept[n]) < includes_per_scu]
+        if not candidates:
+            return partition
+        file_count = min(candidates, key=lambda n: loads[n])
+        loads[file_count] += costs[i]
+        kept[file_count].append(i)
+
+    if any(len(indices) > includes_per_scu for indices in kept):
+        return partition
+    if max(loads) > max(sum(costs[i] for i in indices) for indices in partition) * (1 + _rebalance_tolerance):
+        return partition
+    return kept
+
+
 def find_section_name(sub_folder):
     # Construct a useful name for the section from the path for debug logging
     section_path = os.path.abspath(base_folder_path + sub_folder) + "/"
@@ -168,25 +493,25 @@ def find_section_name(sub_folder):
 # These will automatically be placed in their own separate scu file,
 # which is slow like a normal build, but prevents the naming conflicts.
 # Ideally in these situations, the source code should be changed to prevent naming conflicts.
+# Clashes of static functions and variables, anonymous namespace declarations and macros
+# are also detected automatically (see find_clashing_includes()), and those files isolated as well.
 
 
 # "extension" will usually be cpp, but can also be set to c (for e.g. third party libraries that use c)
 def process_folder(folders, sought_exceptions=[], includes_per_scu=0, extension="cpp"):
     if len(folders) == 0:
-        return
-
-    # Construct the filename prefix from the FIRST folder name
-    # e.g. "scene_3d"
-    out_filename = find_section_name(folders[0])
+        return None
 
+    # The SCU files are named after the FIRST folder
     found_includes = []
     found_exceptions = []
 
     main_folder = folders[0]
-    abs_main_folder = base_folder_path + main_folder
+    if folder_not_found(main_folder):
+        return None
 
     # Keep a record of all folders that have been processed for SCU,
-    # this enables deciding what to do when we call "add_source_files()"
+    # so that process_files() does not generate other SCU files in them.
     global _scu_folders
     _scu_folders.add(main_folder)
 
@@ -201,8 +526,60 @@ def process_folder(folders, sought_exceptions=[], includes_per_scu=0, extension=
             main_folder, folders[d], found_includes, extension, sought_exceptions, found_exceptions
         )
 
+    if not found_includes and not found_exceptions:
+        return None
+
+    return write_scu_files(main_folder, found_includes, found_exceptions, includes_per_scu, extension)
+
+
+# "files" are source paths relative to the godot folder, e.g. the sources of a thirdparty library.
+# Their SCU files are generated in the "scu" subfolder of the folder containing all of them,
+# which must not be used by another SCU build.
+# Returns the paths of the generated files, or None if the files must be built as usual.
+def process_files(files, sought_exceptions=[], includes_per_scu=0, extension="c"):
+    if len(files) == 0:
+        return None
+
+    main_folder = Path(os.path.commonpath([os.path.dirname(file) for file in files])).as_posix()
+
+    global _scu_folders
+    if main_folder in _scu_folders:
+        print_error(f'SCU: "{main_folder}" is already built using SCU files, building its files as usual.')
+        return None
+    _scu_folders.add(main_folder)
+
+    found_includes = []
+    found_exceptions = []
+    for file in files:
+        li = '#include "' + file + '"'
+        if not Path(file).stem in sought_exceptions:
+            found_includes.append(li)
+        else:
+            found_exceptions.append(li)
+
+    return write_scu_files(main_folder, found_includes, found_exceptions, includes_per_scu, extension)
+
+
+# Writes the SCU files of "main_folder", in its "scu" subfolder, and returns their paths.
+def write_scu_files(main_folder, found_includes, found_exceptions, includes_per_scu, extension):
+    # Construct the filename prefix from the folder name
+    # e.g. "scene_3d"
+    out_filename = find_section_name(main_folder)
+    abs_main_folder = base_folder_path + main_folder
+
     found_includes = sorted(found_includes)
 
+    # Files being edited get their own SCU file, so each edit does not recompile a whole bundle.
+    hot_includes = [li for li in found_includes if get_include_path(li) in _hot_files]
+    if hot_includes:
+        found_includes = [li for li in found_includes if li not in hot_includes]
+
+    # Files which would clash with another file of the folder are compiled on their own.
+    clashes = find_clashing_includes(found_includes)
+    for li, name, other_path in clashes:
+        found_includes.remove(li)
+        found_exceptions.append(li)
+
     # calculate how many lines to write in each file
     total_lines = len(found_includes)
 
@@ -215,35 +592,36 @@ def process_folder(folders, sought_exceptions=[], includes_per_scu=0, extension=
         if includes_per_scu > _max_includes_per_scu:
             includes_per_scu = _max_includes_per_scu
 
-    num_output_files = max(math.ceil(total_lines / float(includes_per_scu)), 1)
+    if _memory_budget and found_includes:
+        includes_per_scu = min(includes_per_scu, get_memory_limited_includes_per_scu(found_includes))
 
-    lines_per_file = math.ceil(total_lines / float(num_output_files))
-    lines_per_file = max(lines_per_file, 1)
-
-    start_line = 0
-    file_number = 0
+    num_output_files = max(math.ceil(total_lines / float(includes_per_scu)), 1)
 
     # These do not vary throughout the loop
     output_folder = abs_main_folder + "/scu/"
     output_filename_prefix = "scu_" + out_filename
 
+    if num_output_files > 1:
+        previous_partition = read_previous_partition(num_output_files, output_folder, output_filename_prefix, extension)
+        partition = partition_includes(
+            found_includes, get_include_costs(found_includes), num_output_files, includes_per_scu, previous_partition
+        )
+    else:
+        partition = [range(total_lines)]
+
     fresh_files = set()
+    written_files = _written_files
 
     for file_count in range(0, num_output_files):
-        end_line = start_line + lines_per_file
-
-        # special case to cover rounding error in final file
-        if file_count == (num_output_files - 1):
-            end_line = len(found_includes)
+        # Each SCU file lists its includes in alphabetical order.
+        include_list = [found_includes[i] for i in sorted(partition[file_count])]
 
         fresh_file = write_output_file(
-            file_count, found_includes, start_line, end_line, output_folder, output_filename_prefix, extension
+            file_count, include_list, 0, len(include_list), output_folder, output_filename_prefix, extension
         )
 
         fresh_files.add(fresh_file)
 
-        start_line = end_line
-
     # Write the exceptions each in their own scu gen file,
     # so they can effectively compile in "old style / normal build".
     for exception_count in range(len(found_exceptions)):
@@ -253,13 +631,43 @@ def process_folder(folders, sought_exceptions=[], includes_per_scu=0, extension=
 
         fresh_files.add(fresh_file)
 
+    # The hot files are numbered separately, so the exception files do not change with them.
+    for hot_count in range(len(hot_includes)):
+        fresh_file = write_exception_output_file(
+            hot_count, hot_includes[hot_count], output_folder, output_filename_prefix + "_hot", extension
+        )
+
+        fresh_files.add(fresh_file)
+
     # Clear out any stale file (usually we will be overwriting if necessary,
     # but we want to remove any that are pre-existing that will not be
     # overwritten, so as to not compile anything stale).
     clear_out_stale_files(output_folder, extension, fresh_files)
 
+    # Only reported again when the SCU files change, not on every build.
+    if _verbose or _written_files != written_files:
+        for li, name, other_path in clashes:
+            kind = "macro" if name.startswith("#") else "symbol"
+            print(
+                f'SCU: Compiling "{get_include_path(li)}" on its own, {kind} "{name.lstrip("#")}" is also in "{other_path}".'
+            )
 
-def generate_scu_files(max_includes_per_scu):
+    if _verbose:
+        print("SCU: Processed folder: %s" % main_folder)
+
+    return sorted(str(fresh_file) for fresh_file in fresh_files)
+
+
+# "compile_times" optionally maps source paths (relative to the godot folder) to their compile
+# time in seconds, as recorded by previous builds. It is used to balance the SCU files of a folder.
+# "hot_files" are source paths (also relative to the godot folder) which are currently being edited,
+# see find_hot_files(). They are compiled on their own instead of as part of an SCU file.
+# "memory_budget" is the peak memory in bytes a single compiler may use (see get_memory_budget()), folders
+# with more expensive files are then split into more SCU files. "compile_memory" optionally maps source
+# paths to the peak memory in bytes of compiling them on their own, as recorded by previous builds.
+def generate_scu_files(
+    max_includes_per_scu, compile_times=None, hot_files=None, memory_budget=None, compile_memory=None
+):
     print("=============================")
     print("Single Compilation Unit Build")
     print("=============================")
@@ -267,98 +675,32 @@ def generate_scu_files(max_includes_per_scu):
     global _max_includes_per_scu
     _max_includes_per_scu = max_includes_per_scu
 
-    print("SCU: Generating build files... (max includes per SCU: %d)" % _max_includes_per_scu)
+    global _compile_times
+    _compile_times = compile_times or {}
+
+    global _hot_files
+    _hot_files = set(hot_files or [])
+    if _hot_files:
+        print("SCU: Compiling %d modified files outside of their SCU file." % len(_hot_files))
+
+    global _memory_budget
+    _memory_budget = memory_budget
 
-    curr_folder = os.path.abspath("./")
+    global _compile_memory
+    _compile_memory = compile_memory or {}
+
+    if _memory_budget:
+        print("SCU: Limiting SCU files to an estimated %d MiB of memory each." % (_memory_budget // (1024 * 1024)))
+    print("SCU: Build files are generated for the folders adding their sources with a wildcard.")
+    print("SCU: Max includes per SCU: %d" % _max_includes_per_scu)
 
     # check we are running from the correct folder
     if folder_not_found("core") or folder_not_found("platform") or folder_not_found("scene"):
         raise RuntimeError("scu_builders.py must be run from the godot folder.")
-        return
-
-    process_folder(["core"])
-    process_folder(["core/crypto"])
-    process_folder(["core/debugger"])
-    process_folder(["core/extension"])
-    process_folder(["core/input"])
-    process_folder(["core/io"])
-    process_folder(["core/math"])
-    process_folder(["core/object"])
-    process_folder(["core/os"])
-    process_folder(["core/string"])
-    process_folder(["core/variant"], ["variant_utility"])
-
-    process_folder(["drivers/unix"])
-    process_folder(["drivers/png"])
-
-    process_folder(["editor"], ["file_system_dock", "editor_resource_preview"], 32)
-    process_folder(["editor/debugger"])
-    process_folder(["editor/debugger/debug_adapter"])
-    process_folder(["editor/export"])
-    process_folder(["editor/gui"])
-    process_folder(["editor/import"])
-    process_folder(["editor/import/3d"])
-    process_folder(["editor/plugins"])
-    process_folder(["editor/plugins/gizmos"])
-    process_folder(["editor/plugins/tiles"])
-
-    process_folder(["platform/android/export"])
-    process_folder(["platform/ios/export"])
-    process_folder(["platform/linuxbsd/export"])
-    process_folder(["platform/macos/export"])
-    process_folder(["platform/web/export"])
-    process_folder(["platform/windows/export"])
-
-    process_folder(["modules/gltf"])
-    process_folder(["modules/gltf/structures"])
-    process_folder(["modules/gltf/editor"])
-    process_folder(["modules/gltf/extensions"])
-    process_folder(["modules/gltf/extensions/physics"])
-    process_folder(["modules/navigation"])
-    process_folder(["modules/webrtc"])
-    process_folder(["modules/websocket"])
-    process_folder(["modules/gridmap"])
-    process_folder(["modules/multiplayer"])
-    process_folder(["modules/multiplayer/editor"])
-    process_folder(["modules/openxr"], ["register_types"])
-    process_folder(["modules/openxr/action_map"])
-    process_folder(["modules/openxr/editor"])
-
-    process_folder(["modules/csg"])
-    process_folder(["modules/gdscript"])
-    process_folder(["modules/gdscript/editor"])
-    process_folder(["modules/gdscript/language_server"])
-
-    process_folder(["scene/2d"])
-    process_folder(["scene/2d/physics"])
-    process_folder(["scene/2d/physics/joints"])
-    process_folder(["scene/3d"])
-    process_folder(["scene/3d/physics"])
-    process_folder(["scene/3d/physics/joints"])
-    process_folder(["scene/animation"])
-    process_folder(["scene/gui"])
-    process_folder(["scene/main"])
-    process_folder(["scene/resources"])
-    process_folder(["scene/resources/2d"])
-    process_folder(["scene/resources/3d"])
-
-    process_folder(["servers"])
-    process_folder(["servers/rendering"])
-    process_folder(["servers/rendering/storage"])
-    process_folder(["servers/rendering/renderer_rd"])
-    process_folder(["servers/rendering/renderer_rd/effects"])
-    process_folder(["servers/rendering/renderer_rd/environment"])
-    process_folder(["servers/rendering/renderer_rd/storage_rd"])
-    process_folder(["servers/physics_2d"])
-    process_folder(["servers/physics_3d"])
-    process_folder(["servers/physics_3d/joints"])
-    process_folder(["servers/audio"])
-    process_folder(["servers/audio/effects"])
-
-    # Finally change back the path to the calling folder
-    os.chdir(curr_folder)
 
-    if _verbose:
-        print("SCU: Processed folders: %s" % sorted(_scu_folders))
+    global _scu_folders
+    _scu_folders = set()
 
-    return _scu_folders
+    # The SCU files of a folder are generated when its SCsub adds its sources, see methods.add_source_files().
+    global _source_index
+    _source_index = index_source_files()
@@ -101,6 +101,33 @@ void ShaderRD::_add_stage(const char *p_code, StageType p_stage_type) {
 	}
 }
 
+static CharString _concatenate_segments(const char *const *p_segments) {
+	int length = 0;
+	for (const char *const *segment = p_segments; *segment; segment++) {
+		length += strlen(*segment);
+	}
+
+	CharString code;
+	code.resize(length + 1);
+	char *dst = code.ptrw();
+	for (const char *const *segment = p_segments; *segment; segment++) {
+		int segment_length = strlen(*segment);
+		memcpy(dst, *segment, segment_length);
+		dst += segment_length;
+	}
+	*dst = 0;
+
+	return code;
+}
+
+void ShaderRD::setup(const char *const *p_vertex_segments, const char *const *p_fragment_segments, const char *const *p_compute_segments, const char *p_name) {
+	CharString vertex_code = p_vertex_segments ? _concatenate_segments(p_vertex_segments) : CharString();
+	CharString fragment_code = p_fragment_segments ? _concatenate_segments(p_fragment_segments) : CharString();
+	CharString compute_code = p_compute_segments ? _concatenate_segments(p_compute_segments) : CharString();
+
+	setup(p_vertex_segments ? vertex_code.get_data() : nullptr, p_fragment_segments ? fragment_code.get_data() : nullptr, p_compute_segments ? compute_code.get_data() : nullptr, p_name);
+}
+
 void ShaderRD::setup(const char *p_vertex_code, const char *p_fragment_code, const char *p_compute_code, const char *p_name) {
 	name = p_name;
 
@@ -151,6 +151,9 @@ private:
 protected:
 	ShaderRD();
 	void setup(const char *p_vertex_code, const char *p_fragment_code, const char *p_compute_code, const char *p_name);
+	// Null-terminated lists of code segments, concatenated in order. Used by shader headers
+	// generated with `rd_shared_shader_includes=yes`, which reference shared include segments.
+	void setup(const char *const *p_vertex_segments, const char *const *p_fragment_segments, const char *const *p_compute_segments, const char *p_name);
 
 public:
 	RID version_create();
@@ -0,0 +1,231 @@
+"""Functions used to list the files of the godot folder from a single snapshot (source_index)
+
+The godot folder is walked once per build with os.scandir(). Globbing the sources of the SCsub files,
+detecting the modules, generating the SCU files and the Visual Studio project all query this snapshot
+instead of listing the folders again. Hidden folders (like .git) aren't walked, and folders outside of
+the godot folder (like custom modules) are listed when first queried.
+
+The snapshot can be kept in bin/ with the modification time of each folder. The next builds then only list
+the folders which had files added, removed or renamed since.
+
+Files written while reading the SCsub files must be added with add_file(), as the snapshot doesn't see them.
+"""
+
+import fnmatch
+import os
+import pickle
+import time
+
+base_folder_path = os.path.abspath(os.path.dirname(__file__))
+
+# Relative to the godot folder, next to the build results.
+DEFAULT_PATH = "bin/source_index.pickle"
+
+_format_version = 1
+# Folders modified this close to when the snapshot was taken are listed again, as they may have changed
+# again within the resolution of their modification time.
+_mtime_margin = 2 * 1000 * 1000 * 1000
+
+_index = None
+
+
+def _has_magic(pattern):
+    return any(c in pattern for c in "*?[")
+
+
+class SourceIndex:
+    def __init__(self, root=None, path=None):
+        root = root or base_folder_path
+        self.root = root
+        self.path = path
+        # Folders relative to the root ("" for the root), as `{folder: (mtime, dirs, files)}`.
+        self.folders = {}
+        # Folders which aren't walked, listed when first queried, by absolute path.
+        self.other_folders = {}
+        self.listed = 0
+
+        previous = {}
+        previous_time = 0
+        if path:
+            try:
+                with open(path, "rb") as f:
+                    snapshot = pickle.load(f)
+                if snapshot["version"] == _format_version and snapshot["root"] == root:
+                    previous = snapshot["folders"]
+                    previous_time = snapshot["time"]
+            except Exception:
+                # Missing, or written by an incompatible version of the build scripts.
+                pass
+
+        # In nanoseconds like the modification times, time.time_ns() needs Python 3.7.
+        self.time = int(time.time() * 1000 * 1000 * 1000)
+        self.dirty = False
+        pending = [""]
+        while pending:
+            folder = pending.pop()
+            absolute = os.path.join(root, folder)
+            try:
+                mtime = os.stat(absolute).st_mtime_ns
+            except OSError:
+                continue
+            entry = previous.get(folder)
+            if entry is None or entry[0] != mtime or mtime > previous_time - _mtime_margin:
+                entry = (mtime,) + self._list(absolute)
+                self.dirty = True
+            self.folders[folder] = entry
+            walked = [d for d in entry[1] if not d.startswith(".")]
+            pending.extend(os.path.join(folder, d) for d in reversed(walked))
+        if len(self.folders) != len(previous):
+            self.dirty = True
+
+    def _list(self, folder):
+        self.listed += 1
+        dirs = []
+        files = []
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                (dirs if is_dir else files).append(entry.name)
+        return sorted(dirs), sorted(files)
+
+    def _get_folder(self, path):
+        absolute = os.path.abspath(path)
+        try:
+            folder = os.path.relpath(absolute, self.root)
+        except ValueError:  # On another drive.
+            folder = os.pardir
+        if folder == os.curdir:
+            folder = ""
+        if not folder.startswith(os.pardir) and folder in self.folders:
+            return self.folders[folder]
+        # Not walked, like hidden folders or folders outside of the godot folder.
+        if absolute not in self.other_folders:
+            try:
+                self.other_folders[absolute] = (None,) + self._list(absolute)
+            except OSError:
+                self.other_folders[absolute] = None
+        return self.other_folders[absolute]
+
+    def listdir(self, path):
+        """
+        Return the sorted names of the folders and files in a folder, as `(dirs, files)`,
+        or `None` if it's not a folder.
+        """
+        entry = self._get_folder(path)
+        return None if entry is None else (entry[1], entry[2])
+
+    def isdir(self, path):
+        return self.listdir(path) is not None
+
+    def isfile(self, path):
+        folder, name = os.path.split(os.path.abspath(path))
+        listing = self.listdir(folder)
+        return listing is not None and name in listing[1]
+
+    def exists(self, path):
+        folder, name = os.path.split(os.path.abspath(path))
+        listing = self.listdir(folder)
+        return listing is not None and (name in listing[0] or name in listing[1])
+
+    def glob(self, pattern):
+        """
+        Return the paths matching a pattern, like `glob.glob()` without its recursive `**` wildcard.
+        """
+        folder, name = os.path.split(pattern)
+        if _has_magic(folder):
+            folders = [f for f in self.glob(folder) if self.isdir(f)]
+        else:
+            folders = [folder]
+
+        results = []
+        for folder in folders:
+            listing = self.listdir(folder or os.curdir)
+            if listing is None:
+                continue
+            if _has_magic(name):
+                names = fnmatch.filter(listing[0] + listing[1], name)
+                if not name.startswith("."):
+                    # Like glob, wildcards don't match hidden files.
+                    names = [n for n in names if not n.startswith(".")]
+            elif name in listing[0] or name in listing[1]:
+                names = [name]
+            else:
+                names = []
+            results += [os.path.join(folder, n) for n in names]
+        return results
+
+    def walk(self):
+        """
+        Yield `(folder, dirs, files)` for each walked folder, with folders relative to the godot folder.
+        """
+        for folder, (mtime, dirs, files) in self.folders.items():
+            yield folder, dirs, files
+
+    def _update(self, path, add):
+        absolute = os.path.abspath(path)
+        folder, name = os.path.split(absolute)
+        for entries, key in [(self.folders, os.path.relpath(folder, self.root)), (self.other_folders, folder)]:
+            key = "" if key == os.curdir else key
+            entry = entries.get(key)
+            if entry is None:
+                continue
+            files = [f for f in entry[2] if f != name]
+            if add:
+                files = sorted(files + [name])
+            entries[key] = (entry[0], entry[1], files)
+
+    def add_file(self, path):
+        """
+        Add a file written after the snapshot was taken.
+        """
+        self._update(path, True)
+
+    def remove_file(self, path):
+        self._update(path, False)
+
+    def save(self):
+        if not self.path or not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            snapshot = {"version": _format_version, "root": self.root, "time": self.time, "folders": self.folders}
+            pickle.dump(snapshot, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, self.path)
+        self.dirty = False
+
+
+def open_index(path=None):
+    """
+    Takes the snapshot of the godot folder for this build, kept in `path` if given.
+    """
+    global _index
+    _index = SourceIndex(path=path)
+    return _index
+
+
+def get_index():
+    if _index is None:
+        open_index()
+    return _index
+
+
+def add_file(path):
+    """
+    Add a file written after the snapshot was taken, if it was taken.
+    """
+    if _index is not None:
+        _index.add_file(path)
+
+
+def remove_file(path):
+    if _index is not None:
+        _index.remove_file(path)
+
+
+def save_index():
+    if _index is not None:
+        _index.save()
@@ -1,5 +1,9 @@
+import json
 import os
+import platform
 import sys
+import time
+import tracemalloc
 from pathlib import Path
 
 import pytest
@@ -9,6 +13,44 @@ ROOT = CWD.parent.parent
 # append directory with build files to sys.path to import them
 sys.path.append(str(ROOT))
 
+# Results of the `benchmark` fixture, keyed by test name.
+_benchmark_results = {}
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("build benchmarks")
+    group.addoption("--build-benchmark", action="store_true", help="Run the build generator benchmarks.")
+    group.addoption(
+        "--build-benchmark-rounds", type=int, default=5, help="Timed runs per benchmark, the fastest is kept."
+    )
+    group.addoption("--build-benchmark-json", metavar="PATH", help="Write the benchmark results to PATH.")
+    group.addoption(
+        "--build-benchmark-baseline",
+        metavar="PATH",
+        help="Fail benchmarks which are slower or use more memory than in this results file.",
+    )
+    group.addoption(
+        "--build-benchmark-tolerance",
+        type=float,
+        default=0.25,
+        help="Allowed regression relative to the baseline (default: 0.25, i.e. 25%%).",
+    )
+
+
+def pytest_sessionfinish(session):
+    path = session.config.getoption("--build-benchmark-json", None)
+    if not path or not _benchmark_results:
+        return
+
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        results = {
+            "machine": platform.machine(),
+            "python": platform.python_version(),
+            "benchmarks": _benchmark_results,
+        }
+        json.dump(results, f, indent=4, sort_keys=True)
+        f.write("\n")
+
 
 @pytest.fixture
 def shader_files(request):
@@ -24,3 +66,50 @@ def shader_files(request):
 
     if not os.getenv("PYTEST_KEEP_GENERATED_FILES"):
         os.remove(res["path_output"])
+
+
+@pytest.fixture
+def benchmark(request):
+    """Measure a callable: the fastest of several timed runs, then the peak memory of a traced run"""
+    config = request.config
+    if not config.getoption("--build-benchmark"):
+        pytest.skip("build benchmarks need --build-benchmark")
+
+    baseline = {}
+    baseline_path = config.getoption("--build-benchmark-baseline")
+    if baseline_path:
+        with open(baseline_path, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["benchmarks"]
+
+    def run(func, *args, **kwargs):
+        timings = []
+        for _ in range(max(config.getoption("--build-benchmark-rounds"), 1)):
+            start = time.perf_counter()
+            func(*args, **kwargs)
+            timings.append(time.perf_counter() - start)
+
+        tracemalloc.start()
+        try:
+            func(*args, **kwargs)
+            peak_memory = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        result = {
+            "min_time": min(timings),
+            "mean_time": sum(timings) / len(timings),
+            "rounds": len(timings),
+            "peak_memory": peak_memory,
+        }
+        _benchmark_results[request.node.name] = result
+
+        reference = baseline.get(request.node.name)
+        if reference:
+            tolerance = 1.0 + config.getoption("--build-benchmark-tolerance")
+            if result["min_time"] > reference["min_time"] * tolerance:
+                pytest.fail(f"Time regressed from {reference['min_time']:.4f}s to {result['min_time']:.4f}s.")
+            if result["peak_memory"] > reference["peak_memory"] * tolerance:
+                pytest.fail(f"Peak memory regressed from {reference['peak_memory']} to {result['peak_memory']} bytes.")
+        return result
+
+    return run
@@ -6,9 +6,9 @@
 #include "drivers/gles3/shader_gles3.h"
 
 
-class VertexFragmentShaderGLES3 : public ShaderGLES3 {
-
-public:
+struct VertexFragmentShaderGLES3Definitions {
+	enum Uniforms {
+	};
 
 	enum ShaderVariant {
 		MODE_NINEPATCH,
@@ -18,7 +18,15 @@ public:
 		DISABLE_LIGHTING=1,
 	};
 
-	_FORCE_INLINE_ bool version_bind_shader(RID p_version,ShaderVariant p_variant,uint64_t p_specialization=0) { return _version_bind_shader(p_version,p_variant,p_specialization); }
+	static constexpr int VARIANT_COUNT = 1;
+	static constexpr uint64_t DEFAULT_SPECIALIZATION = 0;
+	static constexpr uint64_t VARIANT_COMBINATION_COUNT = 2;
+	static constexpr ShaderGLES3::VariantSpecialization WARMUP_VARIANTS[] = {
+		{ MODE_NINEPATCH, 0 },
+	};
+};
+
+class VertexFragmentShaderGLES3 : public ShaderGLES3Base<VertexFragmentShaderGLES3Definitions> {
 
 protected:
 
@@ -0,0 +1,187 @@
+"""Benchmarks of the build time code generators, run over the actual repository inputs.
+
+They are skipped unless `--build-benchmark` is given. Store a baseline, then compare later runs against it:
+
+    pytest tests/python_build -k benchmark --build-benchmark --build-benchmark-json=baseline.json
+    pytest tests/python_build -k benchmark --build-benchmark --build-benchmark-baseline=baseline.json
+"""
+
+import glob
+import os
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).parent.parent.parent
+# Generators which live next to their SCsub are imported the same way SCons does.
+for folder in ["core", "core/extension", "core/input", "core/object", "editor", "editor/icons", "editor/themes"]:
+    sys.path.append(str(ROOT / folder))
+for folder in ["main", "scene/theme", "scene/theme/icons"]:
+    sys.path.append(str(ROOT / folder))
+
+import core_builders
+import default_theme_builders
+import default_theme_icons_builders
+import editor_builders
+import editor_icons_builders
+import editor_theme_builders
+import gles3_builders
+import glsl_builders
+import input_builders
+import main_builders
+import make_virtuals
+import make_wrappers
+import scu_builders
+import source_index
+import template_builders
+
+
+def find_inputs(*patterns):
+    files = []
+    for pattern in patterns:
+        files += [f for f in glob.glob(pattern, recursive=True) if not f.endswith("_inc.glsl")]
+    return sorted(files)
+
+
+def build_rd_shaders(out):
+    for i, f in enumerate(find_inputs("servers/rendering/renderer_rd/shaders/**/*.glsl")):
+        glsl_builders.build_rd_header(f, str(out / f"rd_{i}.glsl.gen.h"))
+
+
+def build_raw_shaders(out):
+    for i, f in enumerate(find_inputs("modules/lightmapper_rd/*.glsl")):
+        glsl_builders.build_raw_header(f, str(out / f"raw_{i}.glsl.gen.h"))
+
+
+def build_gles3_shaders(out):
+    for i, f in enumerate(find_inputs("drivers/gles3/shaders/**/*.glsl")):
+        gles3_builders.build_gles3_header(
+            f, "drivers/gles3/shader_gles3.h", "GLES3", str(out / f"gles3_{i}.glsl.gen.h")
+        )
+
+
+def build_docs(out):
+    editor_builders.make_doc_header(
+        [out / "doc_data_compressed.gen.h"], find_inputs("doc/classes/*.xml", "modules/*/doc_classes/*.xml"), None
+    )
+
+
+def build_translations(out):
+    for category, pattern in [
+        ("editor", "editor/translations/editor/*.po"),
+        ("property", "editor/translations/properties/*.po"),
+        ("doc", "doc/translations/*.po"),
+        ("extractable", "editor/translations/extractable/*.po"),
+    ]:
+        editor_builders.make_translations_header(
+            [out / f"{category}_translations.gen.h"], find_inputs(pattern), None, category
+        )
+
+
+def build_icons(out):
+    editor_icons_builders.make_editor_icons_action(
+        [out / "editor_icons.gen.h"], find_inputs("editor/icons/*.svg", "modules/*/icons/*.svg"), None
+    )
+    default_theme_icons_builders.make_default_theme_icons_action(
+        [out / "default_theme_icons.gen.h"], find_inputs("scene/theme/icons/*.svg"), None
+    )
+
+
+def build_fonts(out):
+    fonts = find_inputs(*[f"thirdparty/fonts/*.{ext}" for ext in ["ttf", "otf", "woff", "woff2"]])
+    editor_theme_builders.make_fonts_header([out / "builtin_fonts.gen.h"], fonts, None)
+    default_theme_builders.make_fonts_header(
+        [out / "default_font.gen.h"], ["thirdparty/fonts/OpenSans_SemiBold.woff2"], None
+    )
+
+
+def build_core_headers(out):
+    env = {"builtin_certs": True, "system_certs_path": ""}
+    core_builders.make_certs_header([out / "certs_compressed.gen.h"], ["thirdparty/certs/ca-certificates.crt"], env)
+    core_builders.make_authors_header([out / "authors.gen.h"], ["AUTHORS.md"], None)
+    core_builders.make_donors_header([out / "donors.gen.h"], ["DONORS.md"], None)
+    core_builders.make_license_header([out / "license.gen.h"], ["COPYRIGHT.txt", "LICENSE.txt"], None)
+    input_builders.make_default_controller_mappings(
+        [out / "default_controller_mappings.gen.cpp"],
+        ["core/input/gamecontrollerdb.txt", "core/input/godotcontrollerdb.txt"],
+        None,
+    )
+
+
+def build_main_headers(out):
+    main_builders.make_splash([out / "splash.gen.h"], ["main/splash.png"], None)
+    if os.path.isfile("main/splash_editor.png"):
+        main_builders.make_splash_editor([out / "splash_editor.gen.h"], ["main/splash_editor.png"], None)
+    main_builders.make_app_icon([out / "app_icon.gen.h"], ["main/app_icon.png"], None)
+
+
+def build_templates(out):
+    for language, extension in [("gdscript", "gd"), ("mono", "cs")]:
+        sources = find_inputs(f"modules/{language}/editor/script_templates/*/*.{extension}")
+        template_builders.make_templates([out / f"{language}_templates.gen.h"], sources, None)
+
+
+def build_wrappers(out):
+    make_virtuals.run([str(out / "gdvirtual.gen.inc")], [], None)
+    make_wrappers.run([str(out / "ext_wrappers.gen.inc")], [], None)
+
+
+def build_scu(out):
+    scu_builders.generate_scu_files(1024)
+    # SCons generates the SCU files of each folder when its SCsub adds its sources.
+    for folder in scu_builders.get_source_index():
+        if folder.split("/")[0] in ["core", "editor", "scene", "servers"]:
+            scu_builders.process_folder([folder])
+
+
+GENERATORS = {
+    "rd_shaders": build_rd_shaders,
+    "raw_shaders": build_raw_shaders,
+    "gles3_shaders": build_gles3_shaders,
+    "docs": build_docs,
+    "translations": build_translations,
+    "icons": build_icons,
+    "fonts": build_fonts,
+    "core_headers": build_core_headers,
+    "main_headers": build_main_headers,
+    "templates": build_templates,
+    "wrappers": build_wrappers,
+    "scu": build_scu,
+}
+
+
+def use_scu_sources_copy(root, monkeypatch):
+    # The SCU generator writes next to the sources, so it runs on a copy of them, leaving the scu/ folders
+    # of the repository untouched. Its state is restored after the test.
+    for folder in ["core", "editor", "scene", "servers"]:
+        shutil.copytree(ROOT / folder, root / folder, ignore=shutil.ignore_patterns("scu", "*.o"))
+    (root / "platform").mkdir()
+
+    monkeypatch.setattr(scu_builders, "base_folder_path", str(root) + "/")
+    monkeypatch.setattr(scu_builders, "base_folder_only", root.name)
+    for name in [
+        "_scu_folders",
+        "_source_index",
+        "_max_includes_per_scu",
+        "_compile_times",
+        "_hot_files",
+        "_memory_budget",
+        "_compile_memory",
+    ]:
+        monkeypatch.setattr(scu_builders, name, getattr(scu_builders, name))
+    monkeypatch.setattr(source_index, "base_folder_path", str(root))
+    monkeypatch.setattr(source_index, "_index", None)
+    monkeypatch.chdir(root)
+
+
+@pytest.mark.parametrize("name", GENERATORS.keys())
+def test_benchmark_builder(name, benchmark, tmp_path, monkeypatch):
+    # Generators resolve includes and inputs relative to the repository root, like SCons does.
+    monkeypatch.chdir(ROOT)
+    if name == "scu":
+        use_scu_sources_copy(tmp_path / "godot", monkeypatch)
+
+    result = benchmark(GENERATORS[name], tmp_path)
+    assert result["min_time"] > 0
@@ -0,0 +1,66 @@
+from contextlib import closing
+
+import pytest
+
+import build_telemetry
+
+
+@pytest.fixture
+def database(tmp_path):
+    path = str(tmp_path / "bin" / "build_telemetry.db")
+    # (target, source, category, duration, cached, size, peak memory) per build.
+    builds = [
+        ("aaaa111", [("a.o", "a.cpp", "compile", 1.0, 0, 100, 1000), ("b.o", "b.cpp", "compile", 5.0, 0, 200, 2000)]),
+        ("bbbb222", [("a.o", "a.cpp", "compile", 2.0, 0, 100, 1500), ("b.o", "b.cpp", "compile", 0.1, 1, 200, None)]),
+        ("cccc333", [("a.o", "a.cpp", "compile", 3.0, 0, 100, None), ("b.o", "b.cpp", "compile", 4.0, 0, 200, 3000)]),
+    ]
+    for start_time, (commit_hash, targets) in enumerate(builds):
+        build_telemetry.record_build(path, commit_hash, "platform=linuxbsd", 4, start_time, 10.0, targets)
+    return path
+
+
+def test_build_telemetry_reports(database):
+    with closing(build_telemetry.open_database(database)) as connection:
+        assert build_telemetry.get_slowest_targets(connection) == [("b.o", 4.0, 200, 3000), ("a.o", 3.0, 100, None)]
+        assert build_telemetry.get_regressions(connection, "aaaa", "cccc") == [("a.o", 1.0, 3.0), ("b.o", 5.0, 4.0)]
+
+        # Fetching from the cache is not a build of the target.
+        growth = build_telemetry.get_growing_targets(connection)
+        assert [(target, round(slope, 3)) for target, slope, _ in growth] == [("a.o", 1.0)]
+
+
+def test_build_telemetry_source_costs(database, tmp_path):
+    compile_times, compile_memory = build_telemetry.get_source_costs(database)
+
+    assert compile_times == {"a.cpp": 3.0, "b.cpp": 4.0}
+    assert compile_memory == {"a.cpp": 1500, "b.cpp": 3000}
+    assert build_telemetry.get_source_costs(str(tmp_path / "missing.db")) == ({}, {})
+
+
+def test_build_telemetry_target_costs(database, tmp_path):
+    # Fetching from the cache doesn't replace the latest duration.
+    durations, peak_memory = build_telemetry.get_target_costs(database)
+    assert durations == {"a.o": 3.0, "b.o": 4.0}
+    assert peak_memory == {"a.o": 1500, "b.o": 3000}
+    assert build_telemetry.get_target_costs(str(tmp_path / "missing.db")) == ({}, {})
+
+
+def test_build_telemetry_costs_by_options(database):
+    build_telemetry.record_build(
+        database,
+        "dddd444",
+        "optimize=none platform=linuxbsd",
+        4,
+        3,
+        10.0,
+        [("a.o", "a.cpp", "compile", 0.5, 0, 100, 500)],
+    )
+
+    assert build_telemetry.get_target_costs(database, options="platform=linuxbsd")[0] == {"a.o": 3.0, "b.o": 4.0}
+    assert build_telemetry.get_source_costs(database, options="platform=linuxbsd")[0] == {"a.cpp": 3.0, "b.cpp": 4.0}
+    assert build_telemetry.get_target_costs(database, options="optimize=none platform=linuxbsd")[0] == {"a.o": 0.5}
+    # Builds with other options are better than nothing.
+    assert build_telemetry.get_target_costs(database, options="lto=full platform=linuxbsd")[0] == {
+        "a.o": 0.5,
+        "b.o": 4.0,
+    }
@@ -0,0 +1,94 @@
+import pytest
+
+import configure_cache
+
+Environment = pytest.importorskip("SCons.Environment").Environment
+
+
+@pytest.fixture
+def cache_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(configure_cache, "_cache", None)
+    (tmp_path / "detect.py").write_text('os.environ.get("SDK_ROOT")\n')
+    return str(tmp_path / "configure_cache.pickle")
+
+
+def configure(env, runs):
+    runs.append(True)
+    print("Configuring.")
+    env.Append(CCFLAGS=["-pipe"], CPPDEFINES=[("VERSION", 2)])
+    env.msvc = False
+    return {"found": ["zlib"]}
+
+
+def run_configure(tmp_path, cache_path, env, runs):
+    configure_cache.open_cache([str(tmp_path / "detect.py")], path=cache_path)
+    result = configure_cache.run(env, "configure", lambda: configure(env, runs))
+    configure_cache.save_cache()
+    return result
+
+
+def test_configure_cache_replay(tmp_path, cache_path, capsys, monkeypatch):
+    runs = []
+    env = Environment(tools=[], CCFLAGS=["-O2"])
+    assert run_configure(tmp_path, cache_path, env, runs) == {"found": ["zlib"]}
+    assert capsys.readouterr().out == "Configuring.\n"
+
+    replayed_env = Environment(tools=[], CCFLAGS=["-O2"])
+    assert run_configure(tmp_path, cache_path, replayed_env, runs) == {"found": ["zlib"]}
+    assert len(runs) == 1
+    assert capsys.readouterr().out == "Configuring.\n"
+    assert list(replayed_env["CCFLAGS"]) == list(env["CCFLAGS"]) == ["-O2", "-pipe"]
+    assert list(replayed_env["CPPDEFINES"]) == list(env["CPPDEFINES"])
+    assert replayed_env.msvc is False
+
+    # Different starting environments, build scripts or environment variables read by the scripts.
+    run_configure(tmp_path, cache_path, Environment(tools=[], CCFLAGS=["-O3"]), runs)
+    assert len(runs) == 2
+    monkeypatch.setenv("SDK_ROOT", "/opt/sdk")
+    run_configure(tmp_path, cache_path, Environment(tools=[], CCFLAGS=["-O2"]), runs)
+    assert len(runs) == 3
+    (tmp_path / "detect.py").write_text("")
+    run_configure(tmp_path, cache_path, Environment(tools=[], CCFLAGS=["-O2"]), runs)
+    assert len(runs) == 4
+
+
+def test_configure_cache_dependencies(tmp_path, cache_path):
+    runs = []
+    sdk = tmp_path / "sdk.pc"
+    sdk.write_text("")
+
+    def configure_with_dependency(env):
+        runs.append(True)
+        configure_cache.add_dependency(str(sdk))
+        env.Append(LIBS=["sdk"])
+
+    def run():
+        configure_cache.open_cache([], path=cache_path)
+        env = Environment(tools=[])
+        configure_cache.run(env, "configure", lambda: configure_with_dependency(env))
+        configure_cache.save_cache()
+        assert list(env["LIBS"]) == ["sdk"]
+
+    run()
+    run()
+    assert len(runs) == 1
+
+    sdk.unlink()
+    run()
+    assert len(runs) == 2
+
+
+def test_configure_cache_objects(tmp_path, cache_path):
+    runs = []
+
+    def add_method(env):
+        runs.append(True)
+        env.AddMethod(lambda env: None, "CustomMethod")
+
+    for _ in range(2):
+        configure_cache.open_cache([], path=cache_path)
+        env = Environment(tools=[])
+        configure_cache.run(env, "configure", lambda: add_method(env))
+        configure_cache.save_cache()
+        assert hasattr(env, "CustomMethod")
+    assert len(runs) == 2
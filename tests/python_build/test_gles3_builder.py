@@ -2,7 +2,7 @@ import json
 
 import pytest
 
-from gles3_builders import build_gles3_header, GLES3HeaderStruct
+from gles3_builders import build_gles3_header, GLES3HeaderStruct, generate_gles3_manifest, include_file_in_gles3_header
 
 
 @pytest.mark.parametrize(
@@ -29,3 +29,71 @@ def test_gles3_builder(shader_files, builder, header_struct):
         expected_output = f.read()
 
     assert actual_output == expected_output
+
+
+@pytest.mark.parametrize("shader_files", ["gles3/vertex_fragment"], indirect=True)
+def test_gles3_builder_manifest(shader_files, tmp_path):
+    header = GLES3HeaderStruct()
+    manifest_path = str(tmp_path / "vertex_fragment.glsl.gen.json")
+
+    build_gles3_header(
+        shader_files["path_input"],
+        "drivers/gles3/shader_gles3.h",
+        "GLES3",
+        header_data=header,
+        optional_manifest_filename=manifest_path,
+    )
+
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    assert manifest == generate_gles3_manifest(header, "VertexFragmentShaderGLES3")
+    assert manifest["warmup"] == [{"variant": "MODE_NINEPATCH", "specialization": 0}]
+    assert manifest["combination_count"] == 2
+
+
+def test_gles3_builder_declarations(tmp_path):
+    shader = tmp_path / "declarations.glsl"
+    shader.write_text(
+        """#[vertex]
+
+layout(std140) uniform SceneData { //ubo:2
+\tvec4 scene_uniforms[MAX_SCENE_UNIFORMS];
+};
+uniform highp float time; // seconds, since startup
+uniform vec2 offsets[4], scale;
+/* uniform float disabled;
+uniform float also_disabled; */
+out highp vec4 out_color; //tfb:USE_COLOR
+
+#[fragment]
+
+uniform sampler2D albedo, normal_map; //texunit:auto
+""",
+        encoding="utf-8",
+    )
+
+    header = include_file_in_gles3_header(str(shader), GLES3HeaderStruct(), 0)
+
+    assert header.uniforms == ["time", "offsets", "scale"]
+    assert header.ubos == [("SceneData", "2")]
+    assert header.texunits == [("albedo", "-1"), ("normal_map", "-1")]
+    assert header.feedbacks == [("out_color", "USE_COLOR")]
+    assert len(header.vertex_lines) == 10
+    assert header.fragment_lines == ["", "uniform sampler2D albedo, normal_map; //texunit:auto"]
+
+
+def test_gles3_builder_error_location(tmp_path):
+    shader = tmp_path / "broken.glsl"
+    shader.write_text("#[vertex]\n\nuniform sampler2D tex; //texunit:first\n", encoding="utf-8")
+
+    with pytest.raises(ValueError, match=r"broken\.glsl:3: invalid texunit binding"):
+        include_file_in_gles3_header(str(shader), GLES3HeaderStruct(), 0)
+
+
+def test_gles3_builder_missing_include(tmp_path):
+    shader = tmp_path / "missing_include.glsl"
+    shader.write_text('#[vertex]\n\n#include "missing.glsl"\n', encoding="utf-8")
+
+    with pytest.raises(ValueError, match=r'missing_include\.glsl:3: #include "missing\.glsl" could not be found\.'):
+        include_file_in_gles3_header(str(shader), GLES3HeaderStruct(), 0)
@@ -2,7 +2,15 @@ import json
 
 import pytest
 
-from glsl_builders import build_raw_header, RAWHeaderStruct, build_rd_header, RDHeaderStruct
+from glsl_builders import (
+    build_raw_header,
+    RAWHeaderStruct,
+    build_rd_header,
+    RDHeaderStruct,
+    build_rd_shared_include,
+    generate_inline_code,
+    get_rd_include_symbol,
+)
 
 
 @pytest.mark.parametrize(
@@ -35,3 +43,35 @@ def test_glsl_builder(shader_files, builder, header_struct):
         expected_output = f.read()
 
     assert actual_output == expected_output
+
+
+@pytest.mark.parametrize("shader_files", ["rd_glsl/vertex_fragment", "rd_glsl/compute"], indirect=True)
+def test_rd_builder_shared_includes(shader_files, tmp_path):
+    header = RDHeaderStruct()
+    build_rd_header(shader_files["path_input"], header_data=header, shared_includes=True)
+
+    with open(shader_files["path_output"], "r", encoding="utf-8") as f:
+        actual_output = f.read()
+
+    symbol = get_rd_include_symbol("tests/python_build/fixtures/rd_glsl/_included.glsl", 0)
+    assert f"extern const char {symbol}[];" in actual_output
+    assert "_segments[] = {" in actual_output
+
+    # Segments must cover the stage lines in order, so the concatenated code is unchanged.
+    for lines, segments in [
+        (header.vertex_lines, header.vertex_segments),
+        (header.fragment_lines, header.fragment_segments),
+        (header.compute_lines, header.compute_segments),
+    ]:
+        assert [i for segment in segments for i in range(segment[2], segment[3])] == list(range(len(lines)))
+
+    shared_output = str(tmp_path / "shared_includes.gen.cpp")
+    build_rd_shared_include([shader_files["path_input"]], shared_output)
+
+    with open(shared_output, "r", encoding="utf-8") as f:
+        actual_shared = f.read()
+
+    assert (
+        f"extern const char {symbol}[] = {{\n{generate_inline_code(['#define M_PI 3.14159265359'])}\n}};"
+        in actual_shared
+    )
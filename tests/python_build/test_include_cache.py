@@ -0,0 +1,85 @@
+import os
+
+import pytest
+
+FS = pytest.importorskip("SCons.Node.FS").FS
+Builder = pytest.importorskip("SCons.Builder").Builder
+CScanner = pytest.importorskip("SCons.Scanner.C").CScanner
+
+from include_cache import IncludeCache, IncludeScanner  # noqa: E402
+
+
+@pytest.fixture
+def tree(tmp_path):
+    for path, content in [
+        ("src/main.cpp", '#include "a.h"\n#include <b.h>\n#include <missing.h>\n'),
+        ("src/a.h", ""),
+        ("inc2/b.h", ""),
+    ]:
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).write_text(content)
+    (tmp_path / "inc1").mkdir()
+    return tmp_path
+
+
+def scan(tree, search_path=("inc1", "inc2"), generated=()):
+    """
+    Scan src/main.cpp like a new build, checking the result against the scanner of SCons.
+    Return the found paths, relative to the tree, and the cache.
+    """
+    results = []
+    for scanner in [CScanner(), IncludeScanner(IncludeCache(str(tree / "include_cache.pickle")))]:
+        fs = FS(str(tree))
+        for path in generated:
+            fs.File(str(tree / path)).builder_set(Builder(action="touch $TARGET"))
+        nodes = scanner.scan(fs.File(str(tree / "src" / "main.cpp")), tuple(fs.Dir(str(tree / d)) for d in search_path))
+        results.append([os.path.relpath(n.get_abspath(), tree) for n in nodes])
+    assert results[0] == results[1]
+    scanner.cache.save()
+    return results[1], scanner.cache
+
+
+def test_include_cache_reuse(tree):
+    found, cache = scan(tree)
+    assert found == ["src/a.h", "inc2/b.h"]
+    assert (cache.hits, cache.misses) == (0, 1)
+
+    assert scan(tree)[1].hits == 1
+    # Only the content matters, not the modification time.
+    (tree / "src" / "main.cpp").write_text((tree / "src" / "main.cpp").read_text())
+    assert scan(tree)[1].hits == 1
+
+    (tree / "src" / "main.cpp").write_text('#include "a.h"\n#include <c.h>\n')
+    (tree / "inc1" / "c.h").write_text("")
+    found, cache = scan(tree)
+    assert found == ["src/a.h", "inc1/c.h"]
+    assert cache.misses == 1
+
+
+def test_include_cache_search_path(tree):
+    scan(tree)
+
+    # Added earlier in the search path.
+    (tree / "inc1" / "b.h").write_text("")
+    found, cache = scan(tree)
+    assert found == ["src/a.h", "inc1/b.h"]
+    assert cache.misses == 1
+    os.remove(tree / "inc1" / "b.h")
+    assert scan(tree)[0] == ["src/a.h", "inc2/b.h"]
+
+    (tree / "inc1" / "missing.h").write_text("")
+    assert scan(tree)[0] == ["src/a.h", "inc2/b.h", "inc1/missing.h"]
+
+    found, cache = scan(tree, search_path=("inc2",))
+    assert found == ["src/a.h", "inc2/b.h"]
+    assert cache.misses == 1
+
+
+def test_include_cache_generated(tree):
+    scan(tree)
+
+    # Found when it's to be built, even if it's not written yet.
+    found, cache = scan(tree, generated=["inc1/b.h"])
+    assert found == ["src/a.h", "inc1/b.h"]
+    assert cache.misses == 1
+    assert scan(tree, generated=["inc1/b.h"])[1].hits == 1
@@ -0,0 +1,39 @@
+import os
+import shutil
+import subprocess
+
+import pytest
+
+import methods
+
+
+def git(repository, *args):
+    environment = dict(os.environ, GIT_AUTHOR_NAME="Godot", GIT_AUTHOR_EMAIL="godot@localhost")
+    environment.update(GIT_COMMITTER_NAME="Godot", GIT_COMMITTER_EMAIL="godot@localhost")
+    return subprocess.check_output(["git", "-C", str(repository)] + list(args), env=environment).decode().strip()
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="needs git")
+@pytest.mark.parametrize("packed", [False, True])
+def test_get_git_commit_timestamp(tmp_path, packed):
+    git(tmp_path, "init", "-q")
+    for i in range(20):
+        # Similar files and messages, so the packed objects are stored as deltas.
+        (tmp_path / "file.txt").write_text("".join(f"line {j}\n" for j in range(200 + i)))
+        git(tmp_path, "add", "file.txt")
+        git(tmp_path, "commit", "-q", "-m", "Commit\n\n" + "Description.\n" * 50, "--date", f"@{1700000000 + i}")
+    if packed:
+        git(tmp_path, "gc", "-q", "--aggressive")
+        assert not list((tmp_path / ".git" / "objects").glob("??/*"))
+
+    gitfolder = str(tmp_path / ".git")
+    for commit in git(tmp_path, "rev-list", "HEAD").split():
+        expected = int(git(tmp_path, "log", "-1", "--pretty=format:%ct", commit))
+        assert methods.get_git_commit_timestamp(gitfolder, commit) == expected
+
+    # Deltas are applied, whichever object they're based on.
+    for line in git(tmp_path, "rev-list", "--objects", "--all").splitlines():
+        object_hash = line.split()[0]
+        object_type, data = methods._read_git_object(os.path.join(gitfolder, "objects"), object_hash)
+        assert object_type == git(tmp_path, "cat-file", "-t", object_hash)
+        assert data == subprocess.check_output(["git", "-C", str(tmp_path), "cat-file", object_type, object_hash])
@@ -0,0 +1,93 @@
+import os
+import stat
+
+import pytest
+
+import platform_methods
+
+# Logs its arguments, and finds packages in the folder given by FAKE_PC_PATH.
+FAKE_PKG_CONFIG = """#!/bin/sh
+echo "$@" >> "$FAKE_PKG_CONFIG_LOG"
+if [ "$1" = "--variable" ]; then
+    echo "$FAKE_PC_PATH"
+    exit 0
+fi
+shift 2
+for package in "$@"; do
+    if [ ! -f "$FAKE_PC_PATH/$package.pc" ]; then
+        echo "Package $package was not found" >&2
+        exit 1
+    fi
+    printf -- "-l%s " "$package"
+done
+"""
+
+
+class FakeEnvironment(dict):
+    def MergeFlags(self, flags):
+        self.setdefault("flags", []).append(flags)
+
+
+@pytest.fixture
+def pkg_config_env(tmp_path):
+    if os.name != "posix":
+        pytest.skip("the fake pkg-config is a shell script")
+    binary = tmp_path / "bin" / "pkg-config"
+    binary.parent.mkdir()
+    binary.write_text(FAKE_PKG_CONFIG)
+    binary.chmod(binary.stat().st_mode | stat.S_IEXEC)
+    (tmp_path / "pc").mkdir()
+    (tmp_path / "pc" / "foo.pc").write_text("Requires: bar >= 1.0\n")
+    (tmp_path / "pc" / "bar.pc").write_text("\n")
+    return FakeEnvironment(
+        ENV={
+            "PATH": str(binary.parent),
+            "FAKE_PC_PATH": str(tmp_path / "pc"),
+            "FAKE_PKG_CONFIG_LOG": str(tmp_path / "log"),
+        }
+    )
+
+
+def get_log(tmp_path):
+    log = tmp_path / "log"
+    if not log.exists():
+        return []
+    lines = log.read_text().splitlines()
+    log.unlink()
+    return lines
+
+
+def test_pkg_config_cache(tmp_path, pkg_config_env):
+    cache = str(tmp_path / "cache" / "pkg_config.json")
+    pkg_config = platform_methods.PkgConfig(pkg_config_env, cache)
+    assert pkg_config.exists("foo")
+    assert not pkg_config.exists("baz")
+    pkg_config.parse_config("foo")
+    assert pkg_config_env["flags"] == ["-lfoo"]
+    pkg_config.save()
+    assert get_log(tmp_path) == ["--variable pc_path pkg-config", "--cflags --libs foo", "--cflags --libs baz"]
+
+    # Nothing changed, pkg-config isn't run.
+    pkg_config = platform_methods.PkgConfig(pkg_config_env, cache)
+    assert pkg_config.exists("foo")
+    assert not pkg_config.exists("baz")
+    assert get_log(tmp_path) == []
+
+    # A changed requirement invalidates the packages requiring it.
+    os.utime(tmp_path / "pc" / "bar.pc", ns=(0, 0))
+    assert pkg_config.exists("foo")
+    assert get_log(tmp_path) == ["--cflags --libs foo"]
+    pkg_config.save()
+
+    # So does a new package in the search path.
+    (tmp_path / "pc" / "baz.pc").write_text("\n")
+    os.utime(tmp_path / "pc", ns=(1, 1))
+    pkg_config = platform_methods.PkgConfig(pkg_config_env, cache)
+    assert pkg_config.exists("baz")
+    assert get_log(tmp_path) == ["--variable pc_path pkg-config", "--cflags --libs baz"]
+
+
+def test_read_pc_requires(tmp_path):
+    pc_file = tmp_path / "foo.pc"
+    pc_file.write_text("Name: foo\nRequires: bar >= 1.0, baz>=2.0 qux\nRequires.private: glib-2.0<3,gio-2.0 = 2.80\n")
+    assert platform_methods._read_pc_requires(str(pc_file)) == ["bar", "baz", "qux", "glib-2.0", "gio-2.0"]
@@ -0,0 +1,128 @@
+import os
+import threading
+from contextlib import closing
+
+import pytest
+
+import scons_cache
+
+
+def write_entry(cache, name, size, last_use):
+    path = cache / name
+    path.parent.mkdir(exist_ok=True)
+    path.write_bytes(b"x" * size)
+    os.utime(path, (last_use, last_use))
+
+
+def test_cache_index_prune(tmp_path):
+    write_entry(tmp_path, "AA/aa1", 100, 1000)
+    write_entry(tmp_path, "AA/aa2", 100, 2000)
+    write_entry(tmp_path, "BB/bb1", 400, 1500)
+    (tmp_path / "config").write_text("{}")
+
+    index = scons_cache.CacheIndex(str(tmp_path), half_life=1000)
+    assert index.get_size() == 600
+
+    # Being twice as large counts as being used one half life later, so bb1 outlives the entries used after it.
+    index.record("AA/aa2", 100, 500)
+    write_entry(tmp_path, "CC/cc1", 100, 0)
+    index.record("CC/cc1", 100, 3000)
+    assert index.prune(500) == ["AA/aa2", "AA/aa1"]
+    assert sorted(p.name for p in tmp_path.glob("*/*")) == ["bb1", "cc1"]
+
+    # The existing entries are only indexed once.
+    assert scons_cache.CacheIndex(str(tmp_path)).get_size() == 500
+    assert index.prune(500) == []
+
+
+def test_cache_index_insert_twice(tmp_path):
+    index = scons_cache.CacheIndex(str(tmp_path))
+    with closing(index.connect()) as connection, connection:
+        index.insert(connection, [("AA/aa1", 100, 1000)])
+    with closing(index.connect()) as connection, connection:
+        index.insert(connection, [("AA/aa1", 300, 2000), ("BB/bb1", 50, 2000)])
+    assert index.get_size() == 350
+
+    # The total follows the entries when they are removed.
+    assert index.prune(0) == ["BB/bb1", "AA/aa1"]
+    assert index.get_size() == 0
+
+
+@pytest.mark.parametrize("compression", list(scons_cache.COMPRESSIONS))
+def test_cache_compression(tmp_path, compression):
+    pytest.importorskip(scons_cache.COMPRESSIONS[compression])
+    data = bytes(range(256)) * 4096
+    (tmp_path / "object.o").write_bytes(data)
+
+    entry = str(tmp_path / f"entry.{compression}")
+    assert scons_cache.get_compression(entry) == compression
+    scons_cache.compress_file(compression, str(tmp_path / "object.o"), entry)
+    assert os.path.getsize(entry) < len(data) / 10
+
+    scons_cache.decompress_file(compression, entry, str(tmp_path / "retrieved.o"))
+    assert (tmp_path / "retrieved.o").read_bytes() == data
+
+
+def test_cache_compression_temporary_name(tmp_path):
+    pytest.importorskip("SCons.CacheDir")
+    cachedir_class = scons_cache.get_cachedir_class("gzip")
+    data = bytes(range(256)) * 4096
+    (tmp_path / "object.o").write_bytes(data)
+
+    # SCons < 4.6 writes the entry under a temporary name, then renames it.
+    entry = str(tmp_path / "entry.gzip")
+    cachedir_class.copy_to_cache(None, str(tmp_path / "object.o"), entry + ".tmp0123")
+    os.rename(entry + ".tmp0123", entry)
+    assert os.path.getsize(entry) < len(data) / 10
+
+    class FakeEnvironment:
+        cache_timestamp_newer = False
+
+    cachedir_class.copy_from_cache(FakeEnvironment(), entry, str(tmp_path / "retrieved.o"))
+    assert (tmp_path / "retrieved.o").read_bytes() == data
+
+
+@pytest.fixture
+def cache_server(tmp_path, monkeypatch):
+    monkeypatch.setattr(scons_cache.CacheRequestHandler, "directory", str(tmp_path / "server"))
+    monkeypatch.setattr(scons_cache.CacheRequestHandler, "quiet", True)
+    server = scons_cache.CacheServer(("127.0.0.1", 0), scons_cache.CacheRequestHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_remote_cache(tmp_path, cache_server):
+    remote = scons_cache.RemoteCache(cache_server)
+    (tmp_path / "object.o").write_bytes(b"object")
+
+    assert not remote.download("0123abcd", str(tmp_path / "local" / "01" / "0123abcd"))
+    remote.upload(str(tmp_path / "object.o"), "0123abcd.zstd")
+    remote.wait()
+    assert (tmp_path / "server" / "01" / "0123abcd.zstd").read_bytes() == b"object"
+
+    assert remote.download("0123abcd.zstd", str(tmp_path / "local" / "01" / "0123abcd.zstd"))
+    assert (tmp_path / "local" / "01" / "0123abcd.zstd").read_bytes() == b"object"
+    assert os.listdir(tmp_path / "local" / "01") == ["0123abcd.zstd"]
+    assert not remote.failed
+
+    # Names outside of the cache are refused.
+    assert not remote.download("..%2Fconfig", str(tmp_path / "config"))
+    assert remote.failed
+
+
+def test_cache_stats():
+    stats = scons_cache.CacheStats()
+    stats.record_hit("core/a.o", 100)
+    stats.record_hit("core/b.o", 50, remote=True)
+    for target in ["core/c.o", "scene/a.o", "scene/b.o", "main.o"]:
+        stats.record_miss(target)
+    stats.record_push(300)
+
+    summary = stats.get_summary({"core/a.o": 2.5, "scene/a.o": 4.0}, limit=2)
+    assert summary["hits"] == 2 and summary["misses"] == 4 and summary["remote_hits"] == 1
+    assert summary["hit_rate"] == 2 / 6
+    assert (summary["bytes_retrieved"], summary["bytes_stored"]) == (150, 300)
+    assert (summary["time_saved"], summary["hits_without_duration"]) == (2.5, 1)
+    assert summary["misses_by_folder"] == [("scene", 2), ("", 1)]
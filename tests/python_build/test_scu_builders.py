@@ -0,0 +1,201 @@
+import subprocess
+
+import pytest
+
+import scu_builders
+import source_index
+from scu_builders import partition_includes
+
+INCLUDES = [f'#include "scene/file_{i}.cpp"' for i in range(8)]
+COSTS = [90, 80, 10, 10, 10, 10, 10, 20]
+
+
+def get_loads(partition):
+    return sorted(sum(COSTS[i] for i in indices) for indices in partition)
+
+
+def test_scu_partition_balanced():
+    partition = partition_includes(INCLUDES, COSTS, 2, 4)
+
+    # Alphabetical halves would cost 190 and 50, here both expensive files are kept apart.
+    assert get_loads(partition) == [120, 120]
+    assert all(len(indices) <= 4 for indices in partition)
+    assert sorted(i for indices in partition for i in indices) == list(range(8))
+
+
+@pytest.mark.parametrize("includes_per_scu", [3, 4, 8])
+def test_scu_partition_limit(includes_per_scu):
+    partition = partition_includes(INCLUDES, COSTS, 3, includes_per_scu)
+
+    assert all(len(indices) <= includes_per_scu for indices in partition)
+
+
+def test_scu_partition_stable():
+    previous = [[INCLUDES[i] for i in sorted(indices)] for indices in partition_includes(INCLUDES, COSTS, 2, 8)]
+
+    # A small cost change keeps the previous files, a new include goes to the cheapest one.
+    costs = [95] + COSTS[1:] + [5]
+    partition = partition_includes(INCLUDES + ['#include "scene/new.cpp"'], costs, 2, 8, previous)
+    assert [[INCLUDES[i] for i in sorted(indices) if i < 8] for indices in partition] == previous
+    assert 8 in min(partition, key=lambda indices: sum(costs[i] for i in indices if i < 8))
+
+    # Once the previous files get too unbalanced, they are packed again.
+    costs = COSTS[:2] + [200] + COSTS[3:]
+    partition = partition_includes(INCLUDES, costs, 2, 8, previous)
+    assert [[INCLUDES[i] for i in sorted(indices)] for indices in partition] != previous
+
+
+@pytest.fixture
+def scu_tree(tmp_path, monkeypatch):
+    monkeypatch.setattr(scu_builders, "base_folder_path", str(tmp_path) + "/")
+    monkeypatch.setattr(scu_builders, "base_folder_only", tmp_path.name)
+    # The sources are indexed on first use, after the test has created them.
+    monkeypatch.setattr(scu_builders, "_source_index", None)
+    monkeypatch.setattr(source_index, "base_folder_path", str(tmp_path))
+    monkeypatch.setattr(source_index, "_index", None)
+
+    (tmp_path / "scene").mkdir()
+    for name in ["a", "b", "c"]:
+        (tmp_path / "scene" / f"{name}.cpp").write_text(f"int {name}() {{ return 0; }}\n")
+    return tmp_path
+
+
+def test_scu_hot_files(scu_tree, monkeypatch):
+    subprocess.run(["git", "init", "-q"], cwd=scu_tree, check=True)
+    subprocess.run(["git", "add", "."], cwd=scu_tree, check=True)
+    subprocess.run(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@example.com", "commit", "-q", "-m", "init"],
+        cwd=scu_tree,
+        check=True,
+    )
+    (scu_tree / "scene" / "b.cpp").write_text("int b() { return 1; }\n")
+    (scu_tree / "scene" / "d.cpp").write_text("int d() { return 0; }\n")
+    (scu_tree / "scene" / "c.cpp").unlink()
+
+    hot_files = scu_builders.find_hot_files()
+    assert hot_files == {"scene/b.cpp", "scene/d.cpp"}
+
+    monkeypatch.setattr(scu_builders, "_hot_files", hot_files)
+    scu_builders.process_folder(["scene"])
+
+    assert (scu_tree / "scene/scu/scu_scene.gen.cpp").read_text() == '#include "scene/a.cpp"\n'
+    assert (scu_tree / "scene/scu/scu_scene_hot_exception.gen.cpp").read_text() == '#include "scene/b.cpp"\n'
+    assert (scu_tree / "scene/scu/scu_scene_hot_exception_1.gen.cpp").read_text() == '#include "scene/d.cpp"\n'
+
+
+def test_scu_clashing_files(scu_tree):
+    (scu_tree / "scene" / "a.cpp").write_text("static int helper() { return 0; }\n#define SIZE 4\n")
+    (scu_tree / "scene" / "b.cpp").write_text("namespace {\nint helper() { return 1; }\n}\n")
+    (scu_tree / "scene" / "c.cpp").write_text("#define SIZE 4\nstatic const int value = SIZE;\n")
+    (scu_tree / "scene" / "d.cpp").write_text("#define SIZE 8\n#undef SIZE\n")
+    (scu_tree / "scene" / "e.cpp").write_text("#define SIZE 16\n")
+
+    includes = [f'#include "scene/{name}.cpp"' for name in "abcde"]
+    assert scu_builders.find_clashing_includes(includes) == [
+        (includes[1], "helper", "scene/a.cpp"),
+        (includes[4], "#SIZE", "scene/a.cpp"),
+    ]
+
+    scu_builders.process_folder(["scene"])
+
+    assert (scu_tree / "scene/scu/scu_scene.gen.cpp").read_text() == "".join(includes[i] + "\n" for i in [0, 2, 3])
+    assert (scu_tree / "scene/scu/scu_scene_exception.gen.cpp").read_text() == includes[1] + "\n"
+    assert (scu_tree / "scene/scu/scu_scene_exception_1.gen.cpp").read_text() == includes[4] + "\n"
+
+
+def test_scu_clashing_files_reported(scu_tree, capsys):
+    (scu_tree / "scene" / "a.cpp").write_text("_FORCE_INLINE_ static int helper() { return 0; }\n")
+    (scu_tree / "scene" / "b.cpp").write_text("static int helper() { return 1; }\n")
+
+    scu_builders.process_folder(["scene"])
+    assert (
+        'SCU: Compiling "scene/b.cpp" on its own, symbol "helper" is also in "scene/a.cpp".' in capsys.readouterr().out
+    )
+
+    # Not reported again while the SCU files are unchanged.
+    scu_builders.process_folder(["scene"])
+    assert capsys.readouterr().out == ""
+
+
+def test_scu_static_aggregates():
+    symbols = scu_builders.find_file_local_symbols(
+        "static struct {\n  const char* label;\n  struct { int x; } pos;\n} kLabels[4];\n"
+        "static const struct {\n  int method_;\n} kLosslessPresets[10] = {\n  { 0 }, { 1 }\n};\n"
+        "static const struct Preset kDefault = { 0 };\n"
+        "static enum Mode { MODE_A, MODE_B } mode = MODE_A;\n"
+    )
+    assert symbols == {
+        "kLabels": "static",
+        "kLosslessPresets": "static",
+        "kDefault": "static",
+        "Mode": "static",
+        "mode": "static",
+    }
+
+
+def test_scu_memory_budget(scu_tree, monkeypatch):
+    assert scu_builders.get_memory_budget(4, available_memory=16 * 1024**3) == 3 * 1024**3
+
+    # Each file is estimated to need 100 MiB on top of the base memory, so two of them fit in 256 MiB.
+    monkeypatch.setattr(scu_builders, "_base_compile_memory", 0)
+    monkeypatch.setattr(scu_builders, "_memory_per_cost", 1)
+    monkeypatch.setattr(scu_builders, "estimate_compile_cost", lambda path: 100 * 1024**2)
+    monkeypatch.setattr(scu_builders, "_memory_budget", 256 * 1024**2)
+    scu_builders.process_folder(["scene"])
+
+    assert len(list((scu_tree / "scene/scu").glob("scu_scene*.gen.cpp"))) == 2
+
+    # Recorded memory takes precedence over the estimate.
+    monkeypatch.setattr(scu_builders, "_compile_memory", {"scene/a.cpp": 10, "scene/b.cpp": 10, "scene/c.cpp": 10})
+    scu_builders.process_folder(["scene"])
+
+    assert [path.name for path in (scu_tree / "scene/scu").glob("scu_scene*.gen.cpp")] == ["scu_scene.gen.cpp"]
+
+
+def test_scu_source_index(scu_tree):
+    (scu_tree / "scene" / "3d").mkdir()
+    (scu_tree / "scene" / "3d" / "node.cpp").write_text("")
+    (scu_tree / "scene" / "3d" / "node.h").write_text("")
+    (scu_tree / "scene" / "3d" / "generated.gen.cpp").write_text("")
+    (scu_tree / "scene" / "3d" / "scu").mkdir()
+    (scu_tree / "scene" / "3d" / "scu" / "scu_other.cpp").write_text("")
+
+    assert scu_builders.get_source_index() == {"scene": ["a.cpp", "b.cpp", "c.cpp"], "scene/3d": ["node.cpp"]}
+
+    scu_builders.process_folder(["scene", "3d"])
+    assert (scu_tree / "scene/scu/scu_scene.gen.cpp").read_text() == "".join(
+        f'#include "scene/{name}.cpp"\n' for name in ["3d/node", "a", "b", "c"]
+    )
+
+
+def test_scu_file_list(scu_tree):
+    (scu_tree / "thirdparty" / "lib" / "src").mkdir(parents=True)
+    files = ["thirdparty/lib/a.c", "thirdparty/lib/src/b.c", "thirdparty/lib/src/c.c"]
+    for file in files:
+        (scu_tree / file).write_text("")
+
+    generated = scu_builders.process_files(files, ["c"])
+    assert generated == [
+        str(scu_tree / "thirdparty/lib/scu/scu_thirdparty_lib.gen.c"),
+        str(scu_tree / "thirdparty/lib/scu/scu_thirdparty_lib_exception.gen.c"),
+    ]
+    assert (scu_tree / "thirdparty/lib/scu/scu_thirdparty_lib.gen.c").read_text() == "".join(
+        f'#include "{file}"\n' for file in files[:2]
+    )
+
+    # The SCU folder of the library cannot be shared with other files.
+    assert scu_builders.process_files(["thirdparty/lib/d.c"]) is None
+
+
+def test_scu_compile_memory(scu_tree, monkeypatch):
+    monkeypatch.setattr(scu_builders, "_base_compile_memory", 1000)
+    monkeypatch.setattr(scu_builders, "_memory_per_cost", 1)
+    monkeypatch.setattr(scu_builders, "_compile_memory", {"scene/a.cpp": 1500})
+    cost_b = scu_builders.estimate_compile_cost("scene/b.cpp")
+
+    assert scu_builders.estimate_compile_memory("scene/b.cpp") == 1000 + cost_b
+
+    # SCU files need the memory of the files they include, on top of a single compiler.
+    (scu_tree / "scene" / "scu").mkdir()
+    (scu_tree / "scene" / "scu" / "scu_scene.gen.cpp").write_text('#include "scene/a.cpp"\n#include "scene/b.cpp"\n')
+    assert scu_builders.estimate_compile_memory("scene/scu/scu_scene.gen.cpp") == 1000 + 500 + cost_b
@@ -0,0 +1,87 @@
+import glob
+import os
+import time
+
+import pytest
+
+from conftest import ROOT
+from source_index import SourceIndex
+
+
+def make_tree(root):
+    for path in ["core/math/vector2.cpp", "core/math/vector2.h", "core/os/os.cpp", "core/.hidden.cpp", "version.py"]:
+        (root / path).parent.mkdir(parents=True, exist_ok=True)
+        (root / path).write_text("")
+    (root / ".git").mkdir()
+    (root / ".git" / "HEAD").write_text("")
+
+
+def age_folders(root):
+    # Older than the snapshot, so their modification time can be trusted.
+    old = time.time() - 60
+    for folder, dirs, files in os.walk(root):
+        os.utime(folder, (old, old))
+
+
+def test_source_index_glob(tmp_path, monkeypatch):
+    make_tree(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    index = SourceIndex(root=str(tmp_path))
+
+    for pattern in ["core/*", "core/*/*.cpp", "core/math/vector2.h", "core/math/missing.h", "*/.hidden*", "core/m*"]:
+        assert sorted(index.glob(pattern)) == sorted(glob.glob(pattern)), pattern
+    assert sorted(index.glob(str(tmp_path / "core" / "*" / "*.h"))) == [str(tmp_path / "core" / "math" / "vector2.h")]
+
+    assert index.listdir("core") == (["math", "os"], [".hidden.cpp"])
+    assert index.listdir("core/os/os.cpp") is None
+    assert index.isdir("core/math") and not index.isdir("version.py")
+    assert index.isfile("version.py") and not index.isfile("core")
+    # Hidden folders aren't walked, but are listed when queried.
+    assert ".git" not in [folder for folder, dirs, files in index.walk()]
+    assert index.listdir(".git") == ([], ["HEAD"])
+
+
+def test_source_index_add_file(tmp_path):
+    make_tree(tmp_path)
+    index = SourceIndex(root=str(tmp_path))
+
+    (tmp_path / "core" / "os" / "os.gen.cpp").write_text("")
+    assert not index.isfile(tmp_path / "core" / "os" / "os.gen.cpp")
+    index.add_file(tmp_path / "core" / "os" / "os.gen.cpp")
+    assert index.listdir(tmp_path / "core" / "os") == ([], ["os.cpp", "os.gen.cpp"])
+    index.remove_file(tmp_path / "core" / "os" / "os.cpp")
+    assert index.listdir(tmp_path / "core" / "os") == ([], ["os.gen.cpp"])
+
+
+def test_source_index_persisted(tmp_path):
+    root = tmp_path / "godot"
+    make_tree(root)
+    age_folders(root)
+    path = str(tmp_path / "source_index.pickle")
+    SourceIndex(root=str(root), path=path).save()
+
+    # Unchanged folders aren't listed again.
+    index = SourceIndex(root=str(root), path=path)
+    assert index.listed == 0
+    assert not index.dirty
+
+    (root / "core" / "math" / "vector3.cpp").write_text("")
+    (root / "core" / "io").mkdir()
+    (root / "core" / "io" / "file.cpp").write_text("")
+    index = SourceIndex(root=str(root), path=path)
+    assert index.listed == 3
+    assert index.glob(str(root / "core" / "*" / "*.cpp")) == [
+        str(root / "core" / "io" / "file.cpp"),
+        str(root / "core" / "math" / "vector2.cpp"),
+        str(root / "core" / "math" / "vector3.cpp"),
+        str(root / "core" / "os" / "os.cpp"),
+    ]
+
+
+@pytest.mark.parametrize("persisted", [False, True], ids=["fresh", "persisted"])
+def test_benchmark_source_index(persisted, benchmark, tmp_path):
+    path = str(tmp_path / "source_index.pickle") if persisted else None
+    SourceIndex(root=str(ROOT), path=path).save()
+
+    result = benchmark(SourceIndex, root=str(ROOT), path=path)
+    assert result["min_time"] > 0